@@ -0,0 +1,222 @@
+# The software is released under MIT License.
+#
+# Copyright 2017 github.com/ptrk01
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software # without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+# to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions 
+# of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A #PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF 
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER 
+# DEALINGS IN THE SOFTWARE.
+""" Address generation from a seed, see AddressGenerator. """
+
+import concurrent.futures
+import hashlib
+import threading
+import os
+
+import numpy as np
+
+import kerl
+import trinary
+
+SEED_TRYTES = 81
+ADDRESS_TRYTES = 81
+CHECKSUM_TRYTES = 9
+# A key fragment (one per security level) consists of 27 hashes, each of which is hashed 26 times for the digest.
+FRAGMENT_HASHES = 27
+DIGEST_ROUNDS = 26
+SECURITY_LEVELS = (1, 2, 3)
+
+_HASH = trinary.HASH_TRITS
+_HALF = (3 ** _HASH - 1) // 2
+
+
+class AddressGenerator:
+    """ Derives the addresses of a seed like the reference wallets: Kerl turns seed and index into a subseed, the subseed into
+        a key of 27 hashes per security level, the hashed key fragments into a digest and the digest into the address.
+        Ranges of indexes are derived in batches, every batch runs vectorized over all its keys, and the batches run in
+        parallel on a process pool. Derived addresses are kept in an optional AddressCache, so a seed is only derived once.
+        Constructor:
+            seed (str): Seed of up to 81 trytes, shorter seeds are padded with 9.
+            security (integer): Security level 1, 2 or 3.
+            processes (integer): Number of worker processes, defaults to the number of cores. 1 derives in the calling process.
+            cache (AddressCache): Cache of derived addresses, None to derive every address again.
+            batchSize (integer): Number of indexes derived together by one worker.
+    
+        Methods:
+            address: Return the address of an index.
+            addresses: Return the addresses of a range of indexes.
+            close: Stop the worker processes.
+    """
+    
+    def __init__(self, seed, security=2, processes=None, cache=None, batchSize=32):
+        if security not in SECURITY_LEVELS:
+            raise ValueError('Security level must be 1, 2 or 3, not %r' % security)
+        if len(seed) > SEED_TRYTES:
+            raise ValueError('Seeds may have at most %d trytes' % SEED_TRYTES)
+        self.seed = seed.ljust(SEED_TRYTES, '9')
+        trinary.trytesToValues(self.seed)
+        self.security = security
+        self.processes = processes or os.cpu_count() or 1
+        self.cache = cache
+        self.batchSize = batchSize
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def address(self, index):
+        return self.addresses(index, 1)[0]
+    
+    def addresses(self, start, count):
+        """ Return the addresses (81 trytes, without checksum) of the indexes start ... start + count - 1. """
+        if start < 0 or count < 0:
+            raise ValueError('Indexes must not be negative')
+        indexes = list(range(start, start + count))
+        found = self.cache.get(self.seed, self.security, start, count) if self.cache is not None else [None] * count
+        missing = [index for index, address in zip(indexes, found) if address is None]
+        if missing:
+            batches = [missing[i:i + self.batchSize] for i in range(0, len(missing), self.batchSize)]
+            if self.processes == 1 or len(batches) == 1:
+                derived = [deriveAddresses(self.seed, batch, self.security) for batch in batches]
+            else:
+                pool = self._pool()
+                derived = list(pool.map(deriveAddresses, [self.seed] * len(batches), batches, [self.security] * len(batches)))
+            derived = dict(zip(missing, (address for batch in derived for address in batch)))
+            if self.cache is not None:
+                self.cache.putMany(self.seed, self.security, derived)
+            found = [address if address is not None else derived[index] for index, address in zip(indexes, found)]
+        return found
+    
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+    
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(self.processes)
+            return self._executor
+
+
+class AddressCache:
+    """ Cache of derived addresses on disk. Every seed and security level has a file of its own, named by a fingerprint from
+        which the seed cannot be recovered, holding the address of index i as 49 packed bytes at offset 49 * i. Lookups read
+        the requested range directly, nothing is loaded into memory. Indexes which were never stored read as zero bytes.
+        Constructor:
+            directory (str): Directory of the cache files, created if it does not exist.
+    
+        Methods:
+            get: Return the cached addresses of a range of indexes, None for the missing ones.
+            putMany: Store the addresses of a dict of index to address.
+            close: Close all open files.
+    """
+    
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        self._lock = threading.Lock()
+    
+    def get(self, seed, security, start, count):
+        size = trinary.PACKED_HASH_BYTES
+        with self._lock:
+            addressFile = self._file(seed, security)
+            addressFile.seek(start * size)
+            data = addressFile.read(count * size)
+        data = data.ljust(count * size, b'\0')
+        rows = np.frombuffer(data, dtype=np.uint8).reshape(count, size)
+        stored = rows.any(axis=1)
+        addresses = trinary.unpackTrytes(rows[stored], ADDRESS_TRYTES) if stored.any() else []
+        found = iter(addresses)
+        return [next(found) if present else None for present in stored]
+    
+    def putMany(self, seed, security, addresses):
+        if not addresses:
+            return
+        indexes = sorted(addresses)
+        packed = trinary.packTrytes([addresses[index] for index in indexes])
+        size = trinary.PACKED_HASH_BYTES
+        with self._lock:
+            addressFile = self._file(seed, security)
+            # Consecutive indexes are written with a single write.
+            first = 0
+            for i in range(1, len(indexes) + 1):
+                if i == len(indexes) or indexes[i] != indexes[i - 1] + 1:
+                    addressFile.seek(indexes[first] * size)
+                    addressFile.write(packed[first:i].tobytes())
+                    first = i
+            addressFile.flush()
+    
+    def close(self):
+        with self._lock:
+            files, self._files = self._files, {}
+        for addressFile in files.values():
+            addressFile.close()
+    
+    def _file(self, seed, security):
+        key = (seed, security)
+        if key not in self._files:
+            path = os.path.join(self.directory, fingerprint(seed, security) + '.addr')
+            # r+b writes at any offset, the file is created first if it does not exist.
+            self._files[key] = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        return self._files[key]
+
+
+def fingerprint(seed, security):
+    """ Return a hex fingerprint of a seed and security level, from which the seed cannot be recovered. """
+    data = ('%s:%d' % (seed.ljust(SEED_TRYTES, '9'), security)).encode('ascii')
+    return hashlib.blake2b(data, digest_size=16, person=b'iota-addresses').hexdigest()
+
+
+def deriveAddresses(seed, indexes, security=2):
+    """ Derive the addresses of a list of indexes of a seed in one vectorized pass, returns a list of trytes. """
+    if not len(indexes):
+        return []
+    keys = keysOf(subseeds(seed, indexes), security)
+    return trinary.tritsToTrytes(addressesOf(digestsOf(keys)))
+
+
+def subseeds(seed, indexes):
+    """ Return the subseeds (one row of 243 trits per index) of a seed: the Kerl hash of seed + index. """
+    value = int(trinary.tritsToInt(trinary.trytesToTrits(seed.ljust(SEED_TRYTES, '9'))))
+    # The addition wraps around like the trit wise addition of the reference implementation.
+    sums = [(value + index + _HALF) % (3 ** _HASH) - _HALF for index in indexes]
+    return kerl.kerlHash(trinary.intToTrits(sums, _HASH))
+
+
+def keysOf(subseedTrits, security):
+    """ Return the private keys of subseeds, one row of security * 27 * 243 trits per subseed. """
+    return kerl.kerlHash(np.atleast_2d(subseedTrits), security * FRAGMENT_HASHES * _HASH)
+
+
+def digestsOf(keyTrits):
+    """ Return the digests of private keys, one row of 243 trits per key fragment (security level). """
+    keyTrits = np.atleast_2d(keyTrits)
+    fragments = keyTrits.shape[1] // (FRAGMENT_HASHES * _HASH)
+    # The rounds stay in the byte form Kerl absorbs, instead of converting every intermediate hash into trits and back.
+    hashes = trinary.tritsToBytes(keyTrits.reshape(-1, _HASH))
+    for _ in range(DIGEST_ROUNDS):
+        hashes = kerl.squeezedBytes(kerl.keccak384(hashes))
+    fragmentDigests = kerl.squeezedBytes(kerl.keccak384(hashes.reshape(-1, FRAGMENT_HASHES * trinary.HASH_BYTES)))
+    return trinary.bytesToTrits(fragmentDigests).reshape(len(keyTrits), fragments * _HASH)
+
+
+def addressesOf(digestTrits):
+    """ Return the addresses of digests, one row of 243 trits per digest. """
+    return kerl.kerlHash(np.atleast_2d(digestTrits))
+
+
+def addChecksum(address):
+    """ Append the 9 tryte checksum to an 81 tryte address. """
+    if len(address) != ADDRESS_TRYTES:
+        raise ValueError('Expected an address of %d trytes' % ADDRESS_TRYTES)
+    return address + trinary.tritsToTrytes(kerl.kerlHash(trinary.trytesToTrits(address)))[-CHECKSUM_TRYTES:]
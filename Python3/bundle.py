@@ -0,0 +1,322 @@
+# The software is released under MIT License.
+#
+# Copyright 2017 github.com/ptrk01
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software # without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+# to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions 
+# of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A #PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF 
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER 
+# DEALINGS IN THE SOFTWARE.
+""" Building, signing and serializing bundles of transactions, see Bundle and BundleSigner. """
+
+import concurrent.futures
+import threading
+import time
+import os
+
+import numpy as np
+
+import addressgenerator
+import iotawrapper
+import kerl
+import trinary
+
+FRAGMENT_TRYTES = 2187
+TAG_TRYTES = 27
+HASH_TRYTES = 81
+# Every tryte of the normalized bundle hash is -13 ... 13, a signature hashes a key chunk 13 - value times.
+MAX_TRYTE = 13
+NORMALIZED_CHUNK = 27
+
+_HASH = trinary.HASH_TRITS
+_HASH_BYTES = trinary.HASH_BYTES
+
+
+class Bundle:
+    """ Bundle of value and data transactions, built in three steps: add outputs and inputs, finalize (which computes the
+        bundle hash), sign the inputs. trytes then returns the transactions ready for attachToTangle.
+        An input takes one transaction per security level, they carry the signature fragments of its key. A message longer
+        than one signature fragment (2187 trytes) is spread over several transactions.
+        Constructor:
+            timestamp (integer): Timestamp of the transactions in seconds, defaults to the time of finalize.
+    
+        Methods:
+            addOutput: Add a transaction sending value (0 for data only) to an address, with an optional tag and message.
+            addInput: Add the transactions spending the balance of an address of a seed.
+            finalize: Set the indexes, compute the bundle hash and write it into every transaction.
+            normalizedHash: The normalized bundle hash the signatures are made for.
+            sign: Sign all inputs with the keys of a seed.
+            validateSignatures: Check the signatures of all inputs against their addresses.
+            trytes: Trytes of all transactions, last index first like attachToTangle expects them.
+            transactions: The transactions as iotawrapper.Transaction objects, index 0 first.
+    """
+    
+    def __init__(self, timestamp=None):
+        self.timestamp = timestamp
+        self.hash = None
+        self.entries = []
+        self.inputs = []
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def addOutput(self, address, value=0, tag='', message=''):
+        if value < 0:
+            raise ValueError('Output values must not be negative')
+        _checkTrytes(address, HASH_TRYTES, 'address')
+        tag = _padTag(tag)
+        fragments = [message[i:i + FRAGMENT_TRYTES] for i in range(0, len(message), FRAGMENT_TRYTES)] or ['']
+        for i, fragment in enumerate(fragments):
+            trinary.trytesToValues(fragment)
+            self._add(address, value if i == 0 else 0, tag, fragment)
+    
+    def addInput(self, address, balance, keyIndex, security=2, tag=''):
+        """ Spend the whole balance of the address with key index keyIndex of the seed passed to sign. """
+        if security not in addressgenerator.SECURITY_LEVELS:
+            raise ValueError('Security level must be 1, 2 or 3, not %r' % security)
+        _checkTrytes(address, HASH_TRYTES, 'address')
+        self.inputs.append((len(self.entries), address, keyIndex, security))
+        for i in range(security):
+            self._add(address, -balance if i == 0 else 0, _padTag(tag), '')
+    
+    def finalize(self):
+        if not self.entries:
+            raise ValueError('A bundle needs at least one transaction')
+        if sum(entry['value'] for entry in self.entries) != 0:
+            raise ValueError('The values of a bundle must add up to 0')
+        timestamp = int(time.time()) if self.timestamp is None else self.timestamp
+        lastIndex = len(self.entries) - 1
+        for index, entry in enumerate(self.entries):
+            entry.update(timestamp=timestamp, currentIndex=index, lastIndex=lastIndex, obsoleteTag=entry['tag'])
+        while True:
+            self.hash = bundleHash(self.entries)
+            # A normalized hash containing 13 would reveal a whole key chunk, the obsolete tag of the first transaction is
+            # incremented until the hash is safe to sign.
+            if MAX_TRYTE not in normalizedBundle(self.hash):
+                break
+            self.entries[0]['obsoleteTag'] = _incrementTrytes(self.entries[0]['obsoleteTag'])
+    
+    def normalizedHash(self):
+        self._checkFinalized()
+        return normalizedBundle(self.hash)
+    
+    def sign(self, seed, signer=None):
+        """ Sign all inputs, the hash chains of all key fragments are computed together. signer is a BundleSigner which
+            spreads the work over its processes, by default the bundle is signed in the calling process.
+        """
+        if signer is not None:
+            signer.sign([self], seed)
+            return
+        self._checkFinalized()
+        signatures = signatureFragments(seed, [(keyIndex, security, self.hash) for first, address, keyIndex, security in self.inputs])
+        self._setSignatures(signatures)
+    
+    def validateSignatures(self):
+        self._checkFinalized()
+        if not self.inputs:
+            return True
+        signatures = [[self.entries[first + i]['signatureMessageFragment'] for i in range(security)]
+                      for first, address, keyIndex, security in self.inputs]
+        addresses = signatureAddresses(signatures, self.hash)
+        return all(address == expected for address, (first, expected, keyIndex, security) in zip(addresses, self.inputs))
+    
+    def trytes(self):
+        self._checkFinalized()
+        return [_entryTrytes(entry, self.hash) for entry in reversed(self.entries)]
+    
+    def transactions(self):
+        return [iotawrapper.Transaction(trytes) for trytes in reversed(self.trytes())]
+    
+    def _add(self, address, value, tag, fragment):
+        if self.hash is not None:
+            raise ValueError('The bundle was finalized already')
+        self.entries.append({'address': address, 'value': value, 'tag': tag, 'obsoleteTag': tag,
+                             'signatureMessageFragment': fragment.ljust(FRAGMENT_TRYTES, '9')})
+    
+    def _setSignatures(self, signatures):
+        for (first, address, keyIndex, security), fragments in zip(self.inputs, signatures):
+            for i, fragment in enumerate(fragments):
+                self.entries[first + i]['signatureMessageFragment'] = fragment
+    
+    def _checkFinalized(self):
+        if self.hash is None:
+            raise ValueError('The bundle has to be finalized first')
+
+
+class BundleSigner:
+    """ Signs the inputs of many bundles on a process pool. The inputs of all bundles passed to sign are split into batches
+        of at most batchSize inputs, each batch is signed vectorized in one worker. Fewer inputs than processes times batchSize
+        are spread evenly over the processes, so the inputs of a single bundle are signed in parallel as well.
+        Constructor:
+            processes (integer): Number of worker processes, defaults to the number of cores.
+            batchSize (integer): Largest number of inputs signed together by one worker.
+    
+        Methods:
+            sign: Sign all inputs of a list of finalized bundles.
+            close: Stop the worker processes.
+    """
+    
+    def __init__(self, processes=None, batchSize=8):
+        self.processes = processes or os.cpu_count() or 1
+        self.batchSize = batchSize
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def sign(self, bundles, seed):
+        inputs = []
+        for bundle in bundles:
+            bundle._checkFinalized()
+            inputs.extend((bundle, (keyIndex, security, bundle.hash)) for first, address, keyIndex, security in bundle.inputs)
+        batchSize = max(1, min(self.batchSize, -(-len(inputs) // self.processes)))
+        batches = [[work for bundle, work in inputs[i:i + batchSize]] for i in range(0, len(inputs), batchSize)]
+        if self.processes == 1 or len(batches) <= 1:
+            results = [signatureFragments(seed, batch) for batch in batches]
+        else:
+            results = list(self._pool().map(signatureFragments, [seed] * len(batches), batches))
+        signatures = iter([fragments for batch in results for fragments in batch])
+        for bundle in bundles:
+            bundle._setSignatures([next(signatures) for i in range(len(bundle.inputs))])
+    
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+    
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(self.processes)
+            return self._executor
+
+
+def bundleHash(entries):
+    """ Return the Kerl hash of the essence (address, value, obsolete tag, timestamp and indexes) of bundle transactions. """
+    essence = ''.join(entry['address'] + _integerTrytes(entry['value'], 27) + entry['obsoleteTag'] + _integerTrytes(entry['timestamp'], 9)
+                      + _integerTrytes(entry['currentIndex'], 9) + _integerTrytes(entry['lastIndex'], 9) for entry in entries)
+    return trinary.tritsToTrytes(kerl.kerlHash(trinary.trytesToTrits(essence)))
+
+
+def normalizedBundle(hash):
+    """ Return the 81 tryte values of a bundle hash, shifted so that the values of each chunk of 27 add up to 0. """
+    values = [int(value) for value in trinary.trytesToValues(hash)]
+    for start in range(0, len(values), NORMALIZED_CHUNK):
+        chunk = values[start:start + NORMALIZED_CHUNK]
+        total = sum(chunk)
+        while total > 0:
+            i = next(i for i, value in enumerate(chunk) if value > -MAX_TRYTE)
+            chunk[i] -= 1
+            total -= 1
+        while total < 0:
+            i = next(i for i, value in enumerate(chunk) if value < MAX_TRYTE)
+            chunk[i] += 1
+            total += 1
+        values[start:start + NORMALIZED_CHUNK] = chunk
+    return values
+
+
+def signatureFragments(seed, inputs):
+    """ Return the signature fragments (one list of security fragments of 2187 trytes per input) of a list of
+        (keyIndex, security, bundleHash) inputs of a seed. The keys are derived and all their chains hashed together.
+    """
+    if not inputs:
+        return []
+    keys = [None] * len(inputs)
+    for security in addressgenerator.SECURITY_LEVELS:
+        positions = [i for i, (keyIndex, inputSecurity, hash) in enumerate(inputs) if inputSecurity == security]
+        if positions:
+            derived = addressgenerator.keysOf(addressgenerator.subseeds(seed, [inputs[i][0] for i in positions]), security)
+            for position, key in zip(positions, derived):
+                keys[position] = key
+    chunks = np.concatenate([key.reshape(-1, _HASH) for key in keys])
+    # Fragment i of a key signs chunk i % 3 of the normalized hash, each of its 27 key hashes is hashed 13 - value times.
+    rounds = np.concatenate([_fragmentValues(hash, security, lambda value: MAX_TRYTE - value)
+                             for keyIndex, security, hash in inputs])
+    signed = trinary.tritsToTrytes(_hashChains(chunks, rounds).reshape(-1, FRAGMENT_TRYTES * 3))
+    fragments = iter(signed)
+    return [[next(fragments) for i in range(security)] for keyIndex, security, hash in inputs]
+
+
+def signatureAddresses(signatures, hash):
+    """ Return the addresses which signed a bundle hash, for a list of signatures (lists of fragments) of its inputs. """
+    if not signatures:
+        return []
+    chunks = trinary.trytesToTrits([fragment for fragments in signatures for fragment in fragments]).reshape(-1, _HASH)
+    # Hashing a signature chunk the remaining 13 + value times gives the chunk of the key digest.
+    rounds = np.concatenate([_fragmentValues(hash, len(fragments), lambda value: MAX_TRYTE + value) for fragments in signatures])
+    hashed = trinary.tritsToBytes(_hashChains(chunks, rounds))
+    fragmentDigests = kerl.squeezedBytes(kerl.keccak384(hashed.reshape(-1, addressgenerator.FRAGMENT_HASHES * _HASH_BYTES)))
+    digestTrits = trinary.bytesToTrits(fragmentDigests)
+    addresses = []
+    row = 0
+    for fragments in signatures:
+        digest = digestTrits[row:row + len(fragments)].reshape(1, -1)
+        addresses.append(trinary.tritsToTrytes(addressgenerator.addressesOf(digest)[0]))
+        row += len(fragments)
+    return addresses
+
+
+def _hashChains(chunks, rounds):
+    """ Hash every row of an (N, 243) trit array with Kerl the number of times given in rounds, all rows at once. """
+    hashes = trinary.tritsToBytes(chunks)
+    result = hashes.copy()
+    active = np.arange(len(hashes))
+    for done in range(int(rounds.max()) + 1 if len(rounds) else 0):
+        finished = rounds[active] == done
+        result[active[finished]] = hashes[finished]
+        active, hashes = active[~finished], hashes[~finished]
+        if not len(active):
+            break
+        # The chains stay in the byte form Kerl absorbs, see kerl.squeezedBytes.
+        hashes = kerl.squeezedBytes(kerl.keccak384(hashes))
+    trits = trinary.bytesToTrits(result)
+    # The byte form drops the last trit, chains of no rounds keep it.
+    unhashed = rounds == 0
+    trits[unhashed] = chunks[unhashed]
+    return trits
+
+
+def _fragmentValues(hash, security, count):
+    """ Return count(value) for the normalized tryte of every key chunk of security fragments, fragment i uses chunk i % 3. """
+    normalized = normalizedBundle(hash)
+    values = [normalized[(i % 3) * NORMALIZED_CHUNK + j] for i in range(security) for j in range(NORMALIZED_CHUNK)]
+    return np.array([count(value) for value in values], dtype=np.intp)
+
+
+def _entryTrytes(entry, hash):
+    return (entry['signatureMessageFragment'] + entry['address'] + _integerTrytes(entry['value'], 27) + entry['obsoleteTag']
+            + _integerTrytes(entry['timestamp'], 9) + _integerTrytes(entry['currentIndex'], 9) + _integerTrytes(entry['lastIndex'], 9)
+            + hash + '9' * (2 * HASH_TRYTES) + entry['tag'] + '9' * (3 * 9 + 27))
+
+
+def _integerTrytes(value, length):
+    return trinary.tritsToTrytes(trinary.intToTrits(value, length * 3))
+
+
+def _incrementTrytes(trytes):
+    """ Add 1 to the balanced value of trytes, wrapping around like the trit wise addition of the reference implementation. """
+    length = len(trytes) * 3
+    half = (3 ** length - 1) // 2
+    value = int(trinary.tritsToInt(trinary.trytesToTrits(trytes)))
+    return trinary.tritsToTrytes(trinary.intToTrits((value + 1 + half) % 3 ** length - half, length))
+
+
+def _padTag(tag):
+    if len(tag) > TAG_TRYTES:
+        raise ValueError('Tags may have at most %d trytes' % TAG_TRYTES)
+    trinary.trytesToValues(tag)
+    return tag.ljust(TAG_TRYTES, '9')
+
+
+def _checkTrytes(trytes, length, name):
+    if len(trytes) != length:
+        raise ValueError('Expected an %s of %d trytes' % (name, length))
+    trinary.trytesToValues(trytes)
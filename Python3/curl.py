@@ -0,0 +1,152 @@
+# The software is released under MIT License.
+#
+# Copyright 2017 github.com/ptrk01
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software # without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+# to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions 
+# of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A #PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF 
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER 
+# DEALINGS IN THE SOFTWARE.
+
+""" Curl-P sponge function used for transaction hashes and proof of work.
+
+    Besides the Curl class, which hashes one trit sequence at a time, the module hashes batches of equally long trit
+    sequences in one call. The batch functions work bit sliced: every uint64 word carries the trit of 64 different
+    sequences as one bit in a low and one bit in a high word (1 = (0, 1), -1 = (1, 0), 0 = (1, 1)).
+"""
+
+import numpy as np
+
+import trinary
+
+HASH_LENGTH = 243
+STATE_LENGTH = 3 * HASH_LENGTH
+NUMBER_OF_ROUNDS = 81
+
+# Cell i of the next state combines the cells 364 * i and 364 * (i + 1) (mod 729) of the previous state.
+_INDICES = (364 * np.arange(STATE_LENGTH + 1)) % STATE_LENGTH
+_FIRST = _INDICES[:-1]
+_SECOND = _INDICES[1:]
+_TRUTH_TABLE = np.array([1, 0, -1, 2, 1, -1, 0, 2, -1, 1, 0], dtype=np.int8)
+
+
+class Curl:
+    """ Curl-P sponge working on balanced trits.
+        Constructor:
+            rounds (integer): Number of rounds of the transformation, 81 for Curl-P81 (transaction hashes) or 27 for Curl-P27.
+    
+        Methods:
+            absorb: Absorb trits into the sponge, 243 trits at a time.
+            squeeze: Squeeze trits out of the sponge.
+            reset: Reset the sponge to its initial state.
+    """
+    
+    def __init__(self, rounds=NUMBER_OF_ROUNDS):
+        self.rounds = rounds
+        self.reset()
+    
+    def reset(self):
+        self._state = np.zeros(STATE_LENGTH, dtype=np.int8)
+    
+    def absorb(self, trits):
+        trits = np.asarray(trits, dtype=np.int8)
+        for offset in range(0, len(trits), HASH_LENGTH):
+            block = trits[offset:offset + HASH_LENGTH]
+            self._state[:len(block)] = block
+            self._state = transform(self._state, self.rounds)
+    
+    def squeeze(self, length=HASH_LENGTH):
+        output = []
+        for offset in range(0, length, HASH_LENGTH):
+            output.append(self._state[:min(HASH_LENGTH, length - offset)].copy())
+            self._state = transform(self._state, self.rounds)
+        return np.concatenate(output) if output else np.zeros(0, dtype=np.int8)
+
+
+def transform(state, rounds=NUMBER_OF_ROUNDS):
+    """ Apply the Curl-P transformation to a state of 729 trits, or to every row of an (N, 729) array of states. """
+    for _ in range(rounds):
+        state = _TRUTH_TABLE[state[..., _FIRST] + 4 * state[..., _SECOND] + 5]
+    return state
+
+
+def transformSliced(low, high, rounds=NUMBER_OF_ROUNDS):
+    """ Apply the Curl-P transformation to bit sliced states, low and high are (729, words) uint64 arrays and are updated in place. """
+    alpha = np.empty_like(low)
+    beta = np.empty_like(low)
+    gamma = np.empty_like(low)
+    delta = np.empty_like(low)
+    for _ in range(rounds):
+        np.take(low, _FIRST, axis=0, out=alpha)
+        np.take(high, _FIRST, axis=0, out=beta)
+        np.take(high, _SECOND, axis=0, out=gamma)
+        np.take(low, _SECOND, axis=0, out=delta)
+        np.bitwise_xor(delta, beta, out=delta)
+        np.invert(gamma, out=beta)
+        np.bitwise_or(beta, alpha, out=beta)
+        np.bitwise_and(delta, beta, out=delta)
+        np.invert(delta, out=low)
+        np.bitwise_xor(alpha, gamma, out=high)
+        np.bitwise_or(high, delta, out=high)
+
+
+def hashBatch(trits, rounds=NUMBER_OF_ROUNDS, length=HASH_LENGTH):
+    """ Hash every row of an (N, L) trit array with Curl-P and return an (N, length) trit array.
+        Gives the same result as absorbing each row into its own Curl and squeezing length trits, but hashes 64 rows per word.
+    """
+    trits = np.asarray(trits, dtype=np.int8)
+    if trits.ndim != 2:
+        raise ValueError('Expected a two dimensional array with one row per sequence')
+    count = len(trits)
+    words = -(-count // 64)
+    low = np.full((STATE_LENGTH, words), np.uint64(0xFFFFFFFFFFFFFFFF))
+    high = low.copy()
+    for offset in range(0, trits.shape[1], HASH_LENGTH):
+        block = trits[:, offset:offset + HASH_LENGTH]
+        low[:block.shape[1]] = _pack(block != 1, words)
+        high[:block.shape[1]] = _pack(block != -1, words)
+        transformSliced(low, high, rounds)
+    output = []
+    for offset in range(0, length, HASH_LENGTH):
+        size = min(HASH_LENGTH, length - offset)
+        lowBits = _unpack(low[:size], count)
+        highBits = _unpack(high[:size], count)
+        output.append(np.where(lowBits == 0, 1, np.where(highBits == 0, -1, 0)).astype(np.int8))
+        transformSliced(low, high, rounds)
+    return np.concatenate(output, axis=1) if output else np.zeros((count, 0), dtype=np.int8)
+
+
+def transactionHash(trytes):
+    """ Return the Curl-P81 hash of the 2673 trytes of a transaction as trytes. """
+    curl = Curl()
+    curl.absorb(trinary.trytesToTrits(trytes))
+    return trinary.tritsToTrytes(curl.squeeze())
+
+
+def transactionHashes(trytesList):
+    """ Return the Curl-P81 hashes of many transactions as list of trytes, computed in one batch. """
+    if not len(trytesList):
+        return []
+    return trinary.tritsToTrytes(hashBatch(trinary.trytesToTrits(trytesList)))
+
+
+def _pack(bits, words):
+    """ Pack an (N, L) boolean array into (L, words) uint64 words, row n of the input becomes bit n. """
+    packed = np.packbits(bits.T, axis=1, bitorder='little')
+    padded = np.zeros((packed.shape[0], words * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view('<u8')
+
+
+def _unpack(words, count):
+    """ Inverse of _pack: return an (count, L) array of 0 / 1 bits. """
+    bits = np.unpackbits(np.ascontiguousarray(words).astype('<u8').view(np.uint8), axis=1, bitorder='little')
+    return bits[:, :count].T
@@ -18,58 +18,2172 @@
 #
 # Notice: Some parts of the class comments were taken from iota.readme.io.
 
-import urllib.request
-import urllib.error
+import urllib.parse
+import http.client
+import socket
+import threading
+import queue
+import asyncio
+import concurrent.futures
+import collections
+import contextlib
+import codecs
 import json
-import sys
+import math
+import random
+import time
 
 class Api:
-    """ This class acts as an intermediary and invoker for all classes. """
+    """ This class acts as an intermediary and invoker for all classes.
+        Constructor:
+            url (str): URL of node sever including port
+            transport (HttpTransport): Transport shared by all commands, a new pooled transport is created if omitted.
+            chunkSize (integer): Maximum number of hashes or addresses sent in a single getTrytes, findTransactions or getBalance request.
+            workers (integer): Number of chunks which are sent in parallel.
+            localPow (bool): Do the proof of work of attachToTangle on the local machine instead of the node (requires NumPy).
+            powProcesses (integer): Number of processes used for local proof of work, defaults to the number of cores.
+            cache (ResponseCache): Cache for trytes, confirmed inclusion states and short lived node data, None disables caching.
+            store (TransactionStore): Persistent store which getTrytes reads before asking the node and fills with new transactions.
+            retry (RetryPolicy): Policy for repeating commands which failed with a retryable error, None raises the first error.
+            instrumentation (Instrumentation): Receives every request of a newly created transport, pass it to the transport when giving one.
+        Failed commands raise an ApiError.
+    """
     
-    def __init__(self, url):
+    def __init__(self, url, transport=None, chunkSize=1000, workers=4, localPow=False, powProcesses=None, cache=None, store=None, retry=None,
+                 instrumentation=None):
         self.url = url
+        self.cache = cache
+        self.store = store
+        self.retry = retry
+        self.instrumentation = instrumentation if transport is None else getattr(transport, 'instrumentation', instrumentation)
+        self.transport = transport if transport is not None else HttpTransport(max(10, workers), instrumentation=instrumentation)
+        if retry is not None:
+            self.transport = RetryingTransport(self.transport, retry)
+        self.chunkSize = chunkSize
+        self.workers = workers
+        self.localPow = localPow
+        self.powProcesses = powProcesses
+        self.tipPrefetcher = None
+        self._executor = None
+        self._powEngine = None
+        self._powScheduler = None
+        self._executorLock = threading.Lock()
+
+    def close(self):
+        if self.tipPrefetcher is not None:
+            self.tipPrefetcher.close()
+        with self._executorLock:
+            executor, self._executor = self._executor, None
+            powEngines, self._powEngine, self._powScheduler = (self._powEngine, self._powScheduler), None, None
+        if executor is not None:
+            executor.shutdown()
+        for powEngine in powEngines:
+            if powEngine is not None:
+                powEngine.close()
+        self.transport.close()
 
     def getNodeInfo(self):
-        return NodeInfo(self.url)
+        return self._cachedVolatile(NodeInfo, ('getNodeInfo',), lambda: NodeInfo(self.url, self.transport))
     
     def getNeighbors(self):
-        return GetNeighbors(self.url)
+        return GetNeighbors(self.url, self.transport)
     
     def addNeighbors(self, neighborsList):
-        return AddNeighbors(self.url, neighborsList)
+        return AddNeighbors(self.url, neighborsList, self.transport)
     
     def removeNeighbors(self, neighborsList):
-        return RemoveNeighbors(self.url, neighborsList)
+        return RemoveNeighbors(self.url, neighborsList, self.transport)
     
     def getTips(self):
-        return GetTips(self.url)
+        return self._cachedVolatile(GetTips, ('getTips',), lambda: GetTips(self.url, self.transport))
 
     def findTransactions(self, addressesList):
-        return FindTransactions(self.url, addressesList)
+        return self._chunked(FindTransactions, addressesList, lambda chunk: FindTransactions(self.url, chunk, self.transport))
+
+    def streamTransactions(self, addressesList):
+        """ Iterate over the hashes of findTransactions while the response is received, one chunk of addresses after the other.
+            Memory stays bounded by one chunk of the response, except for the hashes remembered to drop duplicates between chunks.
+        """
+        chunks = _chunks(addressesList, self.chunkSize)
+        seen = set() if len(chunks) > 1 else None
+        for chunk in chunks:
+            with FindTransactions.stream(self.url, chunk, self.transport) as hashes:
+                for hash in hashes:
+                    if seen is None:
+                        yield hash
+                    elif hash not in seen:
+                        seen.add(hash)
+                        yield hash
 
     def getTrytes(self, hashesList):
-        return GetTrytes(self.url, hashesList)
+        if self.cache is None and self.store is None:
+            return self._fetchTrytes(hashesList)
+        # Look in the cache first, then in the store and only ask the node for the rest.
+        trytes = dict((hash, self.cache.get(('trytes', hash)) if self.cache is not None else None) for hash in hashesList)
+        if self.store is not None:
+            for hash, cached in trytes.items():
+                if cached is None:
+                    trytes[hash] = self.store.get(hash)
+                    if trytes[hash] is not None and self.cache is not None:
+                        self.cache.put(('trytes', hash), trytes[hash])
+        missing = [hash for hash, cached in trytes.items() if cached is None]
+        duration = 0
+        if missing:
+            response = self._fetchTrytes(missing)
+            duration = response.jsonData.get('duration', 0)
+            known = []
+            for hash, fetched in zip(missing, response.trytes()):
+                trytes[hash] = fetched
+                # A node answers unknown hashes with empty (all 9) trytes, those may still arrive later.
+                if fetched is not None and fetched.strip('9'):
+                    known.append((hash, fetched))
+                    if self.cache is not None:
+                        self.cache.put(('trytes', hash), fetched)
+            if known and self.store is not None:
+                self.store.putMany(known)
+        return _wrapResponse(GetTrytes, {'trytes': [trytes[hash] for hash in hashesList], 'duration': duration})
+    
+    def streamTrytes(self, hashesList):
+        """ Iterate over the trytes of getTrytes while the response is received, one chunk of hashes after the other.
+            Cache and store are not used, so the memory needed does not grow with the number of hashes.
+        """
+        for chunk in _chunks(hashesList, self.chunkSize):
+            with GetTrytes.stream(self.url, chunk, self.transport) as trytes:
+                yield from trytes
     
     def getInclusionStates(self, transactionsList, tipsList):
-        return GetInclusionStates(self.url, transactionsList, tipsList)
+        """ With a cache, confirmed states are cached for the tips they were confirmed by: a transaction included in the past
+            of some tips stays included for them, but may not be for older tips, so other tips are asked for again.
+        """
+        if self.cache is None:
+            return GetInclusionStates(self.url, transactionsList, tipsList, self.transport)
+        tips = tuple(tipsList)
+        states = dict((hash, self.cache.get(('included', hash, tips))) for hash in transactionsList)
+        missing = [hash for hash, cached in states.items() if cached is None]
+        duration = 0
+        if missing:
+            response = GetInclusionStates(self.url, missing, tipsList, self.transport)
+            duration = response.jsonData.get('duration', 0)
+            for hash, state in zip(missing, response.states()):
+                states[hash] = state
+                if state:
+                    self.cache.put(('included', hash, tips), True)
+        return _wrapResponse(GetInclusionStates, {'states': [states[hash] for hash in transactionsList], 'duration': duration})
+    
+    def iterAddressHistory(self, addressesList, pageSize=None, prefetch=1, tipsList=None):
+        """ Yield the transactions of every address in pages of (address, transactions, states), where transactions are the
+            parsed Transaction objects of up to pageSize hashes (at most chunkSize) and states their inclusion states.
+            While a page is processed by the caller the next prefetch pages, and the hashes of the next address, are fetched
+            on the workers. The inclusion states of a page are requested in one batch against tipsList, which defaults to
+            the latest solid milestone at the start of the scan.
+        """
+        if not pageSize or self.chunkSize and pageSize > self.chunkSize:
+            # Larger pages would be split into chunks on the same workers the pages are fetched on.
+            pageSize = self.chunkSize
+        if tipsList is None:
+            tipsList = [self.getNodeInfo().latestSolidSubtangleMilestone()]
+        pool = self._pool()
+        
+        def pages():
+            # The hashes of the next address are looked up while the pages of the current one are fetched.
+            current = None
+            for address in addressesList:
+                found = pool.submit(lambda address: self.findTransactions([address]).hashes(), address)
+                if current is not None:
+                    yield from split(*current)
+                current = (address, found)
+            if current is not None:
+                yield from split(*current)
+        
+        def split(address, found):
+            hashes = found.result()
+            if hashes:
+                for page in _chunks(hashes, pageSize):
+                    yield address, page
+        
+        def submit(pageIterator):
+            for address, hashes in pageIterator:
+                inFlight.append((address, pool.submit(self.getTrytes, hashes), pool.submit(self.getInclusionStates, hashes, tipsList)))
+                return
+        
+        inFlight = collections.deque()
+        pageIterator = pages()
+        try:
+            for i in range(prefetch + 1):
+                submit(pageIterator)
+            while inFlight:
+                address, trytes, states = inFlight.popleft()
+                submit(pageIterator)
+                yield address, trytes.result().transactions(), states.result().states()
+        finally:
+            for address, trytes, states in inFlight:
+                trytes.cancel()
+                states.cancel()
+            pageIterator.close()
+    
+    def findUsedAddresses(self, seed, security=2, gapLimit=20, windowSize=None, start=0, threshold=100, generator=None):
+        """ Scan the addresses of a seed from index start on and return (index, address, balance) of every address which has
+            a balance or transactions. The addresses are derived and probed a window of windowSize (default gapLimit) at a
+            time, with one getBalance and one findTransactions request per window, while the next window is derived. The scan
+            stops after gapLimit unused addresses in a row. generator is an addressgenerator.AddressGenerator to derive the
+            addresses with, e.g. one with an AddressCache, by default one is created for the scan (requires NumPy).
+        """
+        import addressgenerator
+        ownGenerator = generator is None
+        if ownGenerator:
+            generator = addressgenerator.AddressGenerator(seed, security, self.powProcesses)
+        windowSize = windowSize or gapLimit
+        used = []
+        lastUsed = start - 1
+        window = start
+        following = None
+        try:
+            addresses = generator.addresses(window, windowSize)
+            while True:
+                following = self._pool().submit(generator.addresses, window + windowSize, windowSize)
+                balances = [int(balance) for balance in self.getBalance(addresses, threshold).balances()]
+                # An address with a balance is used, only the others have to be looked up.
+                withTransactions = self._addressesWithTransactions([address for address, balance in zip(addresses, balances) if not balance])
+                for offset, (address, balance) in enumerate(zip(addresses, balances)):
+                    if balance or address in withTransactions:
+                        used.append((window + offset, address, balance))
+                        lastUsed = window + offset
+                window += windowSize
+                if window - 1 - lastUsed >= gapLimit:
+                    return used
+                addresses = following.result()
+        finally:
+            if ownGenerator:
+                # The generator must not be closed while the next window is still derived on it.
+                if following is not None:
+                    concurrent.futures.wait([following])
+                generator.close()
+    
+    def _addressesWithTransactions(self, addressesList):
+        """ Return the set of the given addresses which have transactions, with one findTransactions request for all of them. """
+        if not addressesList:
+            return set()
+        hashes = self.findTransactions(addressesList).hashes()
+        if not hashes:
+            return set()
+        remaining = set(addressesList)
+        found = set()
+        # findTransactions does not tell which address a hash belongs to, the address field of the transactions does.
+        transactions = self.streamTrytes(hashes)
+        try:
+            for trytes in transactions:
+                address = Transaction(trytes).address() if trytes else None
+                if address in remaining:
+                    remaining.discard(address)
+                    found.add(address)
+                    if not remaining:
+                        break
+        finally:
+            transactions.close()
+        return found
     
     def getBalance(self, addressesList, threshold):
-        return GetBalance(self.url, addressesList, threshold)
+        fetch = lambda: self._chunked(GetBalance, addressesList, lambda chunk: GetBalance(self.url, chunk, threshold, self.transport))
+        return self._cachedVolatile(GetBalance, ('getBalances', tuple(addressesList), threshold), fetch)
     
     def getTransactionsToApprove(self, depth):
-        return GetTransactionsToApprove(self.url, depth)
+        prefetcher = self.tipPrefetcher
+        if prefetcher is not None and prefetcher.depth == depth:
+            pair = prefetcher.take()
+            if pair is not None:
+                return _wrapResponse(GetTransactionsToApprove, pair[0])
+        return GetTransactionsToApprove(self.url, depth, self.transport)
+
+    def prefetchTips(self, depth=3, poolSize=4, maxMilestones=1, maxAge=60.0, workers=1, checkInterval=10.0):
+        """ Start a TipPrefetcher, getTransactionsToApprove with the same depth takes its pairs while it has fresh ones.
+            A prefetcher started before is stopped.
+        """
+        if self.tipPrefetcher is not None:
+            self.tipPrefetcher.close()
+        self.tipPrefetcher = TipPrefetcher(self, depth, poolSize, maxMilestones, maxAge, workers, checkInterval)
+        return self.tipPrefetcher
     
     def attachToTangle(self, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList):
-        return AttachToTangle(self.url, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList)
+        if self.localPow:
+            return self.localAttachToTangle(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList)
+        return AttachToTangle(self.url, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList, self.transport)
+    
+    def localAttachToTangle(self, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList):
+        """ Do the work of attachToTangle on the local machine and return the result in the same shape as AttachToTangle. """
+        start = time.time()
+        trytes = self._pow().attachToTangle(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList)
+        return _wrapResponse(AttachToTangle, {'trytes': trytes, 'duration': int((time.time() - start) * 1000)})
+    
+    def submitAttachToTangle(self, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList, timeout=None):
+        """ Queue the local proof of work of a bundle on the process pool of a PowScheduler and return its PowJob.
+            Jobs of different bundles run in parallel, timeout gives up on a job after the given number of seconds.
+        """
+        return self._scheduler().submit(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList, timeout)
     
     def interruptAttachingToTangle(self):
-        return InterruptAttachingToTangle(self.url)
+        # Stop the local proof of work as well, the node only knows about its own attachToTangle calls.
+        for powEngine in (self._powEngine, self._powScheduler):
+            if powEngine is not None:
+                powEngine.interrupt()
+        return InterruptAttachingToTangle(self.url, self.transport)
     
     def broadcastTransactions(self, trytesList):
-        return BroadcastTransactions(self.url, trytesList)
+        return BroadcastTransactions(self.url, trytesList, self.transport)
     
     def storeTransactions(self, trytesList):
-        return StoreTransactions(self.url, trytesList)
+        return StoreTransactions(self.url, trytesList, self.transport)
+
+    def sendTransfers(self, bundles, depth=3, minWeightMagnitude=14, queueSize=2, tipWorkers=1, powWorkers=1, broadcastWorkers=2):
+        """ Select tips for, attach, broadcast and store bundles in a pipeline, see TransferPipeline, and return the pipeline
+            with the attached trytes, the errors and the statistics of the stages.
+        """
+        pipeline = TransferPipeline(self, depth, minWeightMagnitude, queueSize, tipWorkers, powWorkers, broadcastWorkers)
+        pipeline.run(bundles)
+        return pipeline
+
+    def _fetchTrytes(self, hashesList):
+        return self._chunked(GetTrytes, hashesList, lambda chunk: GetTrytes(self.url, chunk, self.transport))
+
+    def _cachedVolatile(self, commandClass, key, fetch):
+        """ Return a cached response of a volatile command while its time to live has not run out. """
+        if self.cache is None:
+            return fetch()
+        jsonData = self.cache.get(key)
+        if jsonData is None:
+            jsonData = fetch().jsonData
+            self.cache.put(key, jsonData, self.cache.ttl.get(key[0], 0))
+        return _wrapResponse(commandClass, jsonData)
+
+    def _chunked(self, commandClass, items, call):
+        """ Split items into chunks of chunkSize, send the chunks in parallel and merge the responses in input order. """
+        chunks = _chunks(items, self.chunkSize)
+        if len(chunks) <= 1:
+            return call(items)
+        results = list(self._pool().map(call, chunks))
+        return _wrapResponse(commandClass, commandClass.mergeResponses([result.jsonData for result in results]))
+
+    def _pow(self):
+        with self._executorLock:
+            if self._powEngine is None:
+                import proofofwork
+                self._powEngine = proofofwork.PowEngine(self.powProcesses)
+            return self._powEngine
+
+    def _scheduler(self):
+        with self._executorLock:
+            if self._powScheduler is None:
+                import proofofwork
+                self._powScheduler = proofofwork.PowScheduler(self.powProcesses)
+            return self._powScheduler
+
+    def _pool(self):
+        with self._executorLock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(self.workers)
+            return self._executor
+
+
+class TransferPipeline:
+    """ Sends bundles to the Tangle in three stages: tip selection (getTransactionsToApprove), proof of work (attachToTangle)
+        and broadcast (broadcastTransactions and storeTransactions). Every stage runs in threads of its own and hands bundles
+        on through a bounded queue, so the tips of the next bundle are selected while a bundle is attached and the broadcast
+        does not hold up the proof of work. A stage in front of a full queue waits, this time is reported as backpressure.
+        A bundle which fails in a stage is recorded in errors and does not stop the others. An error raised by the iterator
+        of bundles ends the input, it is recorded at the position of the bundle the iterator should have given.
+        Constructor:
+            api (Api): Api the commands are sent with, its localPow setting decides where the proof of work is done.
+            depth (integer): Depth passed to getTransactionsToApprove.
+            minWeightMagnitude (integer): Minimum weight magnitude of the proof of work.
+            queueSize (integer): Number of bundles each queue between two stages holds.
+            tipWorkers, powWorkers, broadcastWorkers (integer): Number of threads of each stage.
+    
+        Methods:
+            run: Send bundles (lists of trytes in attachToTangle order or bundle.Bundle objects) and wait until all are done.
+            trytes: Attached trytes of every bundle of the last run in input order, None for bundles which failed.
+            errors: Exception of every failed bundle of the last run by its position.
+            stats: Bundles per minute of the last run and throughput, utilization and backpressure of every stage.
+    """
+    
+    stages = ('tips', 'pow', 'broadcast')
+    # Marks the end of the input, None is a bundle like any other value and fails in the tips stage.
+    _end = object()
+    
+    def __init__(self, api, depth=3, minWeightMagnitude=14, queueSize=2, tipWorkers=1, powWorkers=1, broadcastWorkers=2):
+        self.api = api
+        self.depth = depth
+        self.minWeightMagnitude = minWeightMagnitude
+        self.queueSize = queueSize
+        self.workers = {'tips': tipWorkers, 'pow': powWorkers, 'broadcast': broadcastWorkers}
+        self._lock = threading.Lock()
+        self._trytes = []
+        self._errors = {}
+        self._stats = dict((stage, collections.Counter()) for stage in self.stages)
+        self._started = None
+        self._finished = None
+    
+    def run(self, bundles):
+        pending = iter(bundles)
+        queues = {'pow': queue.Queue(self.queueSize), 'broadcast': queue.Queue(self.queueSize)}
+        with self._lock:
+            self._trytes, self._errors = [], {}
+            self._stats = dict((stage, collections.Counter()) for stage in self.stages)
+            self._started, self._finished = time.perf_counter(), None
+        running = dict(self.workers)
+        ended = threading.Event()
+        
+        def nextBundle():
+            with self._lock:
+                if ended.is_set():
+                    return None
+                try:
+                    bundle = next(pending, self._end)
+                except Exception as e:
+                    # An input which fails ends it, the error takes the position of the bundle it should have given.
+                    self._trytes.append(None)
+                    self._errors[len(self._trytes) - 1] = e
+                    self._stats['tips']['failed'] += 1
+                    bundle = self._end
+                if bundle is self._end:
+                    ended.set()
+                    return None
+                self._trytes.append(None)
+                return len(self._trytes) - 1, bundle
+        
+        stages = [('tips', nextBundle, self._selectTips, queues['pow']),
+                  ('pow', queues['pow'].get, self._attach, queues['broadcast']),
+                  ('broadcast', queues['broadcast'].get, self._broadcast, None)]
+        threads = []
+        for position, (stage, take, process, target) in enumerate(stages):
+            following = self.stages[position + 1] if target is not None else None
+            for i in range(self.workers[stage]):
+                thread = threading.Thread(target=self._work, args=(stage, take, process, target, following, running), daemon=True)
+                thread.start()
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
+        with self._lock:
+            self._finished = time.perf_counter()
+        return self.trytes()
+    
+    def trytes(self):
+        with self._lock:
+            return list(self._trytes)
+    
+    def errors(self):
+        with self._lock:
+            return dict(self._errors)
+    
+    def stats(self):
+        """ Statistics of the last (or running) run. Per stage processed and failed bundles, busy seconds, seconds spent
+            waiting for input (idle) and for room in the next queue (blocked), bundles per second (throughput), the share of
+            the time its workers were busy (utilization) or blocked (backpressure) and the most bundles seen in its input queue.
+        """
+        with self._lock:
+            if self._started is None:
+                return {}
+            seconds = (self._finished or time.perf_counter()) - self._started
+            stages = {}
+            for stage in self.stages:
+                counts = self._stats[stage]
+                workerSeconds = max(seconds * self.workers[stage], 1e-9)
+                stages[stage] = {'workers': self.workers[stage], 'processed': counts['processed'], 'failed': counts['failed'],
+                                 'busy': counts['busy'], 'idle': counts['idle'], 'blocked': counts['blocked'],
+                                 'throughput': counts['processed'] / max(seconds, 1e-9), 'utilization': counts['busy'] / workerSeconds,
+                                 'backpressure': counts['blocked'] / workerSeconds, 'maxQueued': counts['maxQueued']}
+            sent = self._stats['broadcast']['processed']
+            return {'seconds': seconds, 'bundles': len(self._trytes), 'sent': sent, 'failed': len(self._errors),
+                    'bundlesPerMinute': sent * 60 / max(seconds, 1e-9), 'stages': stages}
+    
+    def _work(self, stage, take, process, target, following, running):
+        """ Thread of a stage: take bundles until the stage in front is done, process them and pass them on. """
+        counts = self._stats[stage]
+        try:
+            while True:
+                start = time.perf_counter()
+                item = take()
+                waited = time.perf_counter() - start
+                if item is None:
+                    break
+                index, payload = item
+                start = time.perf_counter()
+                try:
+                    result = process(index, payload)
+                    error = None
+                except Exception as e:
+                    error = e
+                busy = time.perf_counter() - start
+                with self._lock:
+                    counts['idle'] += waited
+                    counts['busy'] += busy
+                    if error is not None:
+                        counts['failed'] += 1
+                        self._errors[index] = error
+                        continue
+                    counts['processed'] += 1
+                if target is not None:
+                    start = time.perf_counter()
+                    target.put((index, result))
+                    blocked = time.perf_counter() - start
+                    with self._lock:
+                        counts['blocked'] += blocked
+                        self._stats[following]['maxQueued'] = max(self._stats[following]['maxQueued'], target.qsize())
+        finally:
+            with self._lock:
+                running[stage] -= 1
+                last = running[stage] == 0
+            # The last thread of a stage tells every thread of the next stage to stop once the queue is empty, also when
+            # it stops on an error, otherwise the next stage would wait for ever.
+            if last and target is not None:
+                for i in range(self.workers[following]):
+                    target.put(None)
+    
+    def _selectTips(self, index, bundle):
+        trytesList = bundle.trytes() if hasattr(bundle, 'trytes') else list(bundle)
+        tips = self.api.getTransactionsToApprove(self.depth)
+        return trytesList, tips.trunkTransaction(), tips.branchTransaction()
+    
+    def _attach(self, index, payload):
+        trytesList, trunkTransaction, branchTransaction = payload
+        return self.api.attachToTangle(trunkTransaction, branchTransaction, self.minWeightMagnitude, trytesList).trytes()
+    
+    def _broadcast(self, index, trytesList):
+        self.api.broadcastTransactions(trytesList)
+        self.api.storeTransactions(trytesList)
+        with self._lock:
+            self._trytes[index] = trytesList
+        return trytesList
+
+
+class TipPrefetcher:
+    """ Keeps a small pool of trunk/branch pairs for a depth, fetched with getTransactionsToApprove by background threads, so
+        attaching a bundle does not have to wait for tip selection. Every pair is tagged with the latestMilestoneIndex of the
+        node when it was fetched and is dropped once it is more than maxMilestones milestones or maxAge seconds old. The
+        milestone index is checked with getNodeInfo every checkInterval seconds, so a new milestone is noticed that late at most.
+        A pair is handed out only once, the oldest one first. The milestone index and fetch time are kept beside the response
+        of the node, which getTransactionsToApprove returns unchanged.
+        Constructor:
+            api (Api): Api the commands are sent with.
+            depth (integer): Depth passed to getTransactionsToApprove.
+            poolSize (integer): Number of pairs kept ready.
+            maxMilestones (integer): Milestones after which a pair is dropped, 0 keeps pairs only until the next milestone.
+            maxAge (float): Seconds after which a pair is dropped.
+            workers (integer): Number of threads fetching pairs at the same time.
+            checkInterval (float): Seconds between two getNodeInfo checks of the milestone index.
+    
+        Methods:
+            take: Remove and return (JSON response, milestone index, fetch time) of a fresh pair, or None.
+            stats: Number of fetched, taken, dropped and missing pairs and the pairs ready.
+            close: Stop the background threads.
+    """
+    
+    # Seconds a thread waits before trying again after a failed request.
+    retryDelay = 1.0
+    
+    def __init__(self, api, depth=3, poolSize=4, maxMilestones=1, maxAge=60.0, workers=1, checkInterval=10.0):
+        self.api = api
+        self.depth = depth
+        self.poolSize = poolSize
+        self.maxMilestones = maxMilestones
+        self.maxAge = maxAge
+        self.checkInterval = checkInterval
+        self.lastError = None
+        self._pairs = collections.deque()
+        self._counts = collections.Counter()
+        self._fetching = 0
+        self._milestoneIndex = None
+        self._checked = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+    
+    def take(self, timeout=0):
+        """ Return the oldest fresh pair, waiting up to timeout seconds (None waits until there is one) if the pool is empty. """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while True:
+                self._evict()
+                if self._pairs:
+                    self._counts['taken'] += 1
+                    # Wake a thread to fetch the next pair.
+                    self._condition.notify_all()
+                    return self._pairs.popleft()
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if self._closed or (remaining is not None and remaining <= 0):
+                    self._counts['missed'] += 1
+                    return None
+                self._condition.wait(remaining)
+    
+    def stats(self):
+        with self._condition:
+            self._evict()
+            return {'ready': len(self._pairs), 'fetched': self._counts['fetched'], 'taken': self._counts['taken'],
+                    'missed': self._counts['missed'], 'expiredByMilestone': self._counts['expiredByMilestone'],
+                    'expiredByAge': self._counts['expiredByAge'], 'errors': self._counts['errors'], 'milestoneIndex': self._milestoneIndex}
+    
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._pairs.clear()
+            self._condition.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                due = self._checked is None or time.monotonic() - self._checked >= self.checkInterval
+                self._evict()
+                full = len(self._pairs) + self._fetching >= self.poolSize
+                if full and not due:
+                    self._condition.wait(self._nextCheck())
+                    continue
+            try:
+                if due:
+                    self._checkMilestone()
+                # The check may have dropped pairs and other threads may have fetched some, there is room only if there
+                # still is when the fetch is reserved.
+                with self._condition:
+                    if self._closed or len(self._pairs) + self._fetching >= self.poolSize:
+                        continue
+                    self._fetching += 1
+                try:
+                    jsonData = GetTransactionsToApprove(self.api.url, self.depth, self.api.transport).jsonData
+                finally:
+                    with self._condition:
+                        self._fetching -= 1
+                with self._condition:
+                    self._pairs.append((jsonData, self._milestoneIndex, time.time()))
+                    self._counts['fetched'] += 1
+                    self._condition.notify_all()
+            except Exception as e:
+                with self._condition:
+                    self.lastError = e
+                    self._counts['errors'] += 1
+                    if not self._closed:
+                        self._condition.wait(self.retryDelay)
+    
+    def _checkMilestone(self):
+        milestoneIndex = self.api.getNodeInfo().latestMilestoneIndex()
+        with self._condition:
+            self._checked = time.monotonic()
+            # Threads checking at the same time may finish out of order, the index never goes back.
+            self._milestoneIndex = max(milestoneIndex, self._milestoneIndex or milestoneIndex)
+            self._evict()
+    
+    def _nextCheck(self):
+        """ Seconds until the next milestone check or until the oldest pair is too old, whichever comes first. """
+        wait = self.checkInterval - (time.monotonic() - self._checked)
+        if self._pairs:
+            jsonData, milestoneIndex, fetched = self._pairs[0]
+            wait = min(wait, fetched + self.maxAge - time.time())
+        return max(0.0, wait)
+    
+    def _evict(self):
+        """ Drop the pairs which are too many milestones behind or too old, the caller holds the condition. """
+        now = time.time()
+        while self._pairs:
+            jsonData, milestoneIndex, fetched = self._pairs[0]
+            if milestoneIndex is not None and self._milestoneIndex - milestoneIndex > self.maxMilestones:
+                self._counts['expiredByMilestone'] += 1
+            elif now - fetched > self.maxAge:
+                self._counts['expiredByAge'] += 1
+            else:
+                break
+            self._pairs.popleft()
+            self._condition.notify_all()
+
+
+class NodePool(Api):
+    """ Api which spreads its requests over several nodes. Every request goes to the fastest node which is in sync, measured by an
+        exponentially weighted moving average of the wall time of its responses. Nodes which fall behind the best node by more than
+        maxLag milestones or fail a request are ejected until a later health check finds them healthy again. A failed read command
+        is repeated on the next best node.
+        With hedgeDelay set, a read command which got no response after the delay is sent a second time to the next best node.
+        The first response is used and the other request is cancelled. Write commands are only hedged if hedgeWrites is set.
+        Constructor:
+            urls (list of str): URLs of the node severs including port
+            transport (HttpTransport): Transport shared by all nodes, a new pooled transport is created if omitted.
+            maxLag (integer): Number of milestones a node may fall behind the best node.
+            checkInterval (float): Seconds between two health checks (getNodeInfo on every node).
+            ejectTime (float): Seconds a node which failed a request is left out.
+            smoothing (float): Weight of a new sample in the moving averages.
+            timeout (float): Socket timeout in seconds of a newly created transport.
+            hedgeDelay (float or str): Seconds to wait before a hedged request, or a percentile of the node's recent
+                                       response times like 'p95'. None disables hedging.
+            hedgeWrites (bool or list of str): Also hedge all write commands, or the given ones.
+            apiOptions: Further options of Api, e.g. chunkSize, workers or cache.
+    
+        Methods:
+            checkHealth: Query getNodeInfo on every node now and update their sync state.
+            nodeStats: Latency averages, milestone indexes and state of every node.
+            hedgeStats: Number of hedged requests and how many of them answered first.
+    """
+    
+    def __init__(self, urls, transport=None, maxLag=1, checkInterval=30, ejectTime=60, smoothing=0.2, timeout=30,
+                 hedgeDelay=None, hedgeWrites=False, **apiOptions):
+        if not urls:
+            raise ValueError('NodePool needs at least one node URL')
+        if transport is None:
+            transport = HttpTransport(max(10, apiOptions.get('workers', 4)), timeout, instrumentation=apiOptions.get('instrumentation'))
+        self.router = NodeRouter(transport, urls, maxLag, checkInterval, ejectTime, smoothing, hedgeDelay, hedgeWrites)
+        Api.__init__(self, urls[0], self.router, **apiOptions)
+    
+    def checkHealth(self):
+        self.router.checkHealth()
+    
+    def nodeStats(self):
+        return self.router.nodeStats()
+    
+    def hedgeStats(self):
+        return self.router.hedgeStats()
+
+
+class NodeRouter:
+    """ Transport used by NodePool. It chooses a node for every command and keeps the statistics of every node.
+        The URL passed to send is ignored.
+        Constructor:
+            transport (HttpTransport): Transport the requests are sent through.
+            urls (list of str): URLs of the nodes.
+            maxLag, checkInterval, ejectTime, smoothing, hedgeDelay, hedgeWrites: See NodePool.
+    
+        Methods:
+            send: Send a command to the best node and return the decoded JSON response.
+            sendTo: Send a command to a given node and update its statistics.
+            stream: Stream a list of the response of the best node, see HttpTransport.stream. Streams are not failed over.
+            select: Return the best node.
+            checkHealth: Query getNodeInfo on every node and update their sync state.
+            nodeStats: Latency averages, milestone indexes and state of every node.
+            hedgeStats: Number of hedged requests and how many of them answered first.
+            close: Close the underlying transport.
+    """
+    
+    # Number of recent response times per node the hedge percentile is taken from, and how many are needed first.
+    latencyWindow = 100
+    minLatencySamples = 20
+    
+    def __init__(self, transport, urls, maxLag=1, checkInterval=30, ejectTime=60, smoothing=0.2, hedgeDelay=None, hedgeWrites=False):
+        self.transport = transport
+        self.nodes = [_Node(url, self.latencyWindow) for url in urls]
+        self.maxLag = maxLag
+        self.checkInterval = checkInterval
+        self.ejectTime = ejectTime
+        self.smoothing = smoothing
+        self.hedgeDelay = hedgeDelay
+        if isinstance(hedgeDelay, str):
+            if not hedgeDelay.startswith('p'):
+                raise ValueError('hedgeDelay must be a number of seconds or a percentile like p95, not %r' % hedgeDelay)
+            self._hedgeQuantile = float(hedgeDelay[1:]) / 100
+        if hedgeWrites is True:
+            self.hedgeWrites = WRITE_COMMANDS
+        else:
+            self.hedgeWrites = frozenset(hedgeWrites or ())
+        self._hedged = 0
+        self._hedgesWon = 0
+        self._executor = None
+        self._lastCheck = None
+        self._lock = threading.Lock()
+        self._checkLock = threading.Lock()
+    
+    def send(self, url, command):
+        self._checkIfDue()
+        name = command['command']
+        hedge = self.hedgeDelay is not None and len(self.nodes) > 1 and (name not in WRITE_COMMANDS or name in self.hedgeWrites)
+        tried = []
+        error = NodeUnreachable('No node to send the command to', command=name)
+        while True:
+            node = self.select(tried)
+            if node is None:
+                raise error
+            try:
+                if hedge:
+                    return self._sendHedged(node, command, tried)
+                return self.sendTo(node, command)
+            except ApiError as e:
+                # Errors caused by the request would be the same on every node.
+                if not e.nodeFailure or name in WRITE_COMMANDS:
+                    raise
+                error = e
+            tried.append(node)
+    
+    def stream(self, url, command, key, cancel=None):
+        self._checkIfDue()
+        return _streamResponse(self.transport, self.select().url, command, key, cancel)
+    
+    def sendTo(self, node, command, cancel=None):
+        start = time.monotonic()
+        try:
+            jsonData = self.transport.send(node.url, command, cancel)
+        except ApiError as e:
+            if e.nodeFailure:
+                self._failed(node)
+            raise
+        self._record(node, time.monotonic() - start, jsonData)
+        return jsonData
+    
+    def select(self, exclude=(), fallback=True):
+        """ Return the node with the lowest latency average which is in sync and not ejected. Without fallback None is
+            returned if there is no such node, otherwise the best of the remaining nodes.
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [node for node in self.nodes if node not in exclude]
+            best = self._bestIndex()
+            healthy = [node for node in candidates if node.ejectedUntil <= now and self._inSync(node, best)]
+            # When every node is ejected a request is still better sent somewhere than not at all.
+            pool = healthy or (candidates if fallback else [])
+            if not pool:
+                return None
+            return min(pool, key=lambda node: (node.wallTime is not None, node.wallTime or 0))
+    
+    def hedgeStats(self):
+        with self._lock:
+            return {'hedged': self._hedged, 'won': self._hedgesWon}
+    
+    def checkHealth(self):
+        def check(node):
+            try:
+                self.sendTo(node, NodeInfo.buildCommand())
+            except ApiError:
+                pass
+        with concurrent.futures.ThreadPoolExecutor(len(self.nodes)) as executor:
+            list(executor.map(check, self.nodes))
+        self._lastCheck = time.monotonic()
+    
+    def nodeStats(self):
+        now = time.monotonic()
+        with self._lock:
+            best = self._bestIndex()
+            return [{'url': node.url, 'wallTime': node.wallTime, 'duration': node.duration, 'solidIndex': node.solidIndex,
+                     'latestIndex': node.latestIndex, 'errors': node.errors, 'inSync': self._inSync(node, best),
+                     'ejected': node.ejectedUntil > now} for node in self.nodes]
+    
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self.transport.close()
+    
+    def _checkIfDue(self):
+        if self._lastCheck is None or time.monotonic() - self._lastCheck > self.checkInterval:
+            # Only one caller runs the health check, the others go on with what is known.
+            if self._checkLock.acquire(blocking=self._lastCheck is None):
+                try:
+                    self.checkHealth()
+                finally:
+                    self._checkLock.release()
+    
+    def _sendHedged(self, node, command, tried):
+        delay = self._delayFor(node)
+        if delay is None:
+            return self.sendTo(node, command)
+        executor = self._hedgeExecutor()
+        requests = {}
+        cancel = CancelToken()
+        requests[executor.submit(self.sendTo, node, command, cancel)] = (node, cancel)
+        done, pending = concurrent.futures.wait(requests, timeout=delay)
+        if not done:
+            # The hedge only goes to a healthy node, a node known to be down would not answer any faster.
+            second = self.select(tried + [node], fallback=False)
+            if second is not None:
+                cancel = CancelToken()
+                requests[executor.submit(self.sendTo, second, command, cancel)] = (second, cancel)
+                with self._lock:
+                    self._hedged += 1
+        pending = set(requests)
+        error = None
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        requests[other][1].cancel()
+                    if requests[future][0] is not node:
+                        with self._lock:
+                            self._hedgesWon += 1
+                    return future.result()
+                error = future.exception()
+                if requests[future][0] is not node:
+                    tried.append(requests[future][0])
+        raise error
+    
+    def _delayFor(self, node):
+        if not isinstance(self.hedgeDelay, str):
+            return self.hedgeDelay
+        with self._lock:
+            if len(node.recent) < self.minLatencySamples:
+                return None
+            recent = sorted(node.recent)
+        return recent[min(len(recent) - 1, int(self._hedgeQuantile * len(recent)))]
+    
+    def _hedgeExecutor(self):
+        with self._lock:
+            if self._executor is None:
+                # Every request waits for one of the connection slots of its node anyway.
+                workers = len(self.nodes) * getattr(self.transport, 'maxConnections', 10)
+                self._executor = concurrent.futures.ThreadPoolExecutor(workers)
+            return self._executor
+    
+    def _record(self, node, wallTime, jsonData):
+        with self._lock:
+            node.recent.append(wallTime)
+            node.wallTime = wallTime if node.wallTime is None else self.smoothing * wallTime + (1 - self.smoothing) * node.wallTime
+            duration = jsonData.get('duration') if isinstance(jsonData, dict) else None
+            if duration is not None:
+                duration = duration / 1000.0
+                node.duration = duration if node.duration is None else self.smoothing * duration + (1 - self.smoothing) * node.duration
+            if isinstance(jsonData, dict) and 'latestSolidSubtangleMilestoneIndex' in jsonData:
+                node.solidIndex = jsonData['latestSolidSubtangleMilestoneIndex']
+                node.latestIndex = jsonData.get('latestMilestoneIndex')
+                # A node which is still solidifying its own latest milestone is not in sync either.
+                if node.latestIndex is not None and node.latestIndex - node.solidIndex > self.maxLag:
+                    node.ejectedUntil = time.monotonic() + self.checkInterval
+                else:
+                    node.ejectedUntil = 0
+    
+    def _bestIndex(self):
+        indexes = [node.solidIndex for node in self.nodes if node.solidIndex is not None]
+        return max(indexes) if indexes else None
+    
+    def _inSync(self, node, best):
+        return best is None or node.solidIndex is not None and best - node.solidIndex <= self.maxLag
+    
+    def _failed(self, node):
+        with self._lock:
+            node.errors += 1
+            node.ejectedUntil = time.monotonic() + self.ejectTime
+
+
+class _Node:
+    """ State of a node of a NodeRouter, latencies are in seconds. """
+    
+    __slots__ = ('url', 'wallTime', 'duration', 'recent', 'solidIndex', 'latestIndex', 'errors', 'ejectedUntil')
+    
+    def __init__(self, url, window):
+        self.url = url
+        self.recent = collections.deque(maxlen=window)
+        self.wallTime = None
+        self.duration = None
+        self.solidIndex = None
+        self.latestIndex = None
+        self.errors = 0
+        self.ejectedUntil = 0
+
+
+class AsyncApi:
+    """ Asyncio counterpart of Api. Every method is a coroutine which returns the same result object as the Api method of the same name.
+        Requests are sent through an AsyncHttpTransport, which bounds the number of requests in flight.
+        Constructor:
+            url (str): URL of node sever including port
+            transport (AsyncHttpTransport): Transport shared by all commands, a new transport is created if omitted.
+            maxInFlight (integer): Maximum number of concurrent requests when a new transport is created.
+            chunkSize (integer): Maximum number of hashes or addresses sent in a single getTrytes, findTransactions or getBalance request.
+            retry (RetryPolicy): Policy for repeating commands which failed with a retryable error, None raises the first error.
+            instrumentation (Instrumentation): Receives every request of a newly created transport, pass it to the transport when giving one.
+        Failed commands raise an ApiError.
+    """
+    
+    def __init__(self, url, transport=None, maxInFlight=100, chunkSize=1000, retry=None, instrumentation=None):
+        self.url = url
+        self.instrumentation = instrumentation if transport is None else getattr(transport, 'instrumentation', instrumentation)
+        self.transport = transport if transport is not None else AsyncHttpTransport(maxInFlight, instrumentation=instrumentation)
+        self.chunkSize = chunkSize
+        self.retry = retry
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *excInfo):
+        await self.close()
+    
+    async def close(self):
+        await self.transport.close()
+    
+    async def getNodeInfo(self):
+        return await self._call(NodeInfo, NodeInfo.buildCommand())
+    
+    async def getNeighbors(self):
+        return await self._call(GetNeighbors, GetNeighbors.buildCommand())
+    
+    async def addNeighbors(self, neighborsList):
+        return await self._call(AddNeighbors, AddNeighbors.buildCommand(neighborsList))
+    
+    async def removeNeighbors(self, neighborsList):
+        return await self._call(RemoveNeighbors, RemoveNeighbors.buildCommand(neighborsList))
+    
+    async def getTips(self):
+        return await self._call(GetTips, GetTips.buildCommand())
+    
+    async def findTransactions(self, addressesList):
+        return await self._chunked(FindTransactions, addressesList, lambda chunk: FindTransactions.buildCommand(chunk))
+    
+    async def getTrytes(self, hashesList):
+        return await self._chunked(GetTrytes, hashesList, lambda chunk: GetTrytes.buildCommand(chunk))
+    
+    async def getInclusionStates(self, transactionsList, tipsList):
+        return await self._call(GetInclusionStates, GetInclusionStates.buildCommand(transactionsList, tipsList))
+    
+    async def getBalance(self, addressesList, threshold):
+        return await self._chunked(GetBalance, addressesList, lambda chunk: GetBalance.buildCommand(chunk, threshold))
+    
+    async def getTransactionsToApprove(self, depth):
+        return await self._call(GetTransactionsToApprove, GetTransactionsToApprove.buildCommand(depth))
+    
+    async def attachToTangle(self, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList):
+        return await self._call(AttachToTangle, AttachToTangle.buildCommand(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList))
+    
+    async def interruptAttachingToTangle(self):
+        return await self._call(InterruptAttachingToTangle, InterruptAttachingToTangle.buildCommand())
+    
+    async def broadcastTransactions(self, trytesList):
+        return await self._call(BroadcastTransactions, BroadcastTransactions.buildCommand(trytesList))
+    
+    async def storeTransactions(self, trytesList):
+        return await self._call(StoreTransactions, StoreTransactions.buildCommand(trytesList))
+    
+    async def _call(self, commandClass, command):
+        if self.retry is None:
+            jsonData = await self.transport.send(self.url, command)
+        else:
+            jsonData = await self.retry.callAsync(command['command'], lambda: self.transport.send(self.url, command))
+        return _wrapResponse(commandClass, jsonData)
+    
+    async def _chunked(self, commandClass, items, buildCommand):
+        chunks = _chunks(items, self.chunkSize)
+        if len(chunks) <= 1:
+            return await self._call(commandClass, buildCommand(items))
+        results = await asyncio.gather(*[self._call(commandClass, buildCommand(chunk)) for chunk in chunks])
+        return _wrapResponse(commandClass, commandClass.mergeResponses([result.jsonData for result in results]))
+
+
+class ResponseCache:
+    """ LRU cache for node responses, shared by all commands of an Api.
+        Trytes of transactions never change and are kept until the cache is full, the same holds for confirmed inclusion states.
+        Volatile responses (getNodeInfo, getTips, getBalances) are only kept for a short time to live.
+        Constructor:
+            capacity (integer): Maximum number of entries, the least recently used entry is evicted first.
+            ttl (dict): Time to live in seconds of volatile responses by command name, missing commands are not cached.
+    
+        Methods:
+            get: Return a cached value or None.
+            put: Store a value, optionally with a time to live in seconds.
+            stats: Hits and misses per kind of entry.
+            clear: Remove all entries.
+    """
+    
+    defaultTtl = {'getNodeInfo': 1.0, 'getTips': 1.0, 'getBalances': 5.0}
+    
+    def __init__(self, capacity=100000, ttl=None):
+        self.capacity = capacity
+        self.ttl = dict(self.defaultTtl, **(ttl or {}))
+        self._entries = collections.OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            counters = self._stats.setdefault(key[0], {'hits': 0, 'misses': 0})
+            if entry is None:
+                counters['misses'] += 1
+                return None
+            counters['hits'] += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def put(self, key, value, ttl=None):
+        if ttl is not None and ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+    
+    def stats(self):
+        with self._lock:
+            stats = dict((kind, dict(counters)) for kind, counters in self._stats.items())
+        for counters in stats.values():
+            total = counters['hits'] + counters['misses']
+            counters['hitRatio'] = counters['hits'] / total if total else 0.0
+        return stats
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class HttpTransport:
+    """ Sends commands to IRI nodes over a pool of persistent HTTP/1.1 keep-alive connections per node.
+        Connections are reused between calls, so polling a node does not pay a new TCP (and TLS) handshake for every command.
+        At most maxConnections sockets are open per node at any time, further callers wait until a connection is handed back.
+        Errors are raised as ApiError subclasses.
+        Constructor:
+            maxConnections (integer): Maximum number of open connections per node.
+            timeout (float): Socket timeout in seconds, long enough for attachToTangle on the node by default, None to block
+                             without timeout. A node which does not answer in time raises NodeTimeout.
+            breaker (CircuitBreaker): Circuit breaker which fails requests to a node fast while it is down, None to always send.
+            instrumentation (Instrumentation): Receives every command sent, None to not measure anything.
+    
+        Methods:
+            send: Send a command to a node and return the decoded JSON response.
+            post: Send an already encoded request body and return the raw response body.
+            stream: Send a command and return a ResponseStream over one list of the response, decoded while it is received.
+            close: Close all pooled connections.
+        send, post and stream take an optional CancelToken which aborts the request from another thread.
+    """
+    
+    headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
+    # Maximum number of bytes a stream reads from the socket at once.
+    streamChunkSize = 65536
+    
+    def __init__(self, maxConnections=10, timeout=120.0, breaker=None, instrumentation=None):
+        self.maxConnections = maxConnections
+        self.timeout = timeout
+        self.breaker = breaker
+        self.instrumentation = instrumentation
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+    
+    def send(self, url, command, cancel=None):
+        stringified = json.dumps(command).encode('utf-8')
+        instrumentation = self.instrumentation
+        event = instrumentation.started(url, command['command'], len(stringified)) if instrumentation is not None else None
+        try:
+            returnData = self.post(url, stringified, cancel)
+            jsonData = _decodeResponse(url, command, returnData)
+        except ApiError as e:
+            e.command = command['command']
+            if event is not None:
+                instrumentation.finished(event, error=e)
+            raise
+        if event is not None:
+            instrumentation.finished(event, len(returnData), jsonData)
+        return jsonData
+    
+    def post(self, url, body, cancel=None):
+        node, path = self._split(url)
+        with self._guard(url):
+            return self._post(url, node, path, body, cancel)
+    
+    def stream(self, url, command, key, cancel=None):
+        jsonData = {}
+        return ResponseStream(self._stream(url, command, key, cancel, jsonData), jsonData)
+    
+    def _post(self, url, node, path, body, cancel):
+        slots = self._nodeSlots(node)
+        slots.acquire()
+        try:
+            connection, response = self._request(url, node, path, body, cancel)
+            try:
+                returnData = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                raise self._failed(url, connection, cancel, e)
+            except BaseException:
+                connection.close()
+                raise
+            self._finish(node, connection, response, cancel)
+        finally:
+            slots.release()
+        if not 200 <= response.status < 300:
+            raise _statusError(url, response.status, response.reason, returnData)
+        return returnData
+    
+    def _stream(self, url, command, key, cancel, jsonData):
+        """ Generator behind stream, it holds a connection of the node until the response is read or the generator is closed. """
+        body = json.dumps(command).encode('utf-8')
+        node, path = self._split(url)
+        instrumentation = self.instrumentation
+        event = instrumentation.started(url, command['command'], len(body)) if instrumentation is not None else None
+        received = 0
+        try:
+            with self._guard(url):
+                slots = self._nodeSlots(node)
+                slots.acquire()
+                try:
+                    connection, response = self._request(url, node, path, body, cancel)
+                    try:
+                        if not 200 <= response.status < 300:
+                            raise _statusError(url, response.status, response.reason, response.read())
+                        parser = _JsonListParser(key)
+                        while True:
+                            data = response.read1(self.streamChunkSize)
+                            if not data:
+                                break
+                            received += len(data)
+                            yield from parser.feed(data)
+                        # read1 leaves a response open after its last byte, the connection would refuse the next request.
+                        response.close()
+                        jsonData.update(parser.close())
+                    except (http.client.HTTPException, OSError) as e:
+                        raise self._failed(url, connection, cancel, e)
+                    except ValueError as e:
+                        connection.close()
+                        raise InvalidResponse('Invalid JSON response: %s' % e, url)
+                    except BaseException:
+                        # Also a stream closed before its end, the rest of the response is still on the connection.
+                        connection.close()
+                        raise
+                    self._finish(node, connection, response, cancel)
+                finally:
+                    slots.release()
+        except ApiError as e:
+            e.command = command['command']
+            if event is not None:
+                instrumentation.finished(event, received, error=e)
+            raise
+        if event is not None:
+            instrumentation.finished(event, received, jsonData)
+    
+    @contextlib.contextmanager
+    def _guard(self, url):
+        """ Apply the circuit breaker of the node to the request sent in the with block. """
+        if self.breaker is None:
+            yield
+            return
+        name = _nodeName(url)
+        if not self.breaker.allow(name):
+            raise CircuitOpen('Circuit of the node is open', url)
+        try:
+            yield
+        except ApiError as e:
+            if e.nodeFailure:
+                self.breaker.failure(name)
+            elif isinstance(e, RequestCancelled):
+                self.breaker.release(name)
+            else:
+                self.breaker.success(name)
+            raise
+        except BaseException:
+            self.breaker.release(name)
+            raise
+        self.breaker.success(name)
+    
+    def _request(self, url, node, path, body, cancel):
+        """ Send a request on a pooled connection and return the connection and the response as soon as its headers arrived. """
+        # A pooled connection may have been closed by the node while idle. Retry once on a fresh
+        # connection in that case, the request cannot have been processed if nothing came back.
+        while True:
+            connection, reused = self._acquire(node)
+            try:
+                if cancel is not None:
+                    cancel._attach(connection)
+                connection.request('POST', path, body, self.headers)
+                return connection, connection.getresponse()
+            except (http.client.HTTPException, OSError) as e:
+                error = self._failed(url, connection, cancel, e, reused)
+                if error is not None:
+                    raise error
+            except BaseException:
+                connection.close()
+                raise
+    
+    def _failed(self, url, connection, cancel, error, reused=False):
+        """ Close a connection after a socket or protocol error and return the ApiError to raise, None if the connection was a
+            reused one which should be replaced by a new one.
+        """
+        connection.close()
+        if cancel is not None and cancel._detach():
+            return RequestCancelled('Request was cancelled', url)
+        if isinstance(error, socket.timeout):
+            return NodeTimeout('Node did not respond in time', url)
+        if reused:
+            return None
+        return NodeUnreachable(str(error), url)
+    
+    def _finish(self, node, connection, response, cancel):
+        """ Hand a connection whose response was read completely back to the pool. """
+        # A connection whose socket was shut down by a late cancel must not go back to the pool.
+        if response.will_close or cancel is not None and cancel._detach():
+            connection.close()
+        else:
+            self._release(node, connection)
+    
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+    
+    def _split(self, url):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        return (parts.scheme, parts.hostname, parts.port), path
+    
+    def _nodeSlots(self, node):
+        with self._lock:
+            if node not in self._slots:
+                self._slots[node] = threading.BoundedSemaphore(self.maxConnections)
+            return self._slots[node]
+    
+    def _acquire(self, node):
+        with self._lock:
+            connections = self._idle.get(node)
+            if connections:
+                return connections.pop(), True
+        scheme, host, port = node
+        options = {} if self.timeout is None else {'timeout': self.timeout}
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, **options), False
+        return http.client.HTTPConnection(host, port, **options), False
+    
+    def _release(self, node, connection):
+        with self._lock:
+            self._idle.setdefault(node, []).append(connection)
+
+
+class ResponseStream:
+    """ Iterator over the elements of one list of a JSON response, e.g. the trytes of getTrytes, which are decoded while the
+        response is still being received. Only the undecoded rest of the last chunk read from the socket is held, so the
+        memory needed does not grow with the size of the response. The stream holds a connection of the node until it is
+        exhausted or closed.
+        Attributes:
+            jsonData (dict): The other fields of the response, e.g. duration, complete once the stream is exhausted.
+    
+        Methods:
+            close: Stop reading the response and close its connection.
+    """
+    
+    def __init__(self, elements, jsonData):
+        self.jsonData = jsonData
+        self._elements = elements
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        return next(self._elements)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        close = getattr(self._elements, 'close', None)
+        if close is not None:
+            close()
+
+
+class _JsonListParser:
+    """ Incremental parser of a JSON object, which returns the elements of the list under key as soon as they are complete.
+        The other fields of the object are collected in fields.
+    """
+    
+    _WHITESPACE = ' \t\r\n'
+    
+    def __init__(self, key):
+        self.key = key
+        self.fields = {}
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._state = 'object'
+        self._field = None
+        self._final = False
+    
+    def feed(self, data):
+        """ Parse the next bytes of the response and return the list elements completed by them. """
+        self._buffer = self._buffer[self._position:] + self._decoder.decode(data)
+        self._position = 0
+        elements = []
+        while self._step(elements):
+            pass
+        return elements
+    
+    def close(self):
+        """ Parse the end of the response and return the other fields, raises ValueError if the response is incomplete. """
+        self._final = True
+        self.feed(b'')
+        if self._state != 'end' or self._buffer[self._position:].strip(self._WHITESPACE):
+            raise ValueError('Incomplete response')
+        return self.fields
+    
+    def _step(self, elements):
+        """ Consume one token of the buffer, returns False when more data is needed. """
+        buffer = self._buffer
+        position = self._position
+        while position < len(buffer) and buffer[position] in self._WHITESPACE:
+            position += 1
+        self._position = position
+        if position == len(buffer):
+            return False
+        char = buffer[position]
+        state = self._state
+        if state == 'object':
+            self._expect(char, '{', 'key')
+        elif state == 'key':
+            if char == '}':
+                self._state, self._position = 'end', position + 1
+                return True
+            self._field = self._value()
+            if self._field is None:
+                return False
+            self._state = 'colon'
+        elif state == 'colon':
+            self._expect(char, ':', 'value')
+        elif state == 'value':
+            if self._field == self.key and char == '[':
+                self._state, self._position = 'list', position + 1
+                return True
+            value = self._value()
+            if value is None and self._position == position:
+                return False
+            self.fields[self._field] = value
+            self._state = 'next'
+        elif state == 'next':
+            self._expect(char, ',}', 'key' if char == ',' else 'end')
+        elif state == 'list':
+            if char == ']':
+                self._state, self._position = 'next', position + 1
+                return True
+            value = self._value()
+            if value is None and self._position == position:
+                return False
+            elements.append(value)
+            self._state = 'element'
+        elif state == 'element':
+            self._expect(char, ',]', 'list' if char == ',' else 'next')
+        else:
+            raise ValueError('Unexpected %r after the end of the response' % char)
+        return True
+    
+    def _expect(self, char, expected, state):
+        if char not in expected:
+            raise ValueError('Expected %s but found %r' % (' or '.join(repr(c) for c in expected), char))
+        self._state = state
+        self._position += 1
+    
+    def _value(self):
+        """ Decode the JSON value at the current position and move behind it. Returns None without moving if the value is not
+            complete yet, a number or literal is only complete once a character following it was received which cannot
+            continue it.
+        """
+        buffer = self._buffer
+        try:
+            value, end = self._json.raw_decode(buffer, self._position)
+        except ValueError:
+            if self._final:
+                raise
+            return None
+        if not self._final and (end == len(buffer) or isinstance(value, (int, float)) and buffer[end] in '.eE'):
+            return None
+        self._position = end
+        return value
+
+
+class CancelToken:
+    """ Aborts a request of HttpTransport from another thread by shutting down the socket it is waiting on.
+        The cancelled request raises RequestCancelled.
+    
+        Methods:
+            cancel: Abort the request, a request which has not started yet is aborted when it starts.
+            cancelled: True once cancel was called.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self._cancelled = False
+    
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            connection = self._connection
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+    
+    def cancelled(self):
+        return self._cancelled
+    
+    def _attach(self, connection):
+        with self._lock:
+            if self._cancelled:
+                raise RequestCancelled('Request was cancelled')
+            self._connection = connection
+    
+    def _detach(self):
+        with self._lock:
+            self._connection = None
+            return self._cancelled
+
+
+class Instrumentation:
+    """ Measures the requests of the transports it is given to. Hooks are called before every request and after every response,
+        and the wall time and node reported duration of every command are kept in a LatencyHistogram per command.
+        A hook gets the event dict of the request, with the keys command, url, requestSize and start (time.monotonic()) before the request and additionally
+        responseSize, latency (wall time in seconds), duration (reported by the node in seconds), status (HTTP status) and error
+        (name of the ApiError or None) after it. Exceptions of hooks are not caught.
+        Constructor:
+            significantDigits (integer): Precision of the histograms.
+    
+        Methods:
+            onRequest: Add a hook called before every request.
+            onResponse: Add a hook called after every response or failed request.
+            started: Report a request which is about to be sent and return its event.
+            finished: Report the end of a request.
+            histogram: LatencyHistogram of the wall time of a command.
+            stats: Counts, sizes and latency percentiles per command as a dict.
+            prometheus: The same statistics in the Prometheus text exposition format.
+            reset: Forget all measurements.
+    """
+    
+    def __init__(self, significantDigits=2):
+        self.significantDigits = significantDigits
+        self._requestHooks = []
+        self._responseHooks = []
+        self._commands = {}
+        self._lock = threading.Lock()
+    
+    def onRequest(self, hook):
+        self._requestHooks.append(hook)
+        return hook
+    
+    def onResponse(self, hook):
+        self._responseHooks.append(hook)
+        return hook
+    
+    def started(self, url, command, requestSize):
+        event = {'command': command, 'url': url, 'requestSize': requestSize, 'start': time.monotonic()}
+        for hook in self._requestHooks:
+            hook(event)
+        return event
+    
+    def finished(self, event, responseSize=0, jsonData=None, error=None):
+        event['latency'] = time.monotonic() - event['start']
+        duration = jsonData.get('duration') if isinstance(jsonData, dict) else None
+        event['duration'] = duration / 1000.0 if duration is not None else None
+        event['responseSize'] = responseSize
+        event['status'] = getattr(error, 'status', None) if error is not None else 200
+        event['error'] = error.__class__.__name__ if error is not None else None
+        with self._lock:
+            stats = self._commands.get(event['command'])
+            if stats is None:
+                stats = self._commands[event['command']] = _CommandStats(self.significantDigits)
+            stats.requests += 1
+            stats.errors += error is not None
+            stats.requestBytes += event['requestSize']
+            stats.responseBytes += responseSize
+            stats.latency.record(event['latency'])
+            if event['duration'] is not None:
+                stats.duration.record(event['duration'])
+        for hook in self._responseHooks:
+            hook(event)
+    
+    def histogram(self, command):
+        with self._lock:
+            stats = self._commands.get(command)
+            return stats.latency if stats is not None else None
+    
+    def stats(self):
+        with self._lock:
+            return dict((command, {'requests': stats.requests, 'errors': stats.errors, 'requestBytes': stats.requestBytes,
+                                   'responseBytes': stats.responseBytes, 'latency': stats.latency.stats(), 'duration': stats.duration.stats()})
+                        for command, stats in self._commands.items())
+    
+    def prometheus(self, prefix='iota', quantiles=(0.5, 0.9, 0.99, 0.999)):
+        lines = []
+        with self._lock:
+            commands = sorted(self._commands.items())
+            for metric, attribute, description in (('request_duration_seconds', 'latency', 'Wall time of requests to the node.'),
+                                                   ('node_duration_seconds', 'duration', 'Duration of requests reported by the node.')):
+                lines.append('# HELP %s_%s %s' % (prefix, metric, description))
+                lines.append('# TYPE %s_%s summary' % (prefix, metric))
+                for command, stats in commands:
+                    histogram = getattr(stats, attribute)
+                    for quantile in quantiles:
+                        value = repr(histogram.percentile(quantile * 100)) if histogram.count else 'NaN'
+                        lines.append('%s_%s{command="%s",quantile="%s"} %s' % (prefix, metric, command, quantile, value))
+                    lines.append('%s_%s_sum{command="%s"} %r' % (prefix, metric, command, histogram.total))
+                    lines.append('%s_%s_count{command="%s"} %d' % (prefix, metric, command, histogram.count))
+            for metric, attribute, description in (('requests_total', 'requests', 'Number of requests.'),
+                                                   ('request_errors_total', 'errors', 'Number of failed requests.'),
+                                                   ('request_bytes_total', 'requestBytes', 'Bytes of request bodies sent.'),
+                                                   ('response_bytes_total', 'responseBytes', 'Bytes of response bodies received.')):
+                lines.append('# HELP %s_%s %s' % (prefix, metric, description))
+                lines.append('# TYPE %s_%s counter' % (prefix, metric))
+                for command, stats in commands:
+                    lines.append('%s_%s{command="%s"} %d' % (prefix, metric, command, getattr(stats, attribute)))
+        return '\n'.join(lines) + '\n'
+    
+    def reset(self):
+        with self._lock:
+            self._commands = {}
+
+
+class _CommandStats:
+    """ Measurements of one command of an Instrumentation. """
+    
+    __slots__ = ('requests', 'errors', 'requestBytes', 'responseBytes', 'latency', 'duration')
+    
+    def __init__(self, significantDigits):
+        self.requests = 0
+        self.errors = 0
+        self.requestBytes = 0
+        self.responseBytes = 0
+        self.latency = LatencyHistogram(significantDigits)
+        self.duration = LatencyHistogram(significantDigits)
+
+
+class LatencyHistogram:
+    """ HDR style histogram of durations. Values are counted in microseconds in buckets whose width grows with the value, so every
+        recorded value is known to significantDigits decimal digits while the histogram stays small for any range of values.
+        Constructor:
+            significantDigits (integer): Number of significant decimal digits kept of every value.
+    
+        Methods:
+            record: Count a duration in seconds.
+            percentile: Duration in seconds below which the given percentage of the recorded values lie.
+            stats: Count, sum, minimum, maximum, mean and common percentiles as a dict.
+    """
+    
+    def __init__(self, significantDigits=2):
+        self._subBucketBits = (2 * 10 ** significantDigits - 1).bit_length()
+        self._subBucketCount = 1 << self._subBucketBits
+        self._counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+    
+    def record(self, seconds):
+        value = max(0, int(seconds * 1000000))
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.minimum = seconds if self.minimum is None else min(self.minimum, seconds)
+        self.maximum = seconds if self.maximum is None else max(self.maximum, seconds)
+    
+    def percentile(self, percentile):
+        if not self.count:
+            return 0.0
+        rank = max(1, int(math.ceil(percentile / 100.0 * self.count)))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                return min(self.maximum, max(self.minimum, self._value(index) / 1000000.0))
+        return self.maximum
+    
+    def stats(self):
+        return {'count': self.count, 'sum': self.total, 'min': self.minimum, 'max': self.maximum,
+                'mean': self.total / self.count if self.count else None,
+                'p50': self.percentile(50), 'p90': self.percentile(90), 'p99': self.percentile(99), 'p999': self.percentile(99.9)}
+    
+    def _index(self, value):
+        if value < self._subBucketCount:
+            return value
+        shift = value.bit_length() - self._subBucketBits
+        half = self._subBucketCount >> 1
+        return self._subBucketCount + (shift - 1) * half + (value >> shift) - half
+    
+    def _value(self, index):
+        """ Middle of the range of values counted in a bucket. """
+        if index < self._subBucketCount:
+            return index
+        half = self._subBucketCount >> 1
+        shift = (index - self._subBucketCount) // half + 1
+        subBucket = (index - self._subBucketCount) % half + half
+        return (subBucket << shift) + (1 << (shift - 1))
+
+
+class RetryPolicy:
+    """ Repeats commands which failed with a retryable ApiError (connection problems, timeouts, HTTP 5xx, 408 and 429), waiting an
+        exponentially growing delay between the attempts. With jitter the delay is a random time up to that value, so clients which
+        failed at the same time do not retry at the same time. Write commands are only retried with retryWrites or an entry in commands.
+        Constructor:
+            attempts (integer): Maximum number of attempts of a command including the first one.
+            backoff (float): Delay in seconds before the first retry.
+            multiplier (float): Factor the delay grows by with every further retry.
+            maxBackoff (float): Upper limit of the delay in seconds.
+            jitter (bool): Wait a random time between 0 and the delay instead of the delay itself.
+            retryWrites (bool): Also retry write commands like broadcastTransactions.
+            commands (dict): RetryPolicy by command name used instead of this one, e.g. {'storeTransactions': RetryPolicy(attempts=5)}.
+    
+        Methods:
+            policyFor: Return the policy used for a command.
+            delay: Seconds to wait before a given retry.
+            call: Call a function until it succeeds or the policy gives up.
+            callAsync: Await a coroutine function until it succeeds or the policy gives up.
+    """
+    
+    def __init__(self, attempts=4, backoff=0.1, multiplier=2.0, maxBackoff=10.0, jitter=True, retryWrites=False, commands=None):
+        if attempts < 1:
+            raise ValueError('A command needs at least one attempt')
+        self.attempts = attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.maxBackoff = maxBackoff
+        self.jitter = jitter
+        self.retryWrites = retryWrites
+        self.commands = dict(commands or {})
+    
+    def policyFor(self, command):
+        policy = self.commands.get(command)
+        if policy is not None:
+            return policy
+        if command in WRITE_COMMANDS and not self.retryWrites:
+            return None
+        return self
+    
+    def delay(self, retry):
+        """ Seconds to wait before the given retry, the first retry is 1. """
+        delay = min(self.maxBackoff, self.backoff * self.multiplier ** (retry - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+    
+    def call(self, command, function):
+        policy = self.policyFor(command)
+        attempt = 1
+        while True:
+            try:
+                return function()
+            except ApiError as e:
+                if policy is None or not e.retryable or attempt >= policy.attempts:
+                    raise
+            time.sleep(policy.delay(attempt))
+            attempt += 1
+    
+    async def callAsync(self, command, function):
+        policy = self.policyFor(command)
+        attempt = 1
+        while True:
+            try:
+                return await function()
+            except ApiError as e:
+                if policy is None or not e.retryable or attempt >= policy.attempts:
+                    raise
+            await asyncio.sleep(policy.delay(attempt))
+            attempt += 1
+
+
+class RetryingTransport:
+    """ Transport which sends commands through another transport and repeats them according to a RetryPolicy.
+        Other attributes are looked up on the wrapped transport.
+        Constructor:
+            transport (HttpTransport): Transport the requests are sent through.
+            retry (RetryPolicy): Policy deciding which failed commands are repeated and when.
+    
+        Methods:
+            send: Send a command and return the decoded JSON response.
+            close: Close the wrapped transport.
+    """
+    
+    def __init__(self, transport, retry):
+        self.transport = transport
+        self.retry = retry
+    
+    def __getattr__(self, name):
+        return getattr(self.transport, name)
+    
+    def send(self, url, command, cancel=None):
+        return self.retry.call(command['command'], lambda: self.transport.send(url, command, cancel))
+    
+    def close(self):
+        self.transport.close()
+
+
+class CircuitBreaker:
+    """ Fails requests to a node fast while the node is down, instead of letting every caller wait for a timeout.
+        After failureThreshold requests in a row failed because of the node, its circuit opens and requests raise CircuitOpen without
+        being sent. After resetTimeout seconds a single trial request is let through: if it succeeds the circuit closes again, if it
+        fails the circuit stays open for another resetTimeout. One breaker keeps the state of every node (identified by scheme,
+        host and port of its URL) and can be shared by transports.
+        Constructor:
+            failureThreshold (integer): Number of failed requests in a row which open the circuit.
+            resetTimeout (float): Seconds the circuit stays open before a trial request.
+    
+        Methods:
+            allow: Return whether a request to a node may be sent now.
+            success: Record a request the node answered.
+            failure: Record a request which failed because of the node.
+            release: Record a request which ended without telling anything about the node.
+            state: State of the circuit of a node URL, 'closed', 'open' or 'halfOpen'.
+    """
+    
+    def __init__(self, failureThreshold=5, resetTimeout=30.0):
+        self.failureThreshold = failureThreshold
+        self.resetTimeout = resetTimeout
+        self._lock = threading.Lock()
+        # node -> [failures in a row, time the circuit may be tried again or None, trial request in flight]
+        self._nodes = {}
+    
+    def allow(self, node):
+        with self._lock:
+            circuit = self._nodes.get(node)
+            if circuit is None or circuit[1] is None:
+                return True
+            if circuit[2] or time.monotonic() < circuit[1]:
+                return False
+            circuit[2] = True
+            return True
+    
+    def success(self, node):
+        with self._lock:
+            self._nodes.pop(node, None)
+    
+    def failure(self, node):
+        with self._lock:
+            circuit = self._nodes.setdefault(node, [0, None, False])
+            circuit[0] += 1
+            if circuit[2] or circuit[0] >= self.failureThreshold:
+                circuit[1] = time.monotonic() + self.resetTimeout
+            circuit[2] = False
+    
+    def release(self, node):
+        with self._lock:
+            circuit = self._nodes.get(node)
+            if circuit is not None:
+                circuit[2] = False
+    
+    def state(self, url):
+        with self._lock:
+            circuit = self._nodes.get(_nodeName(url))
+            if circuit is None or circuit[1] is None:
+                return 'closed'
+            if circuit[2] or time.monotonic() >= circuit[1]:
+                return 'halfOpen'
+            return 'open'
+
+
+class AsyncHttpTransport:
+    """ Non-blocking HTTP/1.1 transport written against asyncio streams.
+        Keeps idle keep-alive connections per node and allows at most maxInFlight requests to run at the same time, further requests wait for a free slot.
+        Errors are raised as ApiError subclasses. The transport may be used from several event loops one after the other, e.g.
+        by several asyncio.run calls, the request slots and idle connections belong to the loop which uses it last.
+        Constructor:
+            maxInFlight (integer): Maximum number of concurrent requests.
+            maxIdleConnections (integer): Maximum number of idle connections kept open per node.
+            timeout (float): Timeout in seconds for a single request, long enough for attachToTangle on the node by default,
+                             None to wait without timeout.
+            breaker (CircuitBreaker): Circuit breaker which fails requests to a node fast while it is down, None to always send.
+            instrumentation (Instrumentation): Receives every command sent, None to not measure anything.
+    
+        Methods:
+            send: Send a command to a node and return the decoded JSON response.
+            post: Send an already encoded request body and return the raw response body.
+            close: Close all pooled connections.
+    """
+    
+    def __init__(self, maxInFlight=100, maxIdleConnections=10, timeout=120.0, breaker=None, instrumentation=None):
+        self.maxInFlight = maxInFlight
+        self.maxIdleConnections = maxIdleConnections
+        self.timeout = timeout
+        self.breaker = breaker
+        self.instrumentation = instrumentation
+        self._loop = None
+        self._inFlight = None
+        self._idle = {}
+    
+    async def send(self, url, command):
+        stringified = json.dumps(command).encode('utf-8')
+        instrumentation = self.instrumentation
+        event = instrumentation.started(url, command['command'], len(stringified)) if instrumentation is not None else None
+        try:
+            returnData = await self.post(url, stringified)
+            jsonData = _decodeResponse(url, command, returnData)
+        except ApiError as e:
+            e.command = command['command']
+            if event is not None:
+                instrumentation.finished(event, error=e)
+            raise
+        if event is not None:
+            instrumentation.finished(event, len(returnData), jsonData)
+        return jsonData
+    
+    async def post(self, url, body):
+        parts = urllib.parse.urlsplit(url)
+        node = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        request = ('POST %s HTTP/1.1\r\nHost: %s:%d\r\n' % (path, node[1], node[2])
+                   + ''.join('%s: %s\r\n' % header for header in HttpTransport.headers.items())
+                   + 'Content-Length: %d\r\n\r\n' % len(body)).encode('latin-1') + body
+        name = _nodeName(url)
+        if self.breaker is not None and not self.breaker.allow(name):
+            raise CircuitOpen('Circuit of the node is open', url)
+        self._bind()
+        try:
+            async with self._inFlight:
+                try:
+                    if self.timeout is None:
+                        status, reason, headers, returnData = await self._exchange(url, node, request)
+                    else:
+                        status, reason, headers, returnData = await asyncio.wait_for(self._exchange(url, node, request), self.timeout)
+                except asyncio.TimeoutError:
+                    raise NodeTimeout('Node did not respond in time', url)
+            if not 200 <= status < 300:
+                raise _statusError(url, status, reason, returnData)
+        except ApiError as e:
+            if self.breaker is not None:
+                (self.breaker.failure if e.nodeFailure else self.breaker.success)(name)
+            raise
+        except BaseException:
+            if self.breaker is not None:
+                self.breaker.release(name)
+            raise
+        if self.breaker is not None:
+            self.breaker.success(name)
+        return returnData
+    
+    async def close(self):
+        self._bind()
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for reader, writer in connections:
+                writer.close()
+    
+    def _bind(self):
+        """ Bind the request slots and the idle connections to the running event loop. Connections of an earlier loop can not
+            be used in this one, they are dropped.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for reader, writer in connections:
+                try:
+                    writer.close()
+                except RuntimeError:
+                    # The loop of the connection is closed already, the socket is closed when the connection is collected.
+                    pass
+        self._loop = loop
+        self._inFlight = asyncio.Semaphore(self.maxInFlight)
+    
+    async def _exchange(self, url, node, request):
+        while True:
+            connections = self._idle.get(node)
+            reused = bool(connections)
+            if reused:
+                reader, writer = connections.pop()
+            else:
+                try:
+                    reader, writer = await asyncio.open_connection(node[1], node[2], ssl=True if node[0] == 'https' else None)
+                except OSError as e:
+                    raise NodeUnreachable(str(e), url)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, reason, headers, returnData = await self._readResponse(reader)
+            except (asyncio.IncompleteReadError, http.client.HTTPException, OSError) as e:
+                writer.close()
+                # The node may have closed an idle connection, retry once on a fresh one.
+                if reused:
+                    continue
+                raise NodeUnreachable(str(e) or e.__class__.__name__, url)
+            except BaseException:
+                writer.close()
+                raise
+            if headers.get('connection', '').lower() == 'close' or len(self._idle.get(node, ())) >= self.maxIdleConnections:
+                writer.close()
+            else:
+                self._idle.setdefault(node, []).append((reader, writer))
+            return status, reason, headers, returnData
+    
+    async def _readResponse(self, reader):
+        statusLine = await reader.readline()
+        if not statusLine:
+            raise http.client.RemoteDisconnected('Remote end closed connection without response')
+        version, status, reason = (statusLine.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+        headers = http.client.HTTPMessage()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip()] = value.strip()
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            returnData = b''.join(chunks)
+        elif headers.get('content-length') is not None:
+            returnData = await reader.readexactly(int(headers['content-length']))
+        else:
+            returnData = await reader.read()
+            headers['connection'] = 'close'
+        return int(status), reason, headers, returnData
+
+
+# Commands which change the state of a node, they are never repeated on another node.
+WRITE_COMMANDS = frozenset(['attachToTangle', 'broadcastTransactions', 'storeTransactions', 'addNeighbors', 'removeNeighbors', 'interruptAttachingToTangle'])
+
+
+
+class ApiError(Exception):
+    """ Base class of the errors raised when a command could not be executed by a node.
+        Attributes:
+            url (str): URL of the node.
+            command (str): Name of the command.
+            retryable (bool): A later attempt of the same request may succeed.
+            nodeFailure (bool): The error is caused by the node, not by the request.
+    """
+    
+    retryable = False
+    nodeFailure = False
+    
+    def __init__(self, message, url=None, command=None):
+        Exception.__init__(self, message)
+        self.url = url
+        self.command = command
+    
+    def __str__(self):
+        message = Exception.__str__(self)
+        if self.command is not None:
+            message = '%s in command: %s' % (message, self.command)
+        return message
+
+
+class NodeUnreachable(ApiError):
+    """ The node could not be connected to or dropped the connection. """
+    
+    retryable = True
+    nodeFailure = True
+
+
+class NodeTimeout(NodeUnreachable):
+    """ The node did not respond in time. """
+
+
+class InvalidResponse(ApiError):
+    """ The response of the node is not valid JSON. """
+    
+    retryable = True
+    nodeFailure = True
+
+
+class RequestCancelled(ApiError):
+    """ The request was cancelled through its CancelToken. """
+
+
+class CircuitOpen(ApiError):
+    """ The circuit breaker of the node is open, the request was not sent. """
+    
+    nodeFailure = True
+
+
+class HttpStatusError(ApiError):
+    """ The node answered with an HTTP error status.
+        Attributes:
+            status (integer): HTTP status code.
+            reason (str): HTTP reason phrase.
+            body (bytes): Body of the response.
+            error (str): Error message of the node, None if the body does not contain one.
+    """
+    
+    def __init__(self, url, status, reason, body, command=None):
+        try:
+            self.error = json.loads(body)['error']
+        except (ValueError, TypeError, KeyError):
+            self.error = None
+        message = 'HTTP Error %d: %s' % (status, reason) + (' (%s)' % self.error if self.error else '')
+        ApiError.__init__(self, message, url, command)
+        self.status = status
+        self.reason = reason
+        self.body = body
+        # 408 and 429 ask the client to come back later.
+        self.retryable = status >= 500 or status in (408, 429)
+        self.nodeFailure = status >= 500
+
+
+class ClientError(HttpStatusError):
+    """ The node rejected the request (HTTP status 4xx), e.g. because of an invalid parameter. """
+
+
+class ServerError(HttpStatusError):
+    """ The node failed to process the request (HTTP status 5xx). """
+
+
+def _statusError(url, status, reason, body):
+    return (ServerError if status >= 500 else ClientError)(url, status, reason, body)
+
+
+def _nodeName(url):
+    """ Return the scheme, host and port part of a node URL. """
+    parts = urllib.parse.urlsplit(url)
+    return '%s://%s' % (parts.scheme, parts.netloc)
+
+
+def _decodeResponse(url, command, returnData):
+    try:
+        return json.loads(returnData)
+    except ValueError as e:
+        raise InvalidResponse('Invalid JSON response: %s' % e, url, command['command'])
+
+
+_defaultTransport = None
+_defaultTransportLock = threading.Lock()
+
+def _getTransport(transport):
+    """ Return the given transport or the module wide transport shared by command classes created without one. """
+    global _defaultTransport
+    if transport is not None:
+        return transport
+    with _defaultTransportLock:
+        if _defaultTransport is None:
+            _defaultTransport = HttpTransport()
+        return _defaultTransport
+
+
+def _streamResponse(transport, url, command, key, cancel=None):
+    """ Return a ResponseStream over the list under key of the response, transports without stream send the command as usual. """
+    transport = _getTransport(transport)
+    if hasattr(transport, 'stream'):
+        return transport.stream(url, command, key, cancel)
+    jsonData = dict(transport.send(url, command))
+    return ResponseStream(iter(jsonData.pop(key)), jsonData)
+
+
+def _chunks(items, chunkSize):
+    """ Split a list into consecutive chunks of at most chunkSize elements. """
+    items = list(items)
+    if not chunkSize or len(items) <= chunkSize:
+        return [items]
+    return [items[i:i + chunkSize] for i in range(0, len(items), chunkSize)]
+
+
+def _wrapResponse(commandClass, jsonData):
+    """ Create a result object of the given command class from an already received JSON response. """
+    result = commandClass.__new__(commandClass)
+    result.jsonData = jsonData
+    return result
+
+
+TRYTE_ALPHABET = '9ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_TRYTE_VALUES = dict((ord(char), value if value <= 13 else value - 27) for value, char in enumerate(TRYTE_ALPHABET))
+
+def _trytesToInt(trytes):
+    """ Return the balanced ternary value of ASCII encoded trytes, least significant tryte first. """
+    value = 0
+    for code in reversed(bytes(trytes)):
+        value = value * 27 + _TRYTE_VALUES[code]
+    return value
 
 
 class StoreTransactions:
@@ -77,24 +2191,22 @@ class StoreTransactions:
         Constructor:
             url (str): URL of node sever including port
             trytes (array of strings): List of raw data of transactions to be rebroadcast.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             duration: Duration of request.
             jsonResponse: Return the complete JSON response.
     """
     
-    def __init__(self, url, trytesList):
-        command = {'command': 'storeTransactions', 'trytes': [', '.join('{0}'.format(w) for w in trytesList)] if len(trytesList) > 0 else []}
+    @staticmethod
+    def buildCommand(trytesList):
+        return {'command': 'storeTransactions', 'trytes': list(trytesList)}
+
+    def __init__(self, url, trytesList, transport=None):
+        command = self.buildCommand(trytesList)
         
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+        self.jsonData = _getTransport(transport).send(url, command)
     
     def duration(self):
         return self.jsonData["duration"]
@@ -107,23 +2219,21 @@ class BroadcastTransactions:
         Constructor:
             url (str): URL of node sever including port
             trytes (array of strings): List of raw data of transactions to be rebroadcast.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             duration: Duration of request.
             jsonResponse: Return the complete JSON response.
     """
     
-    def __init__(self, url, trytesList):
-        command = {'command': 'broadcastTransactions', 'trytes': [', '.join('{0}'.format(w) for w in trytesList)] if len(trytesList) > 0 else []}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand(trytesList):
+        return {'command': 'broadcastTransactions', 'trytes': list(trytesList)}
+
+    def __init__(self, url, trytesList, transport=None):
+        command = self.buildCommand(trytesList)
+        self.jsonData = _getTransport(transport).send(url, command)
     
     def duration(self):
         return self.jsonData["duration"]
@@ -135,22 +2245,20 @@ class InterruptAttachingToTangle:
     """ Interrupts and completely aborts the attachToTangle process.
         Constructor:
             url (str): URL of node sever including port
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             jsonResponse: Return the complete JSON response.
     """
     
-    def __init__(self, url):
-        command = {'command': 'interruptAttachingToTangle'}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand():
+        return {'command': 'interruptAttachingToTangle'}
+
+    def __init__(self, url, transport=None):
+        command = self.buildCommand()
+        self.jsonData = _getTransport(transport).send(url, command)
 
     def jsonResponse(self):
         return self.jsonData
@@ -166,23 +2274,21 @@ class AttachToTangle:
             branchTransaction (str): Branch transaction to approve.
             minWeightMagnitude (integer): Proof of Work intensity. Minimum value is 18
             trytes (str): List of trytes (raw transaction data) to attach to the tangle.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             trytes: List of added trytes.
             jsonResponse: Return the complete JSON response.
     """
     
-    def __init__(self, url, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList):
-        command = {'command': 'attachToTangle', 'trunkTransaction': trunkTransaction, 'branchTransaction': branchTransaction, 'minWeightMagnitude': minWeightMagnitude, 'trytes': [', '.join('{0}'.format(w) for w in trytesList)] if len(trytesList) > 0 else []}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList):
+        return {'command': 'attachToTangle', 'trunkTransaction': trunkTransaction, 'branchTransaction': branchTransaction, 'minWeightMagnitude': minWeightMagnitude, 'trytes': list(trytesList)}
+
+    def __init__(self, url, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList, transport=None):
+        command = self.buildCommand(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList)
+        self.jsonData = _getTransport(transport).send(url, command)
             
     def trytes(self):
         return self.jsonData["trytes"]
@@ -197,8 +2303,10 @@ class GetTransactionsToApprove:
         Constructor:
             url (str): URL of node sever including port
             depth (integer): Number of bundles to go back to determine the transactions for approval.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             trunkTransaction : The transaction of the trunk.
             branchTransaction: The transaction of the branch.
             duration: Duration of request.
@@ -206,17 +2314,13 @@ class GetTransactionsToApprove:
     """
     
     
-    def __init__(self, url, depth):
-        command = {'command': 'getTransactionsToApprove', 'depth': depth}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand(depth):
+        return {'command': 'getTransactionsToApprove', 'depth': depth}
+
+    def __init__(self, url, depth, transport=None):
+        command = self.buildCommand(depth)
+        self.jsonData = _getTransport(transport).send(url, command)
             
     def trunkTransaction(self):
         return self.jsonData["trunkTransaction"]
@@ -239,25 +2343,32 @@ class GetBalance:
             url (str): URL of node sever including port
             addressList (array of strings): List of addresses you want to get the confirmed balance from
             threshold (integer): Confirmation threshold, should be set to 100.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
+            mergeResponses: Merge the JSON responses of several chunks, the milestone is the oldest one seen by any chunk.
             balances : List of balances.
             references: The referencing tips.
             milestoneIndex: Index number of milestone.
             jsonResponse: Return the complete JSON response.
     """
     
-    def __init__(self, url, addressesList, threshold):
-        command = {'command': 'getBalances', 'addresses': [', '.join('{0}'.format(w) for w in addressesList)] if len(addressesList) > 0 else [], 'threshold' : threshold}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand(addressesList, threshold):
+        return {'command': 'getBalances', 'addresses': list(addressesList), 'threshold' : threshold}
+
+    @staticmethod
+    def mergeResponses(responses):
+        oldest = min(responses, key=lambda response: response['milestoneIndex'])
+        return {'balances': [balance for response in responses for balance in response['balances']],
+                'references': oldest['references'],
+                'milestoneIndex': oldest['milestoneIndex'],
+                'duration': sum(response.get('duration', 0) for response in responses)}
+
+    def __init__(self, url, addressesList, threshold, transport=None):
+        command = self.buildCommand(addressesList, threshold)
+        self.jsonData = _getTransport(transport).send(url, command)
             
     def balances(self):
         return self.jsonData["balances"]
@@ -283,24 +2394,22 @@ class GetInclusionStates:
             url (str): URL of node sever including port
             transactionsList (array of strings): List of transactions you want to get the inclusion state for.
             tipsList (array of strings): List of tips (including milestones) you want to search for the inclusion state.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             states : Number of states.
             duration: Duration of request.
             jsonResponse: Return the complete JSON response.
     """
     
-    def __init__(self, url, transactionsList, tipsList):
-        command = {'command': 'getInclusionStates', 'transactions': [', '.join('{0}'.format(w) for w in transactionsList)] if len(transactionsList) > 0 else [], 'tips': [', '.join('{0}'.format(w) for w in tipsList)] if len(tipsList) > 0 else []}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand(transactionsList, tipsList):
+        return {'command': 'getInclusionStates', 'transactions': list(transactionsList), 'tips': list(tipsList)}
+
+    def __init__(self, url, transactionsList, tipsList, transport=None):
+        command = self.buildCommand(transactionsList, tipsList)
+        self.jsonData = _getTransport(transport).send(url, command)
             
     def states(self):
         return self.jsonData["states"]
@@ -317,31 +2426,179 @@ class GetTrytes:
         Constructor:
             url (str): URL of node sever including port
             hashesList (array of strings): List of transaction hashes of which you want to get trytes from.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
+            mergeResponses: Merge the JSON responses of several chunks, trytes keep the input order.
+            stream: Send the command and return a ResponseStream of the trytes, decoded while the response is received.
             trytes : List of trytes.
+            transactions: List of Transaction objects parsed lazily from the trytes, None for missing trytes.
+            transactionBatch: All transactions as columnar TransactionBatch (requires NumPy).
             jsonResponse: Return the complete JSON response.
     """
     
     
-    def __init__(self, url, hashesList):
-        command = {'command': 'getTrytes', 'hashes': [', '.join('{0}'.format(w) for w in hashesList)] if len(hashesList) > 0 else []}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand(hashesList):
+        return {'command': 'getTrytes', 'hashes': list(hashesList)}
+
+    @staticmethod
+    def mergeResponses(responses):
+        return {'trytes': [trytes for response in responses for trytes in response['trytes']],
+                'duration': sum(response.get('duration', 0) for response in responses)}
+
+    @classmethod
+    def stream(cls, url, hashesList, transport=None):
+        return _streamResponse(transport, url, cls.buildCommand(hashesList), 'trytes')
+
+    def __init__(self, url, hashesList, transport=None):
+        command = self.buildCommand(hashesList)
+        self.jsonData = _getTransport(transport).send(url, command)
             
     def trytes(self):
         return self.jsonData["trytes"]
     
+    def transactions(self):
+        # All transactions share one buffer and only remember their offset into it.
+        trytesList = self.jsonData["trytes"]
+        buffer = ''.join(trytes for trytes in trytesList if trytes is not None).encode('ascii')
+        transactions = []
+        offset = 0
+        for trytes in trytesList:
+            if trytes is None:
+                transactions.append(None)
+                continue
+            transactions.append(Transaction(buffer, offset))
+            offset += Transaction.trytesLength
+        return transactions
+    
+    def transactionBatch(self):
+        import transactionbatch
+        return transactionbatch.TransactionBatch(self.jsonData["trytes"])
+    
     def jsonResponse(self):
         return self.jsonData
-        
+
+
+class Transaction:
+    """ A transaction parsed from its 2673 trytes. The object only keeps a reference to the raw trytes and an offset into them,
+        every field is decoded the first time it is read and cached afterwards. Transactions created by GetTrytes.transactions
+        share a single buffer, which stays in memory as long as one of them is referenced.
+        Constructor:
+            trytes (str or bytes): Raw trytes of the transaction or a buffer holding several transactions back to back.
+            offset (integer): Position of the transaction within trytes.
+    
+        Methods:
+            trytes: Raw trytes of the transaction.
+            hash: Curl-P81 hash of the transaction (requires NumPy).
+            signatureMessageFragment: Signature or message part of the transaction.
+            address: Address of the transaction.
+            value: Value transferred by the transaction in iota.
+            obsoleteTag: Obsolete tag, used for the bundle hash.
+            timestamp: Timestamp of the transaction in seconds.
+            currentIndex: Index of the transaction in its bundle.
+            lastIndex: Index of the last transaction in the bundle.
+            bundle: Bundle hash.
+            trunkTransaction: Hash of the approved trunk transaction.
+            branchTransaction: Hash of the approved branch transaction.
+            tag: Tag of the transaction.
+            attachmentTimestamp: Timestamp of the proof of work in milliseconds.
+            attachmentTimestampLowerBound: Lower bound of the attachment timestamp.
+            attachmentTimestampUpperBound: Upper bound of the attachment timestamp.
+            nonce: Nonce of the proof of work.
+    """
+    
+    trytesLength = 2673
+    
+    __slots__ = ('_buffer', '_offset', '_hash', '_signatureMessageFragment', '_address', '_value', '_obsoleteTag', '_timestamp',
+                 '_currentIndex', '_lastIndex', '_bundle', '_trunkTransaction', '_branchTransaction', '_tag',
+                 '_attachmentTimestamp', '_attachmentTimestampLowerBound', '_attachmentTimestampUpperBound', '_nonce')
+    
+    def __init__(self, trytes, offset=0):
+        if isinstance(trytes, str):
+            trytes = trytes.encode('ascii')
+        if len(trytes) < offset + self.trytesLength:
+            raise ValueError('A transaction consists of %d trytes' % self.trytesLength)
+        self._buffer = trytes
+        self._offset = offset
+    
+    def __repr__(self):
+        return 'Transaction(address=%s, value=%d, bundle=%s)' % (self.address(), self.value(), self.bundle())
+    
+    def trytes(self):
+        return bytes(self._buffer[self._offset:self._offset + self.trytesLength]).decode('ascii')
+    
+    def hash(self):
+        try:
+            return self._hash
+        except AttributeError:
+            import curl
+            self._hash = curl.transactionHash(self.trytes())
+            return self._hash
+    
+    def signatureMessageFragment(self):
+        return self._string('_signatureMessageFragment', 0, 2187)
+    
+    def address(self):
+        return self._string('_address', 2187, 2268)
+    
+    def value(self):
+        return self._integer('_value', 2268, 2295)
+    
+    def obsoleteTag(self):
+        return self._string('_obsoleteTag', 2295, 2322)
+    
+    def timestamp(self):
+        return self._integer('_timestamp', 2322, 2331)
+    
+    def currentIndex(self):
+        return self._integer('_currentIndex', 2331, 2340)
+    
+    def lastIndex(self):
+        return self._integer('_lastIndex', 2340, 2349)
+    
+    def bundle(self):
+        return self._string('_bundle', 2349, 2430)
+    
+    def trunkTransaction(self):
+        return self._string('_trunkTransaction', 2430, 2511)
+    
+    def branchTransaction(self):
+        return self._string('_branchTransaction', 2511, 2592)
+    
+    def tag(self):
+        return self._string('_tag', 2592, 2619)
+    
+    def attachmentTimestamp(self):
+        return self._integer('_attachmentTimestamp', 2619, 2628)
+    
+    def attachmentTimestampLowerBound(self):
+        return self._integer('_attachmentTimestampLowerBound', 2628, 2637)
+    
+    def attachmentTimestampUpperBound(self):
+        return self._integer('_attachmentTimestampUpperBound', 2637, 2646)
+    
+    def nonce(self):
+        return self._string('_nonce', 2646, 2673)
+    
+    def _string(self, slot, start, stop):
+        try:
+            return getattr(self, slot)
+        except AttributeError:
+            value = bytes(self._buffer[self._offset + start:self._offset + stop]).decode('ascii')
+            setattr(self, slot, value)
+            return value
+    
+    def _integer(self, slot, start, stop):
+        try:
+            return getattr(self, slot)
+        except AttributeError:
+            value = _trytesToInt(self._buffer[self._offset + start:self._offset + stop])
+            setattr(self, slot, value)
+            return value
+
+
 class FindTransactions:
     """ Find the transactions which match the specified input and return. All input values are lists, for which a list of return values (transaction hashes), in the same order, is returned for all individual elements. 
         The input fields can either be bundles, addresses, tags or approvees. Using multiple of these input fields returns the intersection of the values.
@@ -350,24 +2607,33 @@ class FindTransactions:
         Constructor:
             url (str): URL of node sever including port
             addressesList (array of strings): List of addresses.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
+            mergeResponses: Merge the JSON responses of several chunks, duplicate hashes are dropped.
+            stream: Send the command and return a ResponseStream of the hashes, decoded while the response is received.
             hashes: List of hashes.
             duration: Duration of request.
             jsonResponse: Return the complete JSON response.
     """
     
-    def __init__(self, url, addressesList):
-        command = {'command': 'findTransactions', 'addresses': [', '.join('{0}'.format(w) for w in addressesList)] if len(addressesList) > 0 else []}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand(addressesList):
+        return {'command': 'findTransactions', 'addresses': list(addressesList)}
+
+    @staticmethod
+    def mergeResponses(responses):
+        return {'hashes': list(dict.fromkeys(hash for response in responses for hash in response['hashes'])),
+                'duration': sum(response.get('duration', 0) for response in responses)}
+
+    @classmethod
+    def stream(cls, url, addressesList, transport=None):
+        return _streamResponse(transport, url, cls.buildCommand(addressesList), 'hashes')
+
+    def __init__(self, url, addressesList, transport=None):
+        command = self.buildCommand(addressesList)
+        self.jsonData = _getTransport(transport).send(url, command)
             
     def hashes(self):
         return self.jsonData["hashes"]
@@ -382,8 +2648,10 @@ class GetNeighbors:
     """ Returns the set of neighbors you are connected with, as well as their activity count. The activity counter is reset after restarting IRI.
         Constructor:
             url (str): URL of node sever including port
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             address : address of your peer
             numberOfAllTransactions: Number of all transactions sent (invalid, valid, already-seen)
             numberOfInvalidTransactions: Invalid transactions your peer has sent you. These are transactions with invalid signatures or overall schema.
@@ -392,17 +2660,13 @@ class GetNeighbors:
     """
     
     
-    def __init__(self, url):
-        command = {'command': 'getNeighbors'}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand():
+        return {'command': 'getNeighbors'}
+
+    def __init__(self, url, transport=None):
+        command = self.buildCommand()
+        self.jsonData = _getTransport(transport).send(url, command)
         
     def address(self):
         return self.jsonData["address"]
@@ -425,24 +2689,22 @@ class AddNeighbors:
         Constructor:
             url (str): URL of node sever including port
             neighborsList (array of strings): List of neighbor URI elements which should be added.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             addedNeighbors: List of added neighbor URI elements.
             duration: Duration of request.
             jsonResponse: Return the complete JSON response.
     """
     
-    def __init__(self, url, neighborsList):
-        command = {'command': 'addNeighbors', 'uris': [', '.join("'{0}'".format(w) for w in neighborsList)] if len(neighborsList) > 0 else []}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand(neighborsList):
+        return {'command': 'addNeighbors', 'uris': list(neighborsList)}
+
+    def __init__(self, url, neighborsList, transport=None):
+        command = self.buildCommand(neighborsList)
+        self.jsonData = _getTransport(transport).send(url, command)
         
     def addedNeighbors(self):
         return self.jsonData["addedNeighbors"]
@@ -460,25 +2722,23 @@ class RemoveNeighbors:
         Constructor:
             url (str): URL of node sever including port
             neighborsList (array of strings): List of neighbor URI elements which should be removed.
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             removeNeighbors: List of removed neighbor URIs elements.
             duration: Duration of request.
             jsonResponse: Return the complete JSON response.
     """
     
     
-    def __init__(self, url, neighborsList):
-        command = {'command': 'removeNeighbors', 'uris': [', '.join('{0}'.format(w) for w in neighborsList)] if len(neighborsList) > 0 else []}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand(neighborsList):
+        return {'command': 'removeNeighbors', 'uris': list(neighborsList)}
+
+    def __init__(self, url, neighborsList, transport=None):
+        command = self.buildCommand(neighborsList)
+        self.jsonData = _getTransport(transport).send(url, command)
         
     def removedNeighbors(self):
         return self.jsonData["removedNeighbors"]
@@ -494,24 +2754,22 @@ class GetTips:
     """ Returns the list of tips.
         Constructor:
             url (str): URL of node sever including port
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             hashes: List of tips hashes.
             duration: Duration of request.
             jsonResponse: Return the complete JSON response.
     """
     
-    def __init__(self, url):
-        command = {'command': 'getTips'}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand():
+        return {'command': 'getTips'}
+
+    def __init__(self, url, transport=None):
+        command = self.buildCommand()
+        self.jsonData = _getTransport(transport).send(url, command)
         
     def hashes(self):
         return self.jsonData["hashes"]
@@ -527,8 +2785,10 @@ class NodeInfo:
     """ Returns information about your node.
         Constructor:
             url (str): URL of node sever including port
+            transport (HttpTransport): Transport the request is sent through, defaults to a shared module wide transport.
     
         Methods:
+            buildCommand: Build the JSON command which is sent to the node.
             appName: Name of the IOTA software you're currently using (IRI stands for Initial Reference Implementation).
             appVersion: The version of the IOTA software you're currently running.
             jreAvailableProcesses: Available cores on your machine for JRE.
@@ -551,19 +2811,13 @@ class NodeInfo:
             duration: Number of milliseconds it took to complete the request
     """
     
-    def __init__(self, url):
-        command = {'command': 'getNodeInfo'}
-        stringified = json.dumps(command)
-        stringified = stringified.encode('utf-8')
-        headers = {'content-type': 'application/json', 'X-IOTA-API-Version': '1'}
-        request = urllib.request.Request(url=url, data=stringified, headers=headers)
-        try:
-            returnData = urllib.request.urlopen(request).read()
-            print (returnData)
-            self.jsonData = json.loads(returnData)
-        except urllib.error.HTTPError as e:
-            print("%s in class: %s" % (str(e), self.__class__.__name__))
-            sys.exit("%s in class: %s" % (str(e), self.__class__.__name__))
+    @staticmethod
+    def buildCommand():
+        return {'command': 'getNodeInfo'}
+
+    def __init__(self, url, transport=None):
+        command = self.buildCommand()
+        self.jsonData = _getTransport(transport).send(url, command)
         
     def appName(self):
         return self.jsonData["appName"]
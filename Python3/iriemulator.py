@@ -0,0 +1,539 @@
+# The software is released under MIT License.
+#
+# Copyright 2017 github.com/ptrk01
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software # without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+# to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions 
+# of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A #PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF 
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER 
+# DEALINGS IN THE SOFTWARE.
+
+""" In-memory stand-in for an IRI node, see IriEmulator. """
+
+import http.server
+import socketserver
+import threading
+import random
+import json
+import time
+import re
+
+import iotawrapper
+import trinary
+import curl
+
+NULL_HASH = '9' * 81
+TRANSACTION_TRYTES = iotawrapper.Transaction.trytesLength
+
+_TRYTES = re.compile('[9A-Z]*')
+_URI = re.compile(r'(udp|tcp)://[^\s,]+')
+# Number of 0 trits at the end (the most significant trits) of a single tryte, '9' (three 0 trits) is handled separately.
+_TRAILING_ZEROS = dict((char, 2 if abs(value) <= 1 else 1 if abs(value) <= 4 else 0)
+                       for char, value in zip(trinary.TRYTE_ALPHABET, list(range(14)) + list(range(-13, 0))) if value)
+
+
+class EmulatorError(Exception):
+    """ Invalid command sent to an IriEmulator, answered with HTTP status 400. """
+
+
+class Tangle:
+    """ Indexed in-memory store of transactions. Transactions are indexed by hash, address, bundle, tag and approved
+        transaction, the tips are kept in a list so a random tip is found in constant time. Every transaction knows the
+        index of the milestone which confirmed it, so inclusion states and balances are lookups.
+        Constructor:
+            store (TransactionStore): Keeps the trytes on disk instead of in memory, only the indexes stay in memory.
+    
+        Methods:
+            add: Add transactions with their hashes, returns the hashes which were new.
+            get: Trytes of a transaction or None.
+            find: Hashes of the transactions matching addresses, bundles, tags and approvees.
+            approvers: Hashes of the transactions approving a transaction.
+            tips: Hashes of all tips.
+            tipCount: Number of tips.
+            randomTip: A random tip or None.
+            confirm: Mark the unconfirmed past of a milestone as confirmed.
+            confirmedBy: Index of the milestone which confirmed a transaction, or None.
+            references: Return which transactions are referenced by a transaction.
+            balance: Confirmed balance of an address.
+            setBalance: Set the balance of an address, e.g. from a snapshot.
+    """
+    
+    def __init__(self, store=None):
+        self.store = store
+        self._trytes = {} if store is None else None
+        self._byAddress = {}
+        self._byBundle = {}
+        self._byTag = {}
+        self._approvers = {}
+        self._tips = []
+        self._tipIndex = {}
+        self._confirmedBy = {}
+        self._balances = {}
+        self._count = 0
+    
+    def __len__(self):
+        return self._count
+    
+    def __contains__(self, hash):
+        return self.get(hash) is not None
+    
+    def add(self, hashes, trytesList):
+        new = []
+        for hash, trytes in zip(hashes, trytesList):
+            if self.get(hash) is not None:
+                continue
+            new.append((hash, trytes))
+            self._count += 1
+            if self._trytes is not None:
+                self._trytes[hash] = trytes
+            self._index(self._byAddress, trytes[2187:2268], hash)
+            self._index(self._byBundle, trytes[2349:2430], hash)
+            self._index(self._byTag, trytes[2592:2619], hash)
+            if trytes[2592:2619] != trytes[2295:2322]:
+                self._index(self._byTag, trytes[2295:2322], hash)
+            for approved in {trytes[2430:2511], trytes[2511:2592]}:
+                self._index(self._approvers, approved, hash)
+                self._removeTip(approved)
+            # A transaction which arrived after its approvers is no tip.
+            if hash not in self._approvers:
+                self._tipIndex[hash] = len(self._tips)
+                self._tips.append(hash)
+        if new and self.store is not None:
+            self.store.putMany(new)
+        return [hash for hash, trytes in new]
+    
+    def get(self, hash):
+        if self._trytes is not None:
+            return self._trytes.get(hash)
+        return self.store.get(hash)
+    
+    def find(self, addresses=(), bundles=(), tags=(), approvees=()):
+        """ Union of the matches within every kind of key, intersection over the kinds which are given, like IRI. """
+        result = None
+        for index, keys in ((self._byAddress, addresses), (self._byBundle, bundles), (self._byTag, tags), (self._approvers, approvees)):
+            if not keys:
+                continue
+            matches = set()
+            for key in keys:
+                matches.update(index.get(key, ()))
+            result = matches if result is None else result & matches
+        return sorted(result or ())
+    
+    def approvers(self, hash):
+        return list(self._approvers.get(hash, ()))
+    
+    def tips(self):
+        return list(self._tips)
+    
+    def tipCount(self):
+        return len(self._tips)
+    
+    def randomTip(self, rng=random):
+        return rng.choice(self._tips) if self._tips else None
+    
+    def confirm(self, milestone, index):
+        """ Confirm the milestone and every transaction it references which is not confirmed yet. Returns the number of
+            newly confirmed transactions.
+        """
+        confirmed = 0
+        pending = [milestone]
+        while pending:
+            hash = pending.pop()
+            if hash in self._confirmedBy:
+                continue
+            trytes = self.get(hash)
+            if trytes is None:
+                continue
+            self._confirmedBy[hash] = index
+            confirmed += 1
+            value = iotawrapper._trytesToInt(trytes[2268:2295].encode('ascii'))
+            if value:
+                address = trytes[2187:2268]
+                self._balances[address] = self._balances.get(address, 0) + value
+            pending.append(trytes[2430:2511])
+            pending.append(trytes[2511:2592])
+        return confirmed
+    
+    def confirmedBy(self, hash):
+        return self._confirmedBy.get(hash)
+    
+    def references(self, tip, hashes):
+        """ Return for every hash whether it is in the past of tip (or tip itself). """
+        targets = set(hashes)
+        found = set()
+        visited = set()
+        pending = [tip]
+        while pending and len(found) < len(targets):
+            hash = pending.pop()
+            if hash in visited:
+                continue
+            visited.add(hash)
+            if hash in targets:
+                found.add(hash)
+            # The past of a transaction confirmed by milestone k only holds transactions confirmed by k or earlier.
+            index = self._confirmedBy.get(hash)
+            if index is not None and all(self._confirmedBy.get(target, index + 1) > index for target in targets - found):
+                continue
+            trytes = self.get(hash)
+            if trytes is not None:
+                pending.append(trytes[2430:2511])
+                pending.append(trytes[2511:2592])
+        return [hash in found for hash in hashes]
+    
+    def balance(self, address):
+        return self._balances.get(address, 0)
+    
+    def setBalance(self, address, value):
+        self._balances[address] = value
+    
+    def _index(self, index, key, hash):
+        hashes = index.get(key)
+        if hashes is None:
+            index[key] = [hash]
+        else:
+            hashes.append(hash)
+    
+    def _removeTip(self, hash):
+        position = self._tipIndex.pop(hash, None)
+        if position is None:
+            return
+        last = self._tips.pop()
+        if last != hash:
+            self._tips[position] = last
+            self._tipIndex[last] = position
+
+
+class IriEmulator:
+    """ Pure Python stand-in for an IRI node, holding the tangle in memory. It answers getNodeInfo, getNeighbors, addNeighbors,
+        removeNeighbors, getTips, findTransactions, getTrytes, getBalances, getInclusionStates, getTransactionsToApprove,
+        attachToTangle (local proof of work, requires NumPy), interruptAttachingToTangle, broadcastTransactions and
+        storeTransactions, over HTTP (serve) or in-process (transport).
+        Milestones are issued by issueMilestone or every milestoneInterval seconds. A milestone approves the previous milestone
+        and a random tip and confirms everything it references, balances are the genesis balances plus the values of confirmed
+        transactions. Signatures and bundles are not validated.
+        Constructor:
+            balances (dict): Genesis balance by address.
+            minWeightMagnitude (integer): Weight stored transactions need, 0 accepts transactions without proof of work.
+            maxMinWeightMagnitude (integer): Highest minWeightMagnitude attachToTangle accepts.
+            milestoneInterval (float): Seconds between automatic milestones, None to only issue them with issueMilestone.
+            store (TransactionStore): Keeps the trytes on disk, see Tangle.
+            powProcesses (integer): Number of processes of the proof of work, defaults to the number of cores.
+            seed: Seed of the random tip selection.
+    
+        Methods:
+            handle: Execute a command and return the HTTP status and the response.
+            transport: Transport which sends the commands of an Api directly to the emulator.
+            serve: Answer commands over HTTP and return the URL.
+            issueMilestone: Issue a milestone and return its hash.
+            close: Stop the HTTP server and the proof of work processes.
+    """
+    
+    coordinatorAddress = 'KPWCHICGJZXKE9GSUDXZYUAPLHAKAHYHDXNPHENTERYMMBQOPSQIDENXKLKCEYCPVTZQLEEJVYJZV9BWU'
+    maxDepth = 15
+    
+    def __init__(self, balances=None, minWeightMagnitude=0, maxMinWeightMagnitude=14, milestoneInterval=None, store=None,
+                 powProcesses=None, seed=None):
+        self.tangle = Tangle(store)
+        self.minWeightMagnitude = minWeightMagnitude
+        self.maxMinWeightMagnitude = maxMinWeightMagnitude
+        self.milestoneInterval = milestoneInterval
+        self.powProcesses = powProcesses
+        self.neighbors = []
+        self.milestones = {}
+        self.latestMilestone = NULL_HASH
+        self.latestMilestoneIndex = 0
+        self.broadcasted = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._powEngine = None
+        self._server = None
+        self._lastMilestone = time.monotonic()
+        for address, value in (balances or {}).items():
+            self.tangle.setBalance(address, value)
+        self.issueMilestone()
+    
+    def handle(self, command):
+        start = time.monotonic()
+        name = command.get('command') if isinstance(command, dict) else None
+        method = self._commands.get(name)
+        if method is None:
+            return 400, {'error': "Command [%s] is unknown" % name}
+        if self.milestoneInterval is not None and time.monotonic() - self._lastMilestone >= self.milestoneInterval:
+            self.issueMilestone()
+        try:
+            response = method(self, command)
+        except EmulatorError as e:
+            return 400, {'error': str(e)}
+        response['duration'] = int((time.monotonic() - start) * 1000)
+        return 200, response
+    
+    def transport(self):
+        return EmulatorTransport(self)
+    
+    def serve(self, host='127.0.0.1', port=0):
+        emulator = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_POST(self):
+                try:
+                    command = json.loads(self.rfile.read(int(self.headers['content-length'])))
+                except ValueError:
+                    status, response = 400, {'error': 'Invalid JSON'}
+                else:
+                    status, response = emulator.handle(command)
+                body = json.dumps(response).encode('utf-8')
+                self.wfile.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n'
+                                 % (status, b'OK' if status == 200 else b'Bad Request', len(body)) + body)
+        
+        class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+            daemon_threads = True
+        
+        self._server = Server((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return 'http://%s:%d/' % (host, self._server.server_address[1])
+    
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._powEngine is not None:
+            self._powEngine.close()
+            self._powEngine = None
+    
+    def issueMilestone(self):
+        with self._lock:
+            index = self.latestMilestoneIndex + 1
+            branch = self.tangle.randomTip(self._random) or NULL_HASH
+            trytes = _transactionTrytes(self.coordinatorAddress, 0, int(time.time()), NULL_HASH, self.latestMilestone, branch,
+                                        _tag(index))
+            hash = curl.transactionHash(trytes)
+            self.tangle.add([hash], [trytes])
+            self.tangle.confirm(hash, index)
+            self.milestones[hash] = index
+            self.latestMilestone = hash
+            self.latestMilestoneIndex = index
+            self._lastMilestone = time.monotonic()
+            return hash
+    
+    def getNodeInfo(self, command):
+        with self._lock:
+            return {'appName': 'IRI Emulator', 'appVersion': '1.0.0', 'jreAvailableProcessors': 1, 'jreFreeMemory': 0,
+                    'jreMaxMemory': 0, 'jreTotalMemory': 0, 'latestMilestone': self.latestMilestone,
+                    'latestMilestoneIndex': self.latestMilestoneIndex, 'latestSolidSubtangleMilestone': self.latestMilestone,
+                    'latestSolidSubtangleMilestoneIndex': self.latestMilestoneIndex, 'milestoneStartIndex': 1,
+                    'neighbors': len(self.neighbors), 'packetsQueueSize': 0, 'time': int(time.time() * 1000),
+                    'tips': self.tangle.tipCount(), 'transactionsToRequest': 0, 'coordinatorAddress': self.coordinatorAddress}
+    
+    def getNeighbors(self, command):
+        with self._lock:
+            return {'neighbors': [{'address': uri.split('://')[-1], 'numberOfAllTransactions': 0, 'numberOfInvalidTransactions': 0,
+                                   'numberOfNewTransactions': 0} for uri in self.neighbors]}
+    
+    def addNeighbors(self, command):
+        with self._lock:
+            added = [uri for uri in _uris(command) if uri not in self.neighbors]
+            self.neighbors.extend(added)
+            return {'addedNeighbors': len(added)}
+    
+    def removeNeighbors(self, command):
+        with self._lock:
+            removed = [uri for uri in _uris(command) if uri in self.neighbors]
+            self.neighbors = [uri for uri in self.neighbors if uri not in removed]
+            return {'removedNeighbors': len(removed)}
+    
+    def getTips(self, command):
+        with self._lock:
+            return {'hashes': self.tangle.tips()}
+    
+    def findTransactions(self, command):
+        keys = [_hashes(command, name, length) for name, length in (('addresses', 81), ('bundles', 81), ('tags', 27), ('approvees', 81))]
+        if not any(keys):
+            raise EmulatorError('Invalid parameters')
+        # Addresses may be given with their 9 tryte checksum.
+        keys[0] = [address[:81] for address in keys[0]]
+        with self._lock:
+            return {'hashes': self.tangle.find(*keys)}
+    
+    def getTrytes(self, command):
+        hashes = _hashes(command, 'hashes')
+        with self._lock:
+            return {'trytes': [self.tangle.get(hash) or '9' * TRANSACTION_TRYTES for hash in hashes]}
+    
+    def getBalances(self, command):
+        addresses = [address[:81] for address in _hashes(command, 'addresses', 81, 90)]
+        threshold = command.get('threshold', 100)
+        if not isinstance(threshold, int) or not 0 < threshold <= 100:
+            raise EmulatorError('Illegal threshold')
+        with self._lock:
+            return {'balances': [str(self.tangle.balance(address)) for address in addresses], 'references': [self.latestMilestone],
+                    'milestoneIndex': self.latestMilestoneIndex}
+    
+    def getInclusionStates(self, command):
+        transactions = _hashes(command, 'transactions')
+        tips = _hashes(command, 'tips')
+        with self._lock:
+            states = [False] * len(transactions)
+            for tip in tips:
+                index = self.milestones.get(tip)
+                if index is not None:
+                    referenced = [(self.tangle.confirmedBy(hash) or index + 1) <= index for hash in transactions]
+                else:
+                    referenced = self.tangle.references(tip, transactions)
+                states = [state or reference for state, reference in zip(states, referenced)]
+            return {'states': states}
+    
+    def getTransactionsToApprove(self, command):
+        depth = command.get('depth')
+        if not isinstance(depth, int) or not 0 <= depth <= self.maxDepth:
+            raise EmulatorError('Invalid depth input')
+        with self._lock:
+            trunk = self.tangle.randomTip(self._random) or self.latestMilestone
+            branch = self.tangle.randomTip(self._random) or self.latestMilestone
+            return {'trunkTransaction': trunk, 'branchTransaction': branch}
+    
+    def attachToTangle(self, command):
+        trunk, branch = _hash(command, 'trunkTransaction'), _hash(command, 'branchTransaction')
+        weight = command.get('minWeightMagnitude')
+        if not isinstance(weight, int) or not 0 < weight <= self.maxMinWeightMagnitude:
+            raise EmulatorError('Invalid minWeightMagnitude input')
+        trytesList = _transactions(command)
+        return {'trytes': self._pow().attachToTangle(trunk, branch, weight, trytesList)}
+    
+    def interruptAttachingToTangle(self, command):
+        if self._powEngine is not None:
+            self._powEngine.interrupt()
+        return {}
+    
+    def broadcastTransactions(self, command):
+        trytesList = _transactions(command)
+        self._validate(trytesList)
+        with self._lock:
+            self.broadcasted += len(trytesList)
+        return {}
+    
+    def storeTransactions(self, command):
+        trytesList = _transactions(command)
+        hashes = self._validate(trytesList)
+        with self._lock:
+            self.tangle.add(hashes, trytesList)
+        return {}
+    
+    _commands = {'getNodeInfo': getNodeInfo, 'getNeighbors': getNeighbors, 'addNeighbors': addNeighbors, 'removeNeighbors': removeNeighbors,
+                 'getTips': getTips, 'findTransactions': findTransactions, 'getTrytes': getTrytes, 'getBalances': getBalances,
+                 'getInclusionStates': getInclusionStates, 'getTransactionsToApprove': getTransactionsToApprove,
+                 'attachToTangle': attachToTangle, 'interruptAttachingToTangle': interruptAttachingToTangle,
+                 'broadcastTransactions': broadcastTransactions, 'storeTransactions': storeTransactions}
+    
+    def _validate(self, trytesList):
+        """ Hash a batch of transactions and check their weight, returns the hashes. """
+        hashes = curl.transactionHashes(trytesList)
+        if self.minWeightMagnitude:
+            for hash in hashes:
+                if _weight(hash) < self.minWeightMagnitude:
+                    raise EmulatorError('Invalid transaction hash')
+        return hashes
+    
+    def _pow(self):
+        with self._lock:
+            if self._powEngine is None:
+                import proofofwork
+                self._powEngine = proofofwork.PowEngine(self.powProcesses)
+            return self._powEngine
+
+
+class EmulatorTransport:
+    """ Transport which hands the commands of an Api directly to an IriEmulator in the same process, without HTTP.
+        The URL passed to send is ignored.
+        Constructor:
+            emulator (IriEmulator): Emulator executing the commands.
+    
+        Methods:
+            send: Execute a command and return the response.
+            close: Does nothing, the emulator stays usable.
+    """
+    
+    def __init__(self, emulator):
+        self.emulator = emulator
+    
+    def send(self, url, command, cancel=None):
+        status, response = self.emulator.handle(command)
+        if status != 200:
+            raise iotawrapper.ClientError(url, status, 'Bad Request', json.dumps(response).encode('utf-8'), command.get('command'))
+        return response
+    
+    def close(self):
+        pass
+
+
+def _entries(command, name):
+    """ Values of a list parameter, every element is a single value like IRI expects it. """
+    values = command.get(name) or []
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise EmulatorError('Invalid %s input' % name)
+    return values
+
+
+def _hashes(command, name, length=81, maxLength=None):
+    values = _entries(command, name)
+    for value in values:
+        if not length <= len(value) <= (maxLength or length) or not _TRYTES.fullmatch(value):
+            raise EmulatorError('Invalid %s input' % name)
+    return values
+
+
+def _hash(command, name):
+    value = command.get(name)
+    if not isinstance(value, str) or len(value) != 81 or not _TRYTES.fullmatch(value):
+        raise EmulatorError('Invalid %s input' % name)
+    return value
+
+
+def _transactions(command):
+    trytesList = _entries(command, 'trytes')
+    if not trytesList:
+        raise EmulatorError('Invalid trytes input')
+    for trytes in trytesList:
+        if len(trytes) != TRANSACTION_TRYTES or not _TRYTES.fullmatch(trytes):
+            raise EmulatorError('Invalid trytes input')
+    return trytesList
+
+
+def _uris(command):
+    uris = _entries(command, 'uris')
+    for uri in uris:
+        if not _URI.fullmatch(uri):
+            raise EmulatorError('Invalid uris input')
+    return uris
+
+
+def _weight(hash):
+    """ Number of trailing 0 trits of a hash. """
+    stripped = hash.rstrip('9')
+    weight = 3 * (len(hash) - len(stripped))
+    return weight + _TRAILING_ZEROS[stripped[-1]] if stripped else weight
+
+
+def _tag(index):
+    return trinary.tritsToTrytes(trinary.intToTrits(index, 81))
+
+
+def _transactionTrytes(address, value, timestamp, bundle, trunk, branch, tag):
+    """ Trytes of a single transaction bundle without signature and nonce. """
+    integer = lambda number, length: trinary.tritsToTrytes(trinary.intToTrits(number, length * 3))
+    return ('9' * 2187 + address + integer(value, 27) + '9' * 27 + integer(timestamp, 9) + integer(0, 9) + integer(0, 9)
+            + bundle + trunk + branch + (tag + '9' * 27)[:27] + '9' * 27 + '9' * 27)
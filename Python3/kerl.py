@@ -0,0 +1,154 @@
+# The software is released under MIT License.
+#
+# Copyright 2017 github.com/ptrk01
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software # without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+# to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions 
+# of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A #PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF 
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER 
+# DEALINGS IN THE SOFTWARE.
+
+""" Kerl sponge function: Keccak-384 over the 243 trit <-> 48 byte conversion.
+
+    Keccak-f[1600] is implemented on NumPy uint64 lanes with a batch dimension, so many independent sponges (for example
+    all key fragments of an address) are permuted together in a single pass.
+"""
+
+import numpy as np
+
+import trinary
+
+HASH_LENGTH = trinary.HASH_TRITS
+BYTE_HASH_LENGTH = trinary.HASH_BYTES
+# Keccak-384 absorbs 1600 - 2 * 384 bits = 104 bytes per permutation.
+RATE = 104
+
+_ROUND_CONSTANTS = np.array([
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000, 0x000000000000808B, 0x0000000080000001,
+    0x8000000080008081, 0x8000000000008009, 0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003, 0x8000000000008002, 0x8000000000000080,
+    0x000000000000800A, 0x800000008000000A, 0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+], dtype=np.uint64)
+# Rotation offsets of the lanes A[x, y], stored at index x + 5 * y.
+_ROTATIONS = np.array([
+    0, 1, 62, 28, 27,
+    36, 44, 6, 55, 20,
+    3, 10, 43, 25, 39,
+    41, 45, 15, 21, 8,
+    18, 2, 61, 56, 14,
+], dtype=np.uint64).reshape(25, 1)
+# A squeezed hash keeps 242 trits, its value is the balanced remainder of the digest modulo 3 ** 242.
+_SQUEEZE_MODULUS = 3 ** (HASH_LENGTH - 1)
+_SQUEEZE_HALF = (_SQUEEZE_MODULUS - 1) // 2
+_COMPLEMENTS = (np.uint64(64) - _ROTATIONS) % np.uint64(64)
+# The pi step moves lane (x, y) to (y, 2x + 3y), _PI lists for every target lane its source lane.
+_PI = np.empty(25, dtype=np.intp)
+for _x in range(5):
+    for _y in range(5):
+        _PI[_y + 5 * ((2 * _x + 3 * _y) % 5)] = _x + 5 * _y
+
+
+class Kerl:
+    """ Kerl sponge working on balanced trits, for a single sequence or a batch of sequences at once.
+        absorb and squeeze take and return flat arrays for a single sponge and (N, L) arrays for N sponges.
+    
+        Methods:
+            absorb: Absorb trits into the sponge, the length must be a multiple of 243.
+            squeeze: Squeeze trits out of the sponge, the length must be a multiple of 243.
+            reset: Reset the sponge to its initial state.
+    """
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self._message = None
+        self._single = True
+    
+    def absorb(self, trits):
+        trits = np.asarray(trits, dtype=np.int8)
+        if trits.shape[-1] % HASH_LENGTH:
+            raise ValueError('Kerl absorbs multiples of %d trits' % HASH_LENGTH)
+        self._single = trits.ndim == 1
+        rows = np.atleast_2d(trits)
+        blocks = rows.reshape(len(rows) * (rows.shape[1] // HASH_LENGTH), HASH_LENGTH)
+        data = trinary.tritsToBytes(blocks).reshape(len(rows), -1)
+        self._message = data if self._message is None else np.concatenate([self._message, data], axis=1)
+    
+    def squeeze(self, length=HASH_LENGTH):
+        if length % HASH_LENGTH:
+            raise ValueError('Kerl squeezes multiples of %d trits' % HASH_LENGTH)
+        if self._message is None:
+            raise ValueError('Nothing was absorbed')
+        output = []
+        for _ in range(length // HASH_LENGTH):
+            digest = keccak384(self._message)
+            trits = trinary.bytesToTrits(digest)
+            trits[:, -1] = 0
+            output.append(trits)
+            # The next squeeze hashes the complemented digest, like the reference implementation.
+            self._message = ~digest
+        trits = np.concatenate(output, axis=1)
+        return trits[0] if self._single else trits
+
+
+def kerlHash(trits, length=HASH_LENGTH):
+    """ Absorb trits into a fresh Kerl and squeeze length trits. A flat array gives a flat array, an (N, L) array hashes every row. """
+    kerl = Kerl()
+    kerl.absorb(trits)
+    return kerl.squeeze(length)
+
+
+def squeezedBytes(digests):
+    """ Return the 48 byte form of the trits squeezed from Keccak-384 digests, i.e. tritsToBytes(bytesToTrits(digest)) with the
+        last trit set to 0, for an (N, 48) uint8 array. Computed on integers, so repeated hashing can stay in the byte form.
+    """
+    digests = np.atleast_2d(np.asarray(digests, dtype=np.uint8))
+    raw = digests.tobytes()
+    wrapped = b''.join(((int.from_bytes(raw[i:i + BYTE_HASH_LENGTH], 'big', signed=True) + _SQUEEZE_HALF) % _SQUEEZE_MODULUS
+                        - _SQUEEZE_HALF).to_bytes(BYTE_HASH_LENGTH, 'big', signed=True) for i in range(0, len(raw), BYTE_HASH_LENGTH))
+    return np.frombuffer(wrapped, dtype=np.uint8).reshape(digests.shape)
+
+
+def keccak384(messages):
+    """ Keccak-384 (original Keccak padding, not SHA3) of every row of an (N, M) uint8 array, returns an (N, 48) uint8 array. """
+    messages = np.atleast_2d(np.asarray(messages, dtype=np.uint8))
+    count, size = messages.shape
+    blocks = size // RATE + 1
+    padded = np.zeros((count, blocks * RATE), dtype=np.uint8)
+    padded[:, :size] = messages
+    padded[:, size] ^= 0x01
+    padded[:, -1] ^= 0x80
+    lanes = padded.view('<u8').reshape(count, blocks, RATE // 8)
+    state = np.zeros((25, count), dtype=np.uint64)
+    for block in range(blocks):
+        state[:RATE // 8] ^= lanes[:, block].T
+        _permute(state)
+    return np.ascontiguousarray(state[:BYTE_HASH_LENGTH // 8].T).astype('<u8').view(np.uint8).reshape(count, BYTE_HASH_LENGTH)
+
+
+def _permute(state):
+    """ Keccak-f[1600] on a (25, N) array of lanes, lane x + 5 * y holds A[x, y] of all N states. Updates state in place. """
+    lanes = state.reshape(5, 5, -1)
+    for roundConstant in _ROUND_CONSTANTS:
+        # theta
+        columns = np.bitwise_xor.reduce(lanes, axis=0)
+        lanes ^= (np.roll(columns, 1, axis=0) ^ _rotate(np.roll(columns, -1, axis=0), np.uint64(1), np.uint64(63)))[None]
+        # rho and pi
+        rotated = _rotate(state, _ROTATIONS, _COMPLEMENTS)[_PI].reshape(5, 5, -1)
+        # chi
+        lanes[...] = rotated ^ (~np.roll(rotated, -1, axis=1) & np.roll(rotated, -2, axis=1))
+        # iota
+        lanes[0, 0] ^= roundConstant
+
+
+def _rotate(lanes, left, right):
+    return (lanes << left) | (lanes >> right)
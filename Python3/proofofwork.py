@@ -0,0 +1,316 @@
+# The software is released under MIT License.
+#
+# Copyright 2017 github.com/ptrk01
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software # without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+# to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions 
+# of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A #PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF 
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER 
+# DEALINGS IN THE SOFTWARE.
+
+""" Local proof of work for attachToTangle. """
+
+import concurrent.futures
+import multiprocessing
+import itertools
+import threading
+import time
+import os
+
+import numpy as np
+
+import curl
+import trinary
+
+TRANSACTION_TRYTES = 2673
+MAX_TIMESTAMP = (3 ** 27 - 1) // 2
+
+# Offsets (in trytes) of the fields written by attachToTangle.
+_TRUNK = 2430
+_BRANCH = 2511
+_ATTACHMENT_TIMESTAMP = 2619
+_NONCE = 2646
+
+# Offsets (in trits) of the nonce within the last 243 trit block of a transaction. The first four nonce trits enumerate the
+# 64 bit lanes of a word, the next part is left 0, then come the index of the word (unique per worker and column) and the
+# counter which is incremented on every transformation.
+_NONCE_START = curl.HASH_LENGTH - 81
+_WORD_START = _NONCE_START + 27
+_COUNTER_START = _NONCE_START + 54
+
+_HIGH_BITS = np.uint64(0xFFFFFFFFFFFFFFFF)
+_LANES = (
+    (0b1101101101101101101101101101101101101101101101101101101101101101, 0b1011011011011011011011011011011011011011011011011011011011011011),
+    (0b1111000111111000111111000111111000111111000111111000111111000111, 0b1000111111000111111000111111000111111000111111000111111000111111),
+    (0b0111111111111111111000000000111111111111111111000000000111111111, 0b1111111111000000000111111111111111111000000000111111111111111111),
+    (0b1111111111000000000000000000000000000111111111111111111111111111, 0b0000000000111111111111111111111111111111111111111111111111111111),
+)
+
+# Jobs are cancelled by writing their id into this shared array, it is inherited by every worker process of a pool.
+_CANCEL_SLOTS = 1024
+_cancelled = None
+
+
+class _WorkerPool:
+    """ Process pool whose jobs can be cancelled cooperatively through a shared array of cancelled job ids. """
+    
+    def __init__(self, processes=None, words=64):
+        self.processes = processes or os.cpu_count() or 1
+        self.words = words
+        self._cancelled = multiprocessing.RawArray('q', _CANCEL_SLOTS)
+        self._executor = concurrent.futures.ProcessPoolExecutor(self.processes, initializer=_initWorker, initargs=(self._cancelled,))
+        self._jobIds = itertools.count(1)
+        self._running = set()
+        self._lock = threading.Lock()
+    
+    def cancel(self, jobId):
+        self._cancelled[jobId % _CANCEL_SLOTS] = jobId
+    
+    def interrupt(self):
+        """ Cancel every job which is queued or running. """
+        with self._lock:
+            running = list(self._running)
+        for jobId in running:
+            self.cancel(jobId)
+    
+    def close(self):
+        self.interrupt()
+        self._executor.shutdown()
+    
+    def _start(self):
+        jobId = next(self._jobIds)
+        with self._lock:
+            self._running.add(jobId)
+        return jobId
+    
+    def _finish(self, jobId):
+        with self._lock:
+            self._running.discard(jobId)
+
+
+class PowEngine(_WorkerPool):
+    """ Runs the Curl-P81 proof of work of attachToTangle on the local machine. The nonce search is bit sliced, every 64 bit
+        word tests 64 nonces at once and each transformation works on many words, the search of a transaction is spread
+        over all worker processes.
+        Constructor:
+            processes (integer): Number of worker processes, defaults to the number of cores.
+            words (integer): Number of 64 bit words (64 nonces each) tested by one transformation in a worker.
+    
+        Methods:
+            attachToTangle: Chain, timestamp and do the proof of work for a list of transaction trytes.
+            searchNonce: Find a nonce for the trytes of a single transaction.
+            interrupt: Abort all running searches.
+            close: Stop the worker processes.
+    """
+    
+    def attachToTangle(self, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList):
+        """ Work like the attachToTangle command of IRI: the first transaction approves trunk and branch, every following
+            transaction approves the previous one and the trunk. Returns the trytes in reverse order, like IRI does.
+        """
+        return attach(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList, self.searchNonce)
+    
+    def searchNonce(self, trytes, minWeightMagnitude):
+        """ Return the 27 nonce trytes which give the transaction a hash ending in minWeightMagnitude 0 trits. """
+        _checkWeight(minWeightMagnitude)
+        low, high = midState(trytes)
+        jobId = self._start()
+        futures = [self._executor.submit(_search, low, high, minWeightMagnitude, worker * self.words, self.words, jobId)
+                   for worker in range(self.processes)]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                nonce = future.result()
+                if nonce is not None:
+                    return nonce
+            raise PowInterrupted('Proof of work was interrupted')
+        finally:
+            self.cancel(jobId)
+            self._finish(jobId)
+
+
+class PowScheduler(_WorkerPool):
+    """ Runs a queue of attachToTangle jobs on a process pool, one bundle per worker process, so the proof of work of
+        different bundles overlaps. Every job has its own future and an optional deadline and can be cancelled while it
+        is queued or running.
+        Constructor:
+            processes (integer): Number of worker processes, defaults to the number of cores.
+            words (integer): Number of 64 bit words (64 nonces each) tested by one transformation in a worker.
+    
+        Methods:
+            submit: Queue the proof of work of a bundle and return its PowJob.
+            interrupt: Cancel all queued and running jobs.
+            close: Stop the worker processes.
+    """
+    
+    def submit(self, trunkTransaction, branchTransaction, minWeightMagnitude, trytesList, timeout=None):
+        """ Queue a bundle, the PowJob resolves to the attached trytes in the order attachToTangle returns them.
+            timeout (float): Seconds after which the job gives up with PowTimeout, counted from submission.
+        """
+        _checkWeight(minWeightMagnitude)
+        deadline = time.time() + timeout if timeout is not None else None
+        jobId = self._start()
+        future = self._executor.submit(_attachBundle, trunkTransaction, branchTransaction, minWeightMagnitude, list(trytesList),
+                                       self.words, jobId, deadline)
+        future.add_done_callback(lambda _: self._finish(jobId))
+        return PowJob(self, jobId, future, deadline)
+
+
+class PowJob:
+    """ Handle of a job queued on a PowScheduler.
+        Methods:
+            result: Wait for and return the attached trytes, raises PowInterrupted or PowTimeout if the job did not finish.
+            cancel: Cancel the job, a running search stops at its next check.
+            done: Whether the job has finished.
+    """
+    
+    def __init__(self, scheduler, jobId, future, deadline):
+        self.jobId = jobId
+        self.future = future
+        self.deadline = deadline
+        self._scheduler = scheduler
+    
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+    
+    def cancel(self):
+        self._scheduler.cancel(self.jobId)
+        self.future.cancel()
+    
+    def done(self):
+        return self.future.done()
+
+
+class PowInterrupted(Exception):
+    """ Raised when a proof of work search is cancelled before a nonce was found. """
+
+
+class PowTimeout(PowInterrupted):
+    """ Raised when a proof of work job passes its deadline. """
+
+
+def attach(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList, searchNonce):
+    """ Fill in trunk, branch, attachment timestamps and nonce of every transaction like attachToTangle, using the given
+        searchNonce(trytes, minWeightMagnitude) function. Returns the trytes in reverse order.
+    """
+    _checkHash(trunkTransaction)
+    _checkHash(branchTransaction)
+    attached = []
+    previous = None
+    for trytes in trytesList:
+        if len(trytes) != TRANSACTION_TRYTES:
+            raise ValueError('A transaction consists of %d trytes' % TRANSACTION_TRYTES)
+        trunk, branch = (trunkTransaction, branchTransaction) if previous is None else (previous, trunkTransaction)
+        timestamp = trinary.tritsToTrytes(trinary.intToTrits([int(time.time() * 1000), 0, MAX_TIMESTAMP], 27))
+        trytes = trytes[:_TRUNK] + trunk + branch + trytes[_BRANCH + 81:_ATTACHMENT_TIMESTAMP] + ''.join(timestamp) + trytes[_NONCE:]
+        trytes = trytes[:_NONCE] + searchNonce(trytes, minWeightMagnitude)
+        previous = curl.transactionHash(trytes)
+        attached.append(trytes)
+    return attached[::-1]
+
+
+def midState(trytes):
+    """ Absorb everything but the last block of a transaction and return the bit sliced (low, high) state with the last
+        block loaded and the four lane enumerating nonce trits set. Both arrays hold 729 uint64 words.
+    """
+    trits = trinary.trytesToTrits(trytes)
+    state = np.zeros(curl.STATE_LENGTH, dtype=np.int8)
+    last = len(trits) - curl.HASH_LENGTH
+    for offset in range(0, last, curl.HASH_LENGTH):
+        state[:curl.HASH_LENGTH] = trits[offset:offset + curl.HASH_LENGTH]
+        state = curl.transform(state)
+    state[:curl.HASH_LENGTH] = trits[last:]
+    state[_NONCE_START:curl.HASH_LENGTH] = 0
+    low, high = _slice(state)
+    for i, (laneLow, laneHigh) in enumerate(_LANES):
+        low[_NONCE_START + i] = laneLow
+        high[_NONCE_START + i] = laneHigh
+    return low, high
+
+
+def _attachBundle(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList, words, jobId, deadline):
+    """ Worker process: attach a whole bundle within this process. """
+    def searchNonce(trytes, minWeightMagnitude):
+        low, high = midState(trytes)
+        nonce = _search(low, high, minWeightMagnitude, 0, words, jobId, deadline)
+        if nonce is None:
+            raise PowInterrupted('Proof of work was interrupted')
+        return nonce
+    return attach(trunkTransaction, branchTransaction, minWeightMagnitude, trytesList, searchNonce)
+
+
+def _search(midLow, midHigh, minWeightMagnitude, firstWord, words, jobId, deadline=None):
+    """ Worker process: search nonces in the words firstWord ... firstWord + words until one is found, the job is
+        cancelled (returns None) or the deadline has passed (raises PowTimeout).
+    """
+    baseLow = np.repeat(midLow[:, None], words, axis=1)
+    baseHigh = np.repeat(midHigh[:, None], words, axis=1)
+    wordTrits = _balancedTrits(np.arange(firstWord, firstWord + words), _COUNTER_START - _WORD_START)
+    _setTrits(baseLow, baseHigh, _WORD_START, wordTrits)
+    low = np.empty_like(baseLow)
+    high = np.empty_like(baseHigh)
+    for counter in itertools.count():
+        if _cancelled is not None and _cancelled[jobId % _CANCEL_SLOTS] == jobId:
+            return None
+        if deadline is not None and time.time() > deadline:
+            raise PowTimeout('Proof of work passed its deadline')
+        counterTrits = _balancedTrits(np.full(words, counter), curl.HASH_LENGTH - _COUNTER_START)
+        _setTrits(baseLow, baseHigh, _COUNTER_START, counterTrits)
+        np.copyto(low, baseLow)
+        np.copyto(high, baseHigh)
+        curl.transformSliced(low, high)
+        tail = slice(curl.HASH_LENGTH - minWeightMagnitude, curl.HASH_LENGTH)
+        mask = np.bitwise_and.reduce(~(low[tail] ^ high[tail]), axis=0)
+        found = np.flatnonzero(mask)
+        if len(found):
+            word = found[0]
+            bit = np.uint64((int(mask[word]) & -int(mask[word])).bit_length() - 1)
+            lowBits = (baseLow[_NONCE_START:curl.HASH_LENGTH, word] >> bit) & np.uint64(1)
+            highBits = (baseHigh[_NONCE_START:curl.HASH_LENGTH, word] >> bit) & np.uint64(1)
+            nonce = np.where(lowBits == 0, 1, np.where(highBits == 0, -1, 0)).astype(np.int8)
+            return trinary.tritsToTrytes(nonce)
+
+
+def _initWorker(cancelled):
+    global _cancelled
+    _cancelled = cancelled
+
+
+def _slice(trits):
+    """ Convert trits into bit sliced (low, high) words, every lane of a word holds the same trit. """
+    low = np.where(trits == 1, np.uint64(0), _HIGH_BITS)
+    high = np.where(trits == -1, np.uint64(0), _HIGH_BITS)
+    return low, high
+
+
+def _setTrits(low, high, start, trits):
+    """ Write (length, words) trits into the rows start ... start + length of bit sliced states. """
+    low[start:start + len(trits)] = np.where(trits == 1, np.uint64(0), _HIGH_BITS)
+    high[start:start + len(trits)] = np.where(trits == -1, np.uint64(0), _HIGH_BITS)
+
+
+def _balancedTrits(values, length):
+    """ Balanced ternary digits of non negative integers as (length, len(values)) array. """
+    values = np.array(values, dtype=np.int64)
+    trits = np.empty((length, len(values)), dtype=np.int8)
+    for i in range(length):
+        digit = (values + 1) % 3 - 1
+        trits[i] = digit
+        values = (values - digit) // 3
+    return trits
+
+
+def _checkWeight(minWeightMagnitude):
+    if not 0 < minWeightMagnitude <= curl.HASH_LENGTH:
+        raise ValueError('minWeightMagnitude must be between 1 and %d' % curl.HASH_LENGTH)
+
+
+def _checkHash(trytes):
+    if len(trytes) != 81:
+        raise ValueError('A transaction hash consists of 81 trytes')
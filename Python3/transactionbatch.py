@@ -0,0 +1,183 @@
+# The software is released under MIT License.
+#
+# Copyright 2017 github.com/ptrk01
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software # without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+# to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions 
+# of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A #PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF 
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER 
+# DEALINGS IN THE SOFTWARE.
+
+""" Columnar storage for many transactions, see TransactionBatch. """
+
+import numpy as np
+
+import iotawrapper
+import trinary
+import curl
+
+# Name, first and last tryte of every field of the 2673 tryte transaction layout.
+FIELDS = (
+    ('signatureMessageFragment', 0, 2187),
+    ('address', 2187, 2268),
+    ('value', 2268, 2295),
+    ('obsoleteTag', 2295, 2322),
+    ('timestamp', 2322, 2331),
+    ('currentIndex', 2331, 2340),
+    ('lastIndex', 2340, 2349),
+    ('bundle', 2349, 2430),
+    ('trunkTransaction', 2430, 2511),
+    ('branchTransaction', 2511, 2592),
+    ('tag', 2592, 2619),
+    ('attachmentTimestamp', 2619, 2628),
+    ('attachmentTimestampLowerBound', 2628, 2637),
+    ('attachmentTimestampUpperBound', 2637, 2646),
+    ('nonce', 2646, 2673),
+)
+INTEGER_FIELDS = ('value', 'timestamp', 'currentIndex', 'lastIndex', 'attachmentTimestamp',
+                  'attachmentTimestampLowerBound', 'attachmentTimestampUpperBound')
+# Only the first 33 trits (11 trytes) of the value field are used by the protocol, which keeps every value within int64.
+_VALUE_TRYTES = 11
+
+
+class TransactionBatch:
+    """ Struct of arrays holding many transactions, with one NumPy column per field.
+        Integer fields (value, timestamp, currentIndex, lastIndex and the attachment timestamps) are int64 columns, hashes, tags
+        and the nonce are fixed width byte string columns (dtype S81 / S27). All columns are decoded in one vectorized pass over
+        the raw trytes, so aggregations run as column operations instead of a Python loop per transaction.
+        Constructor:
+            trytesList (list of strings or uint8 array): Raw trytes of the transactions, None entries are treated as empty (all 9) transactions.
+    
+        Methods:
+            column: Column of a field by name.
+            signatureMessageFragment, address, value, obsoleteTag, timestamp, currentIndex, lastIndex, bundle, trunkTransaction,
+            branchTransaction, tag, attachmentTimestamp, attachmentTimestampLowerBound, attachmentTimestampUpperBound, nonce: Column of the field.
+            hash: Curl-P81 hashes of all transactions, computed in one batch on first use.
+            transaction: Transaction object of a single row.
+            take: New batch holding the rows selected by an index array or boolean mask.
+            sumBy: Sum of a column grouped by another column, e.g. the value per address.
+            trytes: Raw trytes of all rows.
+    """
+    
+    def __init__(self, trytesList):
+        if isinstance(trytesList, np.ndarray):
+            raw = trytesList
+        else:
+            empty = '9' * iotawrapper.Transaction.trytesLength
+            raw = trinary.trytesToArray([trytes if trytes is not None else empty for trytes in trytesList])
+        if raw.size == 0:
+            raw = np.zeros((0, iotawrapper.Transaction.trytesLength), dtype=np.uint8)
+        if raw.ndim != 2 or raw.shape[1] != iotawrapper.Transaction.trytesLength:
+            raise ValueError('A transaction consists of %d trytes' % iotawrapper.Transaction.trytesLength)
+        self._raw = raw
+        self._columns = {}
+        for name, start, stop in FIELDS:
+            if name in INTEGER_FIELDS:
+                if name == 'value':
+                    stop = start + _VALUE_TRYTES
+                values = trinary.trytesToValues(raw[:, start:stop]).astype(np.int64)
+                self._columns[name] = values @ (27 ** np.arange(stop - start, dtype=np.int64))
+            elif name != 'signatureMessageFragment':
+                self._columns[name] = np.ascontiguousarray(raw[:, start:stop]).view('S%d' % (stop - start)).ravel()
+    
+    def __len__(self):
+        return len(self._raw)
+    
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.transaction(row)
+    
+    def column(self, name):
+        if name == 'hash':
+            return self.hash()
+        if name == 'signatureMessageFragment':
+            return np.ascontiguousarray(self._raw[:, :2187]).view('S2187').ravel()
+        return self._columns[name]
+    
+    def hash(self):
+        if 'hash' not in self._columns:
+            hashes = curl.hashBatch(trinary.trytesToTrits(self._raw))
+            self._columns['hash'] = trinary.trytesToArray(trinary.tritsToTrytes(hashes)).view('S81').ravel() if len(self) else np.zeros(0, dtype='S81')
+        return self._columns['hash']
+    
+    def signatureMessageFragment(self):
+        return self.column('signatureMessageFragment')
+    
+    def address(self):
+        return self._columns['address']
+    
+    def value(self):
+        return self._columns['value']
+    
+    def obsoleteTag(self):
+        return self._columns['obsoleteTag']
+    
+    def timestamp(self):
+        return self._columns['timestamp']
+    
+    def currentIndex(self):
+        return self._columns['currentIndex']
+    
+    def lastIndex(self):
+        return self._columns['lastIndex']
+    
+    def bundle(self):
+        return self._columns['bundle']
+    
+    def trunkTransaction(self):
+        return self._columns['trunkTransaction']
+    
+    def branchTransaction(self):
+        return self._columns['branchTransaction']
+    
+    def tag(self):
+        return self._columns['tag']
+    
+    def attachmentTimestamp(self):
+        return self._columns['attachmentTimestamp']
+    
+    def attachmentTimestampLowerBound(self):
+        return self._columns['attachmentTimestampLowerBound']
+    
+    def attachmentTimestampUpperBound(self):
+        return self._columns['attachmentTimestampUpperBound']
+    
+    def nonce(self):
+        return self._columns['nonce']
+    
+    def transaction(self, row):
+        return iotawrapper.Transaction(self._raw[row].tobytes())
+    
+    def take(self, rows):
+        """ Return a new batch with the rows selected by an index array or boolean mask. """
+        batch = TransactionBatch.__new__(TransactionBatch)
+        batch._raw = self._raw[rows]
+        batch._columns = dict((name, column[rows]) for name, column in self._columns.items())
+        return batch
+    
+    def sumBy(self, key, column='value'):
+        """ Sum a column per distinct value of the key column. Returns the sorted distinct keys and the matching sums as arrays.
+            key (str): Column to group by, e.g. address or bundle.
+            column (str): Integer column to sum up.
+        """
+        keys = self.column(key)
+        values = self.column(column)
+        if not len(keys):
+            return keys[:0], values[:0]
+        order = np.argsort(keys, kind='stable')
+        sortedKeys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], sortedKeys[1:] != sortedKeys[:-1])))
+        return sortedKeys[starts], np.add.reduceat(values[order], starts)
+    
+    def trytes(self):
+        joined = self._raw.tobytes().decode('ascii')
+        length = iotawrapper.Transaction.trytesLength
+        return [joined[i:i + length] for i in range(0, len(joined), length)]
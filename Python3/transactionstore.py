@@ -0,0 +1,235 @@
+# The software is released under MIT License.
+#
+# Copyright 2017 github.com/ptrk01
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software # without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+# to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions 
+# of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A #PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF 
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER 
+# DEALINGS IN THE SOFTWARE.
+
+""" Persistent on-disk store for transaction trytes, see TransactionStore. """
+
+import hashlib
+import struct
+import mmap
+import threading
+import os
+
+import iotawrapper
+
+HASH_TRYTES = 81
+RECORD_SIZE = HASH_TRYTES + iotawrapper.Transaction.trytesLength
+
+_INDEX_MAGIC = b'IOTAIDX1'
+_INDEX_HEADER = struct.Struct('<8sQQ')
+_SLOT = struct.Struct('<QQ')
+_MIN_CAPACITY = 1024
+
+
+class TransactionStore:
+    """ Append-only store of transactions on disk, which can sit behind Api.getTrytes so restarted workers do not download
+        the same transactions again.
+        The data file holds fixed size records (81 tryte hash followed by the 2673 trytes) and is read through mmap. The index
+        file is an open addressing hash table of (fingerprint, record number) slots, also read through mmap, so neither file
+        is loaded into memory and lookups stay cheap with tens of millions of records. The index is rebuilt from the data
+        file if it is missing or out of date. A store must only be written by one process at a time.
+        Constructor:
+            path (str): Path of the store, the files path.dat and path.idx are created if they do not exist.
+    
+        Methods:
+            get: Return the trytes of a transaction hash or None.
+            getTransaction: Return a Transaction reading directly from the mapped file, or None.
+            put: Store the trytes of a transaction.
+            putMany: Store many (hash, trytes) pairs with a single write.
+            flush: Write pending changes to disk.
+            close: Flush and close the store.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._data = open(path + '.dat', 'a+b')
+        size = os.fstat(self._data.fileno()).st_size
+        if size % RECORD_SIZE:
+            # Drop a record which was only partially written when the last writer stopped.
+            self._data.truncate(size - size % RECORD_SIZE)
+        self._count = os.fstat(self._data.fileno()).st_size // RECORD_SIZE
+        self._written = self._count
+        self._dataMap = None
+        self._openIndex()
+    
+    def __len__(self):
+        return self._count
+    
+    def __contains__(self, hash):
+        return self._find(hash)[1] is not None
+    
+    def get(self, hash):
+        with self._lock:
+            record = self._find(hash)[1]
+            if record is None:
+                return None
+            offset = record * RECORD_SIZE + HASH_TRYTES
+            return self._dataMap[offset:offset + iotawrapper.Transaction.trytesLength].decode('ascii')
+    
+    def getTransaction(self, hash):
+        with self._lock:
+            record = self._find(hash)[1]
+            if record is None:
+                return None
+            return iotawrapper.Transaction(self._dataMap, record * RECORD_SIZE + HASH_TRYTES)
+    
+    def put(self, hash, trytes):
+        self.putMany([(hash, trytes)])
+    
+    def putMany(self, transactions):
+        # Check and encode the whole batch before the index is touched, a bad item must not leave slots behind which point to
+        # records that are never written.
+        encoded = []
+        for hash, trytes in transactions:
+            if len(hash) != HASH_TRYTES or len(trytes) != iotawrapper.Transaction.trytesLength:
+                raise ValueError('Expected a %d tryte hash and %d trytes' % (HASH_TRYTES, iotawrapper.Transaction.trytesLength))
+            encoded.append((hash, (hash + trytes).encode('ascii')))
+        with self._lock:
+            records = []
+            for hash, data in encoded:
+                slot, record = self._find(hash)
+                if record is not None:
+                    continue
+                self._setSlot(slot, _fingerprint(hash), self._count)
+                records.append(data)
+                # Later hashes of the same batch must find this one although it is not written yet.
+                self._pending[hash] = self._count
+                self._count += 1
+                self._growIndex()
+            if records:
+                self._data.seek(0, os.SEEK_END)
+                self._data.write(b''.join(records))
+                self._data.flush()
+                self._written = self._count
+                self._pending.clear()
+                self._writeHeader()
+    
+    def flush(self):
+        with self._lock:
+            self._data.flush()
+            os.fsync(self._data.fileno())
+            self._indexMap.flush()
+    
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._indexMap.close()
+            self._index.close()
+            self._data.close()
+    
+    def _find(self, hash):
+        """ Return the index slot of a hash and its record number, or the free slot it belongs into and None. """
+        if self._pending and hash in self._pending:
+            return None, self._pending[hash]
+        fingerprint = _fingerprint(hash)
+        mask = self._capacity - 1
+        slot = fingerprint & mask
+        encoded = None
+        while True:
+            stored, record = _SLOT.unpack_from(self._indexMap, _INDEX_HEADER.size + slot * _SLOT.size)
+            if stored == 0:
+                return slot, None
+            if stored == fingerprint and record - 1 < self._written:
+                encoded = encoded or hash.encode('ascii')
+                offset = (record - 1) * RECORD_SIZE
+                if self._mapData(offset + RECORD_SIZE)[offset:offset + HASH_TRYTES] == encoded:
+                    return slot, record - 1
+            slot = (slot + 1) & mask
+    
+    def _setSlot(self, slot, fingerprint, record):
+        _SLOT.pack_into(self._indexMap, _INDEX_HEADER.size + slot * _SLOT.size, fingerprint, record + 1)
+    
+    def _mapData(self, size):
+        """ Return a map of the data file covering at least size bytes, the file is remapped after it grew. """
+        if self._dataMap is None or len(self._dataMap) < size:
+            self._data.flush()
+            # Older maps are not closed, Transactions returned by getTransaction may still read from them.
+            self._dataMap = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._dataMap
+    
+    def _openIndex(self):
+        self._pending = {}
+        self._index = open(self.path + '.idx', 'a+b')
+        self._index.seek(0)
+        header = self._index.read(_INDEX_HEADER.size)
+        if len(header) == _INDEX_HEADER.size:
+            magic, count, capacity = _INDEX_HEADER.unpack(header)
+            if magic == _INDEX_MAGIC and count == self._count:
+                self._capacity = capacity
+                self._indexMap = mmap.mmap(self._index.fileno(), 0)
+                return
+        self._indexMap = None
+        self._rebuildIndex()
+    
+    def _rebuildIndex(self):
+        """ Create a new index and insert every record of the data file. """
+        self._newIndex(_capacityFor(self._count))
+        if self._count:
+            dataMap = self._mapData(self._count * RECORD_SIZE)
+            for record in range(self._count):
+                offset = record * RECORD_SIZE
+                self._insert(_fingerprint(dataMap[offset:offset + HASH_TRYTES].decode('ascii')), record)
+        self._writeHeader()
+    
+    def _growIndex(self):
+        """ Double the index once it is half full, slots are moved by fingerprint without reading the data file. """
+        if self._count * 2 <= self._capacity:
+            return
+        oldIndex, oldMap = self._index, self._indexMap
+        self._newIndex(self._capacity * 2)
+        slots = memoryview(oldMap)[_INDEX_HEADER.size:]
+        for fingerprint, record in _SLOT.iter_unpack(slots):
+            if fingerprint:
+                self._insert(fingerprint, record - 1)
+        slots.release()
+        oldMap.close()
+        oldIndex.close()
+        self._writeHeader()
+    
+    def _newIndex(self, capacity):
+        """ Write an empty index of the given capacity next to the current one and replace it. """
+        index = open(self.path + '.idx.new', 'w+b')
+        index.write(_INDEX_HEADER.pack(_INDEX_MAGIC, 0, capacity))
+        index.truncate(_INDEX_HEADER.size + capacity * _SLOT.size)
+        index.flush()
+        os.replace(self.path + '.idx.new', self.path + '.idx')
+        self._index = index
+        self._indexMap = mmap.mmap(index.fileno(), 0)
+        self._capacity = capacity
+    
+    def _insert(self, fingerprint, record):
+        mask = self._capacity - 1
+        slot = fingerprint & mask
+        while _SLOT.unpack_from(self._indexMap, _INDEX_HEADER.size + slot * _SLOT.size)[0]:
+            slot = (slot + 1) & mask
+        self._setSlot(slot, fingerprint, record)
+    
+    def _writeHeader(self):
+        _INDEX_HEADER.pack_into(self._indexMap, 0, _INDEX_MAGIC, self._count, self._capacity)
+
+
+def _fingerprint(hash):
+    """ Non zero 64 bit fingerprint of a transaction hash, used to place it in the index. """
+    return int.from_bytes(hashlib.blake2b(hash.encode('ascii'), digest_size=8).digest(), 'little') | 1
+
+
+def _capacityFor(count):
+    capacity = _MIN_CAPACITY
+    while capacity < count * 2:
+        capacity *= 2
+    return capacity
@@ -0,0 +1,406 @@
+# The software is released under MIT License.
+#
+# Copyright 2017 github.com/ptrk01
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software # without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and
+# to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions 
+# of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A #PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF 
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER 
+# DEALINGS IN THE SOFTWARE.
+
+""" Vectorized conversion between trytes, trits, integers and bytes.
+
+    All functions accept a single value as well as a batch. A batch of trytes is a list of strings of equal length
+    (for example 2673-tryte transactions as returned by getTrytes), a batch of trits is a two dimensional array with
+    one row per value. Conversions run on NumPy lookup tables over the whole batch instead of looping per character.
+"""
+
+import numpy as np
+
+TRYTE_ALPHABET = '9ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+TRITS_PER_TRYTE = 3
+HASH_TRITS = 243
+HASH_BYTES = 48
+TRITS_PER_BYTE = 5
+PACKED_HASH_BYTES = -(-HASH_TRITS // TRITS_PER_BYTE)
+
+# Largest number of trits whose balanced value fits into an int64 and whose unbalanced value fits into an uint64.
+_WORD_TRITS = 40
+_POWERS = 3 ** np.arange(_WORD_TRITS, dtype=np.uint64)
+
+_INVALID = 127
+_ASCII_TO_TRYTE = np.full(256, _INVALID, dtype=np.int8)
+for _value, _char in enumerate(TRYTE_ALPHABET):
+    _ASCII_TO_TRYTE[ord(_char)] = _value if _value <= 13 else _value - 27
+
+# Trits of the tryte values -13 ... 13, indexed by value + 13.
+_TRYTE_TO_TRITS = np.array([[(v + 13) % 3 - 1, (v + 13) // 3 % 3 - 1, (v + 13) // 9 - 1] for v in range(-13, 14)], dtype=np.int8)
+# Trits of every ASCII code, rows of invalid characters are never read because trytesToValues rejects them first.
+_ASCII_TO_TRITS = _TRYTE_TO_TRITS[np.where(_ASCII_TO_TRYTE == _INVALID, 0, _ASCII_TO_TRYTE).astype(np.intp) + 13]
+# ASCII code of the tryte values -13 ... 13, indexed by value + 13.
+_TRYTE_TO_ASCII = np.array([ord(TRYTE_ALPHABET[v % 27]) for v in range(-13, 14)], dtype=np.uint8)
+
+# A packed byte holds the balanced value (-121 ... 121) of 5 trits as signed byte.
+_PACK_POWERS = 3 ** np.arange(TRITS_PER_BYTE, dtype=np.int16)
+_PACKED_MAX = (3 ** TRITS_PER_BYTE - 1) // 2
+# Trits of every byte, indexed by the unsigned byte. The bytes outside -121 ... 121 are marked in _BYTE_INVALID.
+_BYTE_VALUES = np.arange(256, dtype=np.int16) - 256 * (np.arange(256) >= 128)
+_BYTE_TO_TRITS = ((_BYTE_VALUES[:, None] + _PACKED_MAX) // 3 ** np.arange(TRITS_PER_BYTE) % 3 - 1).astype(np.int8)
+_BYTE_INVALID = np.abs(_BYTE_VALUES) > _PACKED_MAX
+
+
+def _asciiTable(*parts):
+    """ ASCII code of the tryte whose 3 trits are joined from the given trit arrays, broadcasting all but the last axis. """
+    shape = np.broadcast_shapes(*(part.shape[:-1] for part in parts))
+    joined = np.concatenate([np.broadcast_to(part, shape + part.shape[-1:]) for part in parts], axis=-1).astype(np.intp)
+    return _TRYTE_TO_ASCII[joined[..., 0] + 3 * joined[..., 1] + 9 * joined[..., 2] + 13].ravel()
+
+
+# 5 trytes (15 trits) are packed into 3 bytes: byte 0 holds tryte 0 and the low 2 trits of tryte 1, byte 1 the high trit of
+# tryte 1, tryte 2 and the low trit of tryte 3, byte 2 the high 2 trits of tryte 3 and tryte 4. packTrytes adds up the share of
+# every tryte in its bytes, looked up by ASCII code. unpackTrytes looks up every tryte by the one or two bytes it is spread over.
+_A = _ASCII_TO_TRITS.astype(np.int16)
+_SHARES = np.stack([_A @ [1, 3, 9], _A[:, :2] @ [27, 81], _A[:, 2], _A @ [3, 9, 27], _A[:, 0] * 81, _A[:, 1:] @ [1, 3],
+                    _A @ [9, 27, 81]]).astype(np.int8)
+_B = _BYTE_TO_TRITS
+_UNPACK = (_asciiTable(_B[:, :3]), _asciiTable(_B[:, None, 3:], _B[None, :, :1]), _asciiTable(_B[:, 1:4]),
+           _asciiTable(_B[:, None, 4:], _B[None, :, :2]), _asciiTable(_B[:, 2:]))
+del _A, _B
+# Rows converted at once by packTrytes and unpackTrytes, which keeps their intermediate arrays small.
+_ROW_BLOCK = 8192
+
+
+def trytesToArray(trytes):
+    """ Return the ASCII codes of trytes as uint8 array, one row per string for a batch.
+        trytes (str, bytes or list of strings): Trytes to convert, all strings of a batch must have the same length.
+    """
+    if isinstance(trytes, np.ndarray):
+        return trytes
+    if isinstance(trytes, (str, bytes, bytearray, memoryview)):
+        raw = trytes.encode('ascii') if isinstance(trytes, str) else trytes
+        return np.frombuffer(raw, dtype=np.uint8)
+    trytes = list(trytes)
+    if not trytes:
+        return np.zeros((0, 0), dtype=np.uint8)
+    length = len(trytes[0])
+    if any(len(t) != length for t in trytes):
+        raise ValueError('All trytes of a batch must have the same length')
+    raw = ''.join(trytes).encode('ascii') if isinstance(trytes[0], str) else b''.join(trytes)
+    return np.frombuffer(raw, dtype=np.uint8).reshape(len(trytes), length)
+
+
+def trytesToValues(trytes):
+    """ Return the integer value (-13 ... 13) of every tryte as int8 array. """
+    values = _ASCII_TO_TRYTE[trytesToArray(trytes)]
+    if (values == _INVALID).any():
+        raise ValueError('Trytes may only contain the characters %s' % TRYTE_ALPHABET)
+    return values
+
+
+def trytesToTrits(trytes):
+    """ Convert trytes into balanced trits (-1, 0, 1). A single string gives a flat int8 array, a batch one row per string. """
+    codes = trytesToArray(trytes)
+    if (_ASCII_TO_TRYTE[codes] == _INVALID).any():
+        raise ValueError('Trytes may only contain the characters %s' % TRYTE_ALPHABET)
+    return _ASCII_TO_TRITS[codes].reshape(codes.shape[:-1] + (codes.shape[-1] * TRITS_PER_TRYTE,))
+
+
+def tritsToTrytes(trits):
+    """ Convert balanced trits into trytes. A flat array gives a string, a two dimensional array a list of strings. """
+    trits = np.asarray(trits, dtype=np.int8)
+    if trits.shape[-1] % TRITS_PER_TRYTE:
+        raise ValueError('Number of trits must be a multiple of %d' % TRITS_PER_TRYTE)
+    _checkTrits(trits)
+    grouped = trits.reshape(trits.shape[:-1] + (-1, TRITS_PER_TRYTE)).astype(np.intp)
+    ascii = _TRYTE_TO_ASCII[grouped[..., 0] + 3 * grouped[..., 1] + 9 * grouped[..., 2] + 13]
+    if ascii.ndim == 1:
+        return ascii.tobytes().decode('ascii')
+    length = ascii.shape[1]
+    joined = ascii.tobytes().decode('ascii')
+    return [joined[i:i + length] for i in range(0, len(joined), length)] if length else [''] * len(ascii)
+
+
+def tritsToInt(trits):
+    """ Return the balanced ternary value of trits (least significant trit first).
+        A flat array gives an int, a two dimensional array one value per row. Rows of up to 40 trits give an int64 array,
+        longer rows an object array of Python ints.
+    """
+    trits = np.asarray(trits, dtype=np.int8)
+    _checkTrits(trits)
+    rows = np.atleast_2d(trits)
+    if rows.shape[1] <= _WORD_TRITS:
+        values = rows.astype(np.int64) @ _POWERS[:rows.shape[1]].astype(np.int64)
+    else:
+        unbalanced = _unbalancedInts(rows + 1)
+        half = (3 ** rows.shape[1] - 1) // 2
+        values = np.array([value - half for value in unbalanced] + [None], dtype=object)[:-1]
+    return values[0] if trits.ndim == 1 else values
+
+
+def intToTrits(values, length):
+    """ Convert integers into balanced trits of the given length (least significant trit first).
+        An int gives a flat array, a sequence of ints one row per value.
+    """
+    single = np.ndim(values) == 0
+    values = [values] if single else list(values)
+    half = (3 ** length - 1) // 2
+    if any(value < -half or value > half for value in values):
+        raise ValueError('Value does not fit into %d trits' % length)
+    if length <= _WORD_TRITS:
+        unbalanced = np.array([value + half for value in values], dtype=np.uint64).reshape(-1, 1)
+    else:
+        unbalanced = _wordsOf([value + half for value in values], -(-length // _WORD_TRITS))
+    trits = _digitsOf(unbalanced)[:, :length] - 1
+    return trits[0] if single else trits
+
+
+def tritsToBytes(trits):
+    """ Convert 243 trits into the 48 byte big endian two's complement representation used by Kerl.
+        The last trit is ignored (treated as 0). A flat array gives bytes, a two dimensional array an uint8 array of shape (N, 48).
+    """
+    trits = np.asarray(trits, dtype=np.int8)
+    if trits.shape[-1] != HASH_TRITS:
+        raise ValueError('Expected %d trits, got %d' % (HASH_TRITS, trits.shape[-1]))
+    _checkTrits(trits)
+    rows = np.atleast_2d(trits)
+    half = (3 ** (HASH_TRITS - 1) - 1) // 2
+    unbalanced = _unbalancedInts(rows[:, :HASH_TRITS - 1] + 1)
+    raw = b''.join((value - half).to_bytes(HASH_BYTES, 'big', signed=True) for value in unbalanced)
+    if trits.ndim == 1:
+        return raw
+    return np.frombuffer(raw, dtype=np.uint8).reshape(len(rows), HASH_BYTES)
+
+
+def bytesToTrits(data):
+    """ Convert 48 big endian two's complement bytes into 243 trits, the inverse of tritsToBytes.
+        bytes give a flat array, a list of bytes or an uint8 array of shape (N, 48) one row per value.
+    """
+    rows, single = _byteRows(data)
+    if rows.shape[1] != HASH_BYTES:
+        raise ValueError('Expected %d bytes, got %d' % (HASH_BYTES, rows.shape[1]))
+    half = (3 ** HASH_TRITS - 1) // 2
+    raw = rows.tobytes()
+    values = [int.from_bytes(raw[i:i + HASH_BYTES], 'big', signed=True) + half for i in range(0, len(raw), HASH_BYTES)]
+    trits = _digitsOf(_wordsOf(values, -(-HASH_TRITS // _WORD_TRITS)))[:, :HASH_TRITS] - 1
+    return trits[0] if single else trits
+
+
+def bytesToTrytes(data):
+    """ Encode bytes as trytes, two trytes per byte. A list of equally long bytes objects gives a list of strings. """
+    rows, single = _byteRows(data)
+    alphabet = np.frombuffer(TRYTE_ALPHABET.encode('ascii'), dtype=np.uint8)
+    ascii = np.stack([alphabet[rows % 27], alphabet[rows // 27]], axis=-1).reshape(len(rows), -1)
+    strings = [row.tobytes().decode('ascii') for row in ascii]
+    return strings[0] if single else strings
+
+
+def trytesToBytes(trytes):
+    """ Decode trytes created by bytesToTrytes back into bytes. A list of strings gives a list of bytes. """
+    codes = trytesToArray(trytes)
+    if codes.shape[-1] % 2:
+        raise ValueError('Number of trytes must be even')
+    values = _ASCII_TO_TRYTE[codes].astype(np.intp) % 27
+    if (_ASCII_TO_TRYTE[codes] == _INVALID).any():
+        raise ValueError('Trytes may only contain the characters %s' % TRYTE_ALPHABET)
+    pairs = values.reshape(values.shape[:-1] + (-1, 2))
+    decoded = pairs[..., 0] + 27 * pairs[..., 1]
+    if (decoded > 255).any():
+        raise ValueError('Trytes do not encode bytes')
+    decoded = decoded.astype(np.uint8)
+    return decoded.tobytes() if decoded.ndim == 1 else [row.tobytes() for row in decoded]
+
+
+def packTrits(trits):
+    """ Pack balanced trits into 5 trits per byte, the byte holds their value (-121 ... 121) as signed byte, the first trit
+        being the least significant. The last byte is padded with 0 trits. A flat array gives bytes, a two dimensional array an
+        uint8 array with one row per value, e.g. 49 bytes per 243 trit hash instead of 81 tryte characters.
+    """
+    trits = np.asarray(trits, dtype=np.int8)
+    _checkTrits(trits)
+    rows = np.atleast_2d(trits)
+    padded = np.zeros((rows.shape[0], -(-rows.shape[1] // TRITS_PER_BYTE) * TRITS_PER_BYTE), dtype=np.int8)
+    padded[:, :rows.shape[1]] = rows
+    grouped = padded.reshape(len(rows), -1, TRITS_PER_BYTE)
+    # Every partial sum stays within -121 ... 121, so the sum is computed in int8.
+    packed = grouped[..., 0].copy()
+    for i in range(1, TRITS_PER_BYTE):
+        packed += grouped[..., i] * np.int8(3 ** i)
+    packed = packed.view(np.uint8)
+    return packed[0].tobytes() if trits.ndim == 1 else packed
+
+
+def unpackTrits(packed, length=None):
+    """ Unpack bytes created by packTrits back into balanced trits, length drops the padding trits of the last byte.
+        bytes give a flat array, a list of bytes or an uint8 array of shape (N, bytes) one row per value.
+    """
+    rows, single = _byteRows(packed)
+    if _BYTE_INVALID[rows].any():
+        raise ValueError('Packed trits may only contain the byte values -%d ... %d' % (_PACKED_MAX, _PACKED_MAX))
+    trits = _BYTE_TO_TRITS[rows].reshape(len(rows), -1)
+    if length is not None:
+        if length > trits.shape[1]:
+            raise ValueError('Expected at least %d bytes for %d trits' % (-(-length // TRITS_PER_BYTE), length))
+        trits = trits[:, :length]
+    return trits[0] if single else trits
+
+
+def packTrytes(trytes):
+    """ Pack trytes into 5 trits per byte like packTrits, a list of strings gives an uint8 array with one row per string. """
+    codes = trytesToArray(trytes)
+    rows = np.atleast_2d(codes)
+    length = rows.shape[1]
+    packed = np.empty((len(rows), -(-length * TRITS_PER_TRYTE // TRITS_PER_BYTE)), dtype=np.uint8)
+    padded = np.full((min(len(rows), _ROW_BLOCK), -(-length // 5) * 5), ord('9'), dtype=np.uint8)
+    for start in range(0, len(rows), _ROW_BLOCK):
+        block = rows[start:start + _ROW_BLOCK]
+        if (_ASCII_TO_TRYTE[block] == _INVALID).any():
+            raise ValueError('Trytes may only contain the characters %s' % TRYTE_ALPHABET)
+        padded[:len(block), :length] = block
+        grouped = padded[:len(block)].reshape(len(block), -1, 5)
+        groups = np.empty(grouped.shape[:2] + (3,), dtype=np.int8)
+        groups[..., 0] = _SHARES[0][grouped[..., 0]] + _SHARES[1][grouped[..., 1]]
+        groups[..., 1] = _SHARES[2][grouped[..., 1]] + _SHARES[3][grouped[..., 2]] + _SHARES[4][grouped[..., 3]]
+        groups[..., 2] = _SHARES[5][grouped[..., 3]] + _SHARES[6][grouped[..., 4]]
+        packed[start:start + len(block)] = groups.reshape(len(block), -1)[:, :packed.shape[1]].view(np.uint8)
+    return packed[0].tobytes() if codes.ndim == 1 else packed
+
+
+def unpackTrytes(packed, length):
+    """ Unpack length trytes packed by packTrytes or packTrits. bytes give a string, a batch a list of strings. """
+    rows, single = _byteRows(packed)
+    if rows.shape[1] * TRITS_PER_BYTE < length * TRITS_PER_TRYTE:
+        raise ValueError('Expected at least %d bytes for %d trytes' % (-(-length * TRITS_PER_TRYTE // TRITS_PER_BYTE), length))
+    if _BYTE_INVALID[rows].any():
+        raise ValueError('Packed trits may only contain the byte values -%d ... %d' % (_PACKED_MAX, _PACKED_MAX))
+    ascii = np.empty((len(rows), -(-rows.shape[1] // 3) * 5), dtype=np.uint8)
+    padded = np.zeros((min(len(rows), _ROW_BLOCK), -(-rows.shape[1] // 3) * 3), dtype=np.intp)
+    for start in range(0, len(rows), _ROW_BLOCK):
+        block = rows[start:start + _ROW_BLOCK]
+        padded[:len(block), :rows.shape[1]] = block
+        grouped = padded[:len(block)].reshape(len(block), -1, 3)
+        trytes = ascii[start:start + len(block)].reshape(len(block), -1, 5)
+        trytes[..., 0] = _UNPACK[0][grouped[..., 0]]
+        trytes[..., 1] = _UNPACK[1][grouped[..., 0] * 256 + grouped[..., 1]]
+        trytes[..., 2] = _UNPACK[2][grouped[..., 1]]
+        trytes[..., 3] = _UNPACK[3][grouped[..., 1] * 256 + grouped[..., 2]]
+        trytes[..., 4] = _UNPACK[4][grouped[..., 2]]
+    joined = ascii[:, :length].tobytes().decode('ascii')
+    if single:
+        return joined
+    return [joined[i:i + length] for i in range(0, len(joined), length)] if length else [''] * len(rows)
+
+
+class Hash(bytes):
+    """ Transaction hash, address or bundle hash stored as 49 packed bytes instead of 81 tryte characters.
+        A Hash is immutable and hashable, so it can be used as key of large in-memory indexes. Hashes are equal if their
+        trytes are equal.
+        Constructor:
+            value (str or bytes): 81 trytes, or 49 bytes packed by packTrits with the 2 padding trits 0.
+    
+        Methods:
+            fromTrytesList: Create the Hashes of a list of trytes in one vectorized call.
+            trytes: The 81 trytes of the hash.
+            trits: The 243 trits of the hash.
+    """
+    
+    __slots__ = ()
+    
+    def __new__(cls, value):
+        if isinstance(value, str):
+            if len(value) != HASH_TRITS // TRITS_PER_TRYTE:
+                raise ValueError('Expected %d trytes, got %d' % (HASH_TRITS // TRITS_PER_TRYTE, len(value)))
+            value = packTrytes(value)
+        elif len(value) != PACKED_HASH_BYTES:
+            raise ValueError('Expected %d packed bytes, got %d' % (PACKED_HASH_BYTES, len(value)))
+        elif _BYTE_INVALID[np.frombuffer(bytes(value), dtype=np.uint8)].any():
+            raise ValueError('Packed trits may only contain the byte values -%d ... %d' % (_PACKED_MAX, _PACKED_MAX))
+        elif _BYTE_TO_TRITS[bytes(value)[-1], HASH_TRITS % TRITS_PER_BYTE:].any():
+            # Hashes with the same trytes must have the same bytes to be equal.
+            raise ValueError('The padding trits of a packed hash must be 0')
+        return bytes.__new__(cls, value)
+    
+    @classmethod
+    def fromTrytesList(cls, trytesList):
+        if not len(trytesList):
+            return []
+        packed = packTrytes(trytesList)
+        if packed.shape[1] != PACKED_HASH_BYTES:
+            raise ValueError('Expected %d trytes per hash' % (HASH_TRITS // TRITS_PER_TRYTE))
+        raw = packed.tobytes()
+        return [bytes.__new__(cls, raw[i:i + PACKED_HASH_BYTES]) for i in range(0, len(raw), PACKED_HASH_BYTES)]
+    
+    def __repr__(self):
+        return 'Hash(%r)' % self.trytes()
+    
+    def __str__(self):
+        return self.trytes()
+    
+    def trytes(self):
+        return unpackTrytes(self, HASH_TRITS // TRITS_PER_TRYTE)
+    
+    def trits(self):
+        return unpackTrits(self, HASH_TRITS)
+
+
+def _byteRows(data):
+    """ Return bytes, a list of equally long bytes or an uint8 array as two dimensional uint8 array and whether a single value was given. """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return np.frombuffer(bytes(data), dtype=np.uint8).reshape(1, -1), True
+    if isinstance(data, np.ndarray):
+        return np.atleast_2d(data.astype(np.uint8, copy=False)), data.ndim == 1
+    rows = [bytes(row) for row in data]
+    if any(len(row) != len(rows[0]) for row in rows):
+        raise ValueError('All bytes of a batch must have the same length')
+    return np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(len(rows), -1), False
+
+
+def _checkTrits(trits):
+    if trits.size and (trits.min() < -1 or trits.max() > 1):
+        raise ValueError('Trits may only contain -1, 0 and 1')
+
+
+def _unbalancedInts(digits):
+    """ Return the value of rows of base 3 digits (0, 1, 2, least significant first) as Python ints. """
+    words = -(-digits.shape[1] // _WORD_TRITS)
+    padded = np.zeros((digits.shape[0], words * _WORD_TRITS), dtype=np.uint64)
+    padded[:, :digits.shape[1]] = digits
+    chunks = (padded.reshape(len(padded), words, _WORD_TRITS) @ _POWERS).tolist()
+    base = 3 ** _WORD_TRITS
+    values = []
+    for row in chunks:
+        value = 0
+        for chunk in reversed(row):
+            value = value * base + chunk
+        values.append(value)
+    return values
+
+
+def _wordsOf(values, words):
+    """ Split non negative Python ints into base 3**40 words (least significant first) as uint64 array. """
+    base = 3 ** _WORD_TRITS
+    rows = []
+    for value in values:
+        row = []
+        for _ in range(words):
+            value, word = divmod(value, base)
+            row.append(word)
+        rows.append(row)
+    return np.array(rows, dtype=np.uint64).reshape(len(values), words)
+
+
+def _digitsOf(words):
+    """ Expand base 3**40 words into base 3 digits, one row per value. """
+    words = words.copy()
+    digits = np.empty(words.shape + (_WORD_TRITS,), dtype=np.int8)
+    for i in range(_WORD_TRITS):
+        digits[..., i] = words % 3
+        words //= 3
+    return digits.reshape(len(words), -1)
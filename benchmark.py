@@ -0,0 +1,278 @@
+"""
+Benchmark of all methods of the Api against a local fake IRI node.
+Measures calls per second, p50/p99 latency and the peak memory allocated by a call for every Api method,
+transport (sync: a new connection per call, pooled: HttpTransport, async: AsyncApi) and concurrency level,
+and writes the results as JSON. Requires Python 3.
+
+    python3 benchmark.py --concurrency 1,4,16 --calls 200 --latency 0.001 --response-size 100 --output bench.json
+"""
+import argparse
+import asyncio
+import http.server
+import json
+import multiprocessing
+import os
+import platform
+import socketserver
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Python3'))
+import iotawrapper
+
+HASH = 'A' * 81
+TRYTES = '9' * 2673
+METHODS = ['getNodeInfo', 'getNeighbors', 'addNeighbors', 'removeNeighbors', 'getTips', 'findTransactions', 'getTrytes',
+           'getInclusionStates', 'getBalance', 'getTransactionsToApprove', 'attachToTangle', 'interruptAttachingToTangle',
+           'broadcastTransactions', 'storeTransactions']
+TRANSPORTS = ['sync', 'pooled', 'async']
+
+
+class FakeNode:
+    """ HTTP/1.1 keep-alive server answering every IRI command with a canned response.
+        It runs in a process of its own, so it neither competes with the benchmark for the GIL nor shows up in its allocations.
+        Constructor:
+            latency (float): Seconds every response is delayed.
+            responseSize (integer): Number of entries of list responses which do not depend on the request, e.g. getTips.
+    """
+
+    def __init__(self, latency=0.0, responseSize=100):
+        self.latency = latency
+        self.responseSize = responseSize
+        ports = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=serveFakeNode, args=(latency, responseSize, ports), daemon=True)
+        self._process.start()
+        self.url = 'http://127.0.0.1:%d/' % ports.get()
+
+    def close(self):
+        self._process.terminate()
+        self._process.join()
+
+
+def serveFakeNode(latency, responseSize, ports):
+    """ Serve FakeNode requests until the process is terminated, the port is put into the ports queue. """
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            command = json.loads(self.rfile.read(int(self.headers['content-length'])))
+            if latency:
+                time.sleep(latency)
+            body = json.dumps(fakeResponse(command, responseSize)).encode('utf-8')
+            # Status line, headers and body in one write, a separate write of the body would wait for a delayed ACK.
+            self.wfile.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+
+    class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+        daemon_threads = True
+
+    server = Server(('127.0.0.1', 0), Handler)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def fakeResponse(command, responseSize):
+    """ Return the response of the fake node to a command. """
+    name = command['command']
+    entries = lambda key: list(command.get(key, []))
+    if name == 'getNodeInfo':
+        return {'appName': 'IRI', 'appVersion': '1.4.1', 'latestMilestone': HASH, 'latestMilestoneIndex': 100,
+                'latestSolidSubtangleMilestone': HASH, 'latestSolidSubtangleMilestoneIndex': 100, 'neighbors': 8,
+                'tips': 5000, 'transactionsToRequest': 0, 'time': int(time.time() * 1000), 'duration': 0}
+    if name == 'getNeighbors':
+        return {'neighbors': [{'address': '10.0.0.%d:14265' % (i % 256), 'numberOfAllTransactions': i, 'numberOfInvalidTransactions': 0,
+                               'numberOfNewTransactions': i} for i in range(responseSize)], 'duration': 0}
+    if name == 'addNeighbors':
+        return {'addedNeighbors': len(entries('uris')), 'duration': 0}
+    if name == 'removeNeighbors':
+        return {'removedNeighbors': len(entries('uris')), 'duration': 0}
+    if name == 'getTips':
+        return {'hashes': [HASH] * responseSize, 'duration': 0}
+    if name == 'findTransactions':
+        return {'hashes': [HASH] * responseSize, 'duration': 0}
+    if name == 'getTrytes':
+        return {'trytes': [TRYTES] * len(entries('hashes')), 'duration': 0}
+    if name == 'getInclusionStates':
+        return {'states': [True] * len(entries('transactions')), 'duration': 0}
+    if name == 'getBalances':
+        return {'balances': ['0'] * len(entries('addresses')), 'references': [HASH], 'milestoneIndex': 100, 'duration': 0}
+    if name == 'getTransactionsToApprove':
+        return {'trunkTransaction': HASH, 'branchTransaction': HASH, 'duration': 0}
+    if name == 'attachToTangle':
+        return {'trytes': entries('trytes'), 'duration': 0}
+    return {'duration': 0}
+
+
+class UrllibTransport:
+    """ Sends every command over a new connection with urllib, the way the library did before HttpTransport. """
+
+    def send(self, url, command, cancel=None):
+        request = urllib.request.Request(url, json.dumps(command).encode('utf-8'), iotawrapper.HttpTransport.headers)
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def close(self):
+        pass
+
+
+def arguments(method, size):
+    """ Return the arguments of an Api method with lists of the given size. """
+    hashes = [HASH] * size
+    return {'addNeighbors': (['udp://10.0.0.1:14600'],), 'removeNeighbors': (['udp://10.0.0.1:14600'],),
+            'findTransactions': (hashes,), 'getTrytes': (hashes,), 'getInclusionStates': (hashes, [HASH]),
+            'getBalance': (hashes, 100), 'getTransactionsToApprove': (3,), 'attachToTangle': (HASH, HASH, 14, [TRYTES]),
+            'broadcastTransactions': ([TRYTES] * size,), 'storeTransactions': ([TRYTES] * size,)}.get(method, ())
+
+
+def percentile(latencies, percent):
+    return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100.0))]
+
+
+def result(method, transport, concurrency, seconds, latencies, peak):
+    latencies.sort()
+    return {'method': method, 'transport': transport, 'concurrency': concurrency, 'calls': len(latencies), 'seconds': seconds,
+            'callsPerSecond': len(latencies) / seconds, 'p50': percentile(latencies, 50), 'p99': percentile(latencies, 99),
+            'peakAllocatedBytes': peak}
+
+
+def peakAllocated(call, repeat=3):
+    """ Highest memory allocated above the level before a single call, over a few calls. """
+    tracemalloc.start()
+    try:
+        peak = 0
+        for i in range(repeat):
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            call()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        return peak
+    finally:
+        tracemalloc.stop()
+
+
+async def peakAllocatedAsync(call, repeat=3):
+    tracemalloc.start()
+    try:
+        peak = 0
+        for i in range(repeat):
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await call()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        return peak
+    finally:
+        tracemalloc.stop()
+
+
+def benchmarkThreads(api, method, transport, concurrency, calls, size):
+    function, args = getattr(api, method), arguments(method, size)
+    for i in range(min(calls, 10)):
+        function(*args)
+    latencies = []
+    perWorker = max(1, calls // concurrency)
+
+    def worker():
+        own = []
+        for i in range(perWorker):
+            start = time.perf_counter()
+            function(*args)
+            own.append(time.perf_counter() - start)
+        latencies.extend(own)
+
+    threads = [threading.Thread(target=worker) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    return result(method, transport, concurrency, seconds, latencies, peakAllocated(lambda: function(*args)))
+
+
+async def benchmarkAsync(api, method, concurrency, calls, size):
+    function, args = getattr(api, method), arguments(method, size)
+    for i in range(min(calls, 10)):
+        await function(*args)
+    latencies = []
+    perWorker = max(1, calls // concurrency)
+
+    async def worker():
+        for i in range(perWorker):
+            start = time.perf_counter()
+            await function(*args)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for i in range(concurrency)])
+    seconds = time.perf_counter() - start
+    return result(method, 'async', concurrency, seconds, latencies, await peakAllocatedAsync(lambda: function(*args)))
+
+
+def run(methods, transports, concurrencies, calls, latency, responseSize):
+    node = FakeNode(latency, responseSize)
+    results = []
+    try:
+        for transport in transports:
+            for concurrency in concurrencies:
+                if transport == 'async':
+                    async def runAsync():
+                        async with iotawrapper.AsyncApi(node.url, maxInFlight=max(concurrency, 1)) as api:
+                            return [await benchmarkAsync(api, method, concurrency, calls, responseSize) for method in methods]
+                    results.extend(asyncio.run(runAsync()))
+                    print('%s concurrency %d done' % (transport, concurrency), file=sys.stderr)
+                    continue
+                if transport == 'sync':
+                    api = iotawrapper.Api(node.url, UrllibTransport())
+                else:
+                    api = iotawrapper.Api(node.url, iotawrapper.HttpTransport(max(10, concurrency)))
+                try:
+                    for method in methods:
+                        results.append(benchmarkThreads(api, method, transport, concurrency, calls, responseSize))
+                finally:
+                    api.close()
+                print('%s concurrency %d done' % (transport, concurrency), file=sys.stderr)
+    finally:
+        node.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Api against a local fake IRI node.')
+    parser.add_argument('--methods', default=','.join(METHODS), help='Comma separated Api methods.')
+    parser.add_argument('--transports', default=','.join(TRANSPORTS), help='Comma separated transports: sync, pooled, async.')
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma separated numbers of concurrent callers.')
+    parser.add_argument('--calls', type=int, default=200, help='Calls per method, transport and concurrency level.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds the fake node delays every response.')
+    parser.add_argument('--response-size', type=int, default=100, help='Number of entries in list requests and responses.')
+    parser.add_argument('--output', help='File the JSON results are written to, standard output if omitted.')
+    options = parser.parse_args()
+    methods = options.methods.split(',')
+    transports = options.transports.split(',')
+    for name in methods:
+        if name not in METHODS:
+            parser.error('unknown method %s' % name)
+    for name in transports:
+        if name not in TRANSPORTS:
+            parser.error('unknown transport %s' % name)
+    concurrencies = [int(level) for level in options.concurrency.split(',')]
+    report = {'python': platform.python_version(), 'platform': platform.platform(),
+              'config': {'calls': options.calls, 'latency': options.latency, 'responseSize': options.response_size,
+                         'concurrency': concurrencies},
+              'results': run(methods, transports, concurrencies, options.calls, options.latency, options.response_size)}
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, 'w') as outputFile:
+            outputFile.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
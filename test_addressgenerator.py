@@ -0,0 +1,124 @@
+"""
+Tests of the address generation with the vectors of the IOTA libraries. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_addressgenerator
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Python3'))
+import addressgenerator
+
+SEED = 'TESTVALUE9DONTUSEINPRODUCTION999999GFDDCPFIIEHBCWFN9KHRBEIHHREFCKBVGUGEDXCFHDFPAL'
+OTHER_SEED = 'TESTVALUE9DONTUSEINPRODUCTION99999DCZGVEJIZEKEGEEHYE9DOHCHLHMGAFDGEEQFUDVGGDGHRDR'
+# Addresses of SEED by security level and index.
+ADDRESSES = {
+    1: {0: 'KNDWDEEWWFVZLISLYRABGVWZCHZNZLNSEJXFKVGAUFLL9UMZYEZMEJB9BDLAASWTHEKFREUDIUPY9ICKW',
+        1: 'CHOBTRTQWTMH9GWFWGWUODRSGPOJOIVJUNIQIBZLHSWNYPHOD9APWJBMJMGLHFZENWFKDYWHX9JDFXTAB',
+        2: 'YHTOYQUCLDHAIDILFNPITVPYSTOCFAZIUNDYTRDZCVMVGZPONPINNVPJTOAOKHHZWLOKIZPVASTOGAKPA'},
+    2: {0: 'DLEIS9XU9V9T9OURAKDUSQWBQEYFGJLRPRVEWKN9SSUGIHBEIPBPEWISSAURGTQKWKWNHXGCBQTWNOGIY',
+        1: 'PNLOTLFSALMICK9PSW9ZWLE9KJAKPKGJZQJDAFMOVLHXMJCJXFPVHOTTOYDIAUAYELXKZWZUITCQBIQKY',
+        3: 'IWWMMHBFWCWOZQLBNXDJ9OOTIGXXU9WNUHFGUZWR9FWGIUUUQUECHPKXJLIEKZBOVSEA9BCT9DLOCNCEC',
+        10: 'XLXFTFBXUOOHRJDVBDBFEBDQDUKSLSOCLUYWGLAPR9FUROUHPFINIUFKYSRTFMNWKNEPDZATWXIVWJMDD'},
+    3: {0: 'BGHTGOUKKNTYFHYUAAPSRUEVN9QQXFOGVCH9Y9BONWXUBDLSKAWEOFZIVMHXBAYVPGDZEYCKNTUJCLPAX',
+        1: 'EGMRJEUIYFUGWAIXXZCHCZUVUUYITICVHDSHCQXGFHJIVDCLTI9ZVRIKRLZQWW9CPOIXVDCBAHVGLUHI9',
+        2: 'ENPSARVJZGMMPWZTAIRHADEOZCEVIFNJWSZQHNEIRVEVI9GYMFNEOGNUYCPGPSEFCSDHUHOQKDPVGDKYC'},
+}
+OTHER_ADDRESSES = ['FNKCVJPUANHNWNBAHFBTCONMCUBC9KCZ9EKREBCJAFMABCTEPLGGXDJXVGPXDCFOUCRBWFJFLEAVOEUPY',
+                   'MSYILYYZLSJ99TDMGQHDOBWGHTBARCBGJZE9PIMQLTEXJXKTDREGVTPA9NDGGLQHTMGISGRAKSLYPGWMB',
+                   'IIREHGHXUHARKVZDMHGUUCHZLUEQQULLEUSJHIIBWFYZIZDUFTOVHAWCKRJXUZ9CSUVLTRYSUGBVRMTOW']
+OTHER_ADDRESSES_FROM_10 = ['BPXMVV9UPKBTVPJXPBHHOJYAFLALOYCGTSEDLZBHNFMGEHREBQTRIPZAPREANPMZJNZZNCDIUFOYYGGFY',
+                           'RUCZQJWKXVDIXTLHHOKGMHOV9AKVDBG9HUQHPWNZUNKJNFVMULUSLKFJGSTBSNJMRYSJOBVBQSKVXISZB',
+                           'FQAKF9XVCLTBESJKWCHFOCTVABYEEJP9RXUVAEUWENFUUQK9VCHFEORHCYDUJQHNUDWNRDUDZTUGKHSPD']
+
+
+class DerivationTest(unittest.TestCase):
+
+    def testSecurityLevels(self):
+        for security, addresses in ADDRESSES.items():
+            indexes = sorted(addresses)
+            self.assertEqual(addressgenerator.deriveAddresses(SEED, indexes, security), [addresses[index] for index in indexes])
+
+    def testRanges(self):
+        generator = addressgenerator.AddressGenerator(OTHER_SEED, processes=1, batchSize=2)
+        try:
+            self.assertEqual(generator.addresses(0, 3), OTHER_ADDRESSES)
+            self.assertEqual(generator.addresses(10, 3), OTHER_ADDRESSES_FROM_10)
+            self.assertEqual(generator.address(1), OTHER_ADDRESSES[1])
+            self.assertEqual(generator.addresses(5, 0), [])
+        finally:
+            generator.close()
+
+    def testProcessPool(self):
+        generator = addressgenerator.AddressGenerator(OTHER_SEED, processes=2, batchSize=1)
+        try:
+            self.assertEqual(generator.addresses(0, 3), OTHER_ADDRESSES)
+        finally:
+            generator.close()
+
+    def testChecksum(self):
+        self.assertEqual(addressgenerator.addChecksum(OTHER_ADDRESSES[0]), OTHER_ADDRESSES[0] + 'ADHVCBXFD')
+        self.assertEqual(addressgenerator.addChecksum(OTHER_ADDRESSES[1]), OTHER_ADDRESSES[1] + 'WIKQRCIOD')
+        with self.assertRaises(ValueError):
+            addressgenerator.addChecksum(OTHER_ADDRESSES[0][:80])
+
+    def testShortSeedIsPadded(self):
+        generator = addressgenerator.AddressGenerator(SEED.rstrip('LAP'), processes=1)
+        self.assertEqual(generator.seed, SEED.rstrip('LAP').ljust(81, '9'))
+
+    def testInvalidArguments(self):
+        for seed, security in ((SEED, 4), (SEED + 'A', 2), ('abc', 2)):
+            with self.assertRaises(ValueError):
+                addressgenerator.AddressGenerator(seed, security)
+        with self.assertRaises(ValueError):
+            addressgenerator.AddressGenerator(SEED, processes=1).addresses(-1, 2)
+
+
+class AddressCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = addressgenerator.AddressCache(self.directory.name)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def testStoresDerivedAddresses(self):
+        generator = addressgenerator.AddressGenerator(OTHER_SEED, processes=1, cache=self.cache)
+        self.assertEqual(generator.addresses(1, 2), OTHER_ADDRESSES[1:])
+        self.assertEqual(self.cache.get(OTHER_SEED, 2, 0, 4), [None] + OTHER_ADDRESSES[1:] + [None])
+        self.assertEqual(generator.addresses(0, 3), OTHER_ADDRESSES)
+        self.assertEqual(self.cache.get(OTHER_SEED, 2, 0, 3), OTHER_ADDRESSES)
+
+    def testCachedAddressesAreNotDerived(self):
+        # The cache is trusted, an address put there is returned as it is.
+        self.cache.putMany(OTHER_SEED, 2, {0: 'A' * 81})
+        generator = addressgenerator.AddressGenerator(OTHER_SEED, processes=1, cache=self.cache)
+        self.assertEqual(generator.addresses(0, 2), ['A' * 81, OTHER_ADDRESSES[1]])
+
+    def testSeparateSeedsAndSecurityLevels(self):
+        self.cache.putMany(SEED, 2, {0: ADDRESSES[2][0], 3: ADDRESSES[2][3]})
+        self.cache.putMany(SEED, 1, {0: ADDRESSES[1][0]})
+        self.assertEqual(self.cache.get(SEED, 2, 0, 4), [ADDRESSES[2][0], None, None, ADDRESSES[2][3]])
+        self.assertEqual(self.cache.get(SEED, 1, 0, 1), [ADDRESSES[1][0]])
+        self.assertEqual(self.cache.get(OTHER_SEED, 2, 0, 1), [None])
+
+    def testReopen(self):
+        self.cache.putMany(SEED, 2, {10: ADDRESSES[2][10]})
+        self.cache.close()
+        self.cache = addressgenerator.AddressCache(self.directory.name)
+        self.assertEqual(self.cache.get(SEED, 2, 10, 1), [ADDRESSES[2][10]])
+
+    def testSeedIsNotStored(self):
+        self.cache.putMany(SEED, 2, {0: ADDRESSES[2][0]})
+        for name in os.listdir(self.directory.name):
+            self.assertNotIn(SEED, name)
+            with open(os.path.join(self.directory.name, name), 'rb') as addressFile:
+                self.assertNotIn(SEED.encode('ascii'), addressFile.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests of Api.iterAddressHistory against the IRI emulator. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_addresshistory
+"""
+import unittest
+
+from test_iriemulator import EmulatorTestCase, transactionTrytes, ADDRESS, OTHER_ADDRESS
+import curl
+
+UNUSED_ADDRESS = 'E' * 81
+
+
+class AddressHistoryTest(EmulatorTestCase):
+
+    def setUp(self):
+        EmulatorTestCase.setUp(self)
+        self.trytesList = [transactionTrytes(ADDRESS, index=index) for index in range(5)]
+        self.trytesList += [transactionTrytes(OTHER_ADDRESS, index=index) for index in range(2)]
+        self.hashes = curl.transactionHashes(self.trytesList)
+        self.api.storeTransactions(self.trytesList)
+
+    def history(self, addresses, **options):
+        return [(address, [transaction.hash() for transaction in transactions], states)
+                for address, transactions, states in self.api.iterAddressHistory(addresses, **options)]
+
+    def testPages(self):
+        pages = self.history([ADDRESS, UNUSED_ADDRESS, OTHER_ADDRESS], pageSize=2, prefetch=2)
+        self.assertEqual([(address, len(hashes)) for address, hashes, states in pages],
+                         [(ADDRESS, 2), (ADDRESS, 2), (ADDRESS, 1), (OTHER_ADDRESS, 2)])
+        self.assertEqual(sorted(hash for address, hashes, states in pages[:3] for hash in hashes), sorted(self.hashes[:5]))
+        self.assertEqual(sorted(pages[3][1]), sorted(self.hashes[5:]))
+        for address, hashes, states in pages:
+            self.assertEqual(len(states), len(hashes))
+
+    def testTransactionsAreParsed(self):
+        for address, transactions, states in self.api.iterAddressHistory([OTHER_ADDRESS]):
+            self.assertEqual([transaction.address() for transaction in transactions], [OTHER_ADDRESS] * 2)
+
+    def testPageSizeIsLimitedByChunkSize(self):
+        pages = self.history([ADDRESS], pageSize=100)
+        self.assertEqual([len(hashes) for address, hashes, states in pages], [2, 2, 1])
+
+    def testStatesAgainstMilestone(self):
+        milestone = self.emulator.issueMilestone()
+        pages = self.history([ADDRESS, OTHER_ADDRESS], tipsList=[milestone])
+        expected = dict((hash, self.emulator.tangle.confirmedBy(hash) is not None) for hash in self.hashes)
+        for address, hashes, states in pages:
+            self.assertEqual(states, [expected[hash] for hash in hashes])
+
+    def testDefaultTipsAreLatestMilestone(self):
+        self.history([ADDRESS])
+        commands = []
+        self.api.transport = Recorder(self.api.transport, commands)
+        self.history([OTHER_ADDRESS])
+        self.assertEqual(commands[0]['command'], 'getNodeInfo')
+        self.assertEqual([command['tips'] for command in commands if command['command'] == 'getInclusionStates'],
+                         [[self.emulator.latestMilestone]])
+
+    def testStopEarly(self):
+        history = self.api.iterAddressHistory([ADDRESS, OTHER_ADDRESS], pageSize=2, prefetch=3)
+        address, transactions, states = next(history)
+        self.assertEqual(address, ADDRESS)
+        history.close()
+        # The api stays usable after pages which were prefetched are dropped.
+        self.assertEqual(len(self.history([OTHER_ADDRESS])), 1)
+
+    def testNoAddresses(self):
+        self.assertEqual(self.history([], tipsList=[self.emulator.latestMilestone]), [])
+
+
+class Recorder:
+    """ Transport which records the commands sent through another transport. """
+
+    def __init__(self, transport, commands):
+        self.transport = transport
+        self.commands = commands
+
+    def send(self, url, command, cancel=None):
+        self.commands.append(command)
+        return self.transport.send(url, command, cancel)
+
+    def close(self):
+        self.transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
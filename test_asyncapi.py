@@ -0,0 +1,148 @@
+"""
+Tests of AsyncApi and AsyncHttpTransport against a local stub node. Requires Python 3.
+
+    python3 -m unittest test_asyncapi
+"""
+import asyncio
+import unittest
+
+from test_iotawrapper import StubNode, echoResponse, iotawrapper, HASH, OTHER_HASH, TRYTES
+
+
+def errorResponse(command):
+    if command['command'] == 'getTrytes':
+        return 400, {'error': 'Invalid hashes input'}
+    if command['command'] == 'getTips':
+        return 503, {'error': 'Node is syncing'}
+    if command['command'] == 'getNodeInfo':
+        return 200, b'{"appName": "IRI", '
+    return echoResponse(command)
+
+
+class AsyncApiTest(unittest.TestCase):
+
+    def setUp(self):
+        self.node = None
+
+    def tearDown(self):
+        if self.node is not None:
+            self.node.close()
+
+    def call(self, coroutine, respond=echoResponse, chunked=False, **options):
+        """ Run coroutine(api) on an AsyncApi connected to a new stub node and return its result. """
+        self.node = StubNode(respond, chunked)
+
+        async def main():
+            async with iotawrapper.AsyncApi(self.node.url, **options) as api:
+                return await coroutine(api)
+        return asyncio.run(main())
+
+    def testReusesConnection(self):
+        async def calls(api):
+            for i in range(5):
+                await api.getTips()
+        self.call(calls)
+        self.assertEqual(len(self.node.commands('getTips')), 5)
+        self.assertEqual(len(self.node.ports), 1)
+
+    def testConcurrentRequestsAreBounded(self):
+        async def calls(api):
+            return await asyncio.gather(*[api.getTrytes([HASH]) for i in range(20)])
+        results = self.call(calls, maxInFlight=3)
+        self.assertEqual([result.trytes() for result in results], [[TRYTES]] * 20)
+        self.assertLessEqual(len(self.node.ports), 3)
+
+    def testChunkedResponse(self):
+        async def calls(api):
+            return await api.getTrytes([HASH, OTHER_HASH])
+        self.assertEqual(self.call(calls, chunked=True).trytes(), [TRYTES, TRYTES])
+
+    def testChunkedResponsesKeepConnection(self):
+        async def calls(api):
+            await api.getTips()
+            return await api.findTransactions([HASH, OTHER_HASH])
+        self.assertEqual(self.call(calls, chunked=True).hashes(), [HASH, HASH])
+        self.assertEqual(len(self.node.ports), 1)
+
+    def testListParametersAreJsonLists(self):
+        async def calls(api):
+            await api.getTrytes([HASH, OTHER_HASH])
+            await api.storeTransactions([TRYTES, TRYTES])
+        self.call(calls, chunkSize=10)
+        self.assertEqual(self.node.commands('getTrytes')[0]['hashes'], [HASH, OTHER_HASH])
+        self.assertEqual(self.node.commands('storeTransactions')[0]['trytes'], [TRYTES, TRYTES])
+
+    def testChunksRequests(self):
+        async def calls(api):
+            return await api.getTrytes(['%s%s' % (HASH[:80], c) for c in 'ABCDE'])
+        self.assertEqual(len(self.call(calls, chunkSize=2).trytes()), 5)
+        self.assertEqual([len(command['hashes']) for command in self.node.commands('getTrytes')], [2, 2, 1])
+
+    def testClientError(self):
+        async def calls(api):
+            await api.getTrytes([HASH])
+        with self.assertRaises(iotawrapper.ClientError) as context:
+            self.call(calls, errorResponse)
+        self.assertEqual(context.exception.status, 400)
+        self.assertEqual(context.exception.error, 'Invalid hashes input')
+        self.assertEqual(context.exception.command, 'getTrytes')
+        self.assertFalse(context.exception.retryable)
+
+    def testServerError(self):
+        async def calls(api):
+            await api.getTips()
+        with self.assertRaises(iotawrapper.ServerError) as context:
+            self.call(calls, errorResponse)
+        self.assertEqual(context.exception.status, 503)
+        self.assertTrue(context.exception.retryable)
+
+    def testInvalidJson(self):
+        async def calls(api):
+            await api.getNodeInfo()
+        with self.assertRaises(iotawrapper.InvalidResponse):
+            self.call(calls, errorResponse)
+
+    def testConnectionStaysUsableAfterError(self):
+        async def calls(api):
+            with self.assertRaises(iotawrapper.ClientError):
+                await api.getTrytes([HASH])
+            return await api.findTransactions([HASH])
+        self.assertEqual(self.call(calls, errorResponse).hashes(), [HASH])
+        self.assertEqual(len(self.node.ports), 1)
+
+    def testRetriesServerError(self):
+        attempts = []
+
+        def respond(command):
+            attempts.append(command['command'])
+            return (503, {'error': 'busy'}) if len(attempts) < 3 else (200, {'hashes': [HASH], 'duration': 0})
+
+        async def calls(api):
+            return await api.getTips()
+        retry = iotawrapper.RetryPolicy(attempts=3, backoff=0.01, jitter=False)
+        self.assertEqual(self.call(calls, respond, retry=retry).hashes(), [HASH])
+        self.assertEqual(len(attempts), 3)
+
+    def testSeveralEventLoops(self):
+        self.node = StubNode(echoResponse)
+        api = iotawrapper.AsyncApi(self.node.url, maxInFlight=2)
+
+        async def calls():
+            return await asyncio.gather(*[api.getTrytes([HASH]) for i in range(5)])
+        # Each run has a loop of its own, the connections of the first one can not be used by the second.
+        for run in range(2):
+            self.assertEqual([result.trytes() for result in asyncio.run(calls())], [[TRYTES]] * 5)
+        asyncio.run(api.close())
+        self.assertEqual(len(self.node.commands('getTrytes')), 10)
+        self.assertGreaterEqual(len(self.node.ports), 2)
+
+    def testUnreachableNode(self):
+        async def calls():
+            async with iotawrapper.AsyncApi('http://127.0.0.1:1/') as api:
+                await api.getTips()
+        with self.assertRaises(iotawrapper.NodeUnreachable):
+            asyncio.run(calls())
+
+
+if __name__ == '__main__':
+    unittest.main()
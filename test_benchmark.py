@@ -0,0 +1,37 @@
+"""
+Tests of the fake node of the benchmark. Requires Python 3.
+
+    python3 -m unittest test_benchmark
+"""
+import unittest
+
+from test_iotawrapper import iotawrapper, HASH, OTHER_HASH, TRYTES
+import benchmark
+
+
+class FakeResponseTest(unittest.TestCase):
+
+    def testOneEntryPerListElement(self):
+        command = iotawrapper.GetTrytes.buildCommand([HASH, OTHER_HASH, HASH])
+        self.assertEqual(benchmark.fakeResponse(command, 10)['trytes'], [TRYTES] * 3)
+        command = iotawrapper.GetInclusionStates.buildCommand([HASH, OTHER_HASH], [HASH])
+        self.assertEqual(benchmark.fakeResponse(command, 10)['states'], [True, True])
+        command = iotawrapper.AddNeighbors.buildCommand(['udp://10.0.0.1:14600', 'udp://10.0.0.2:14600'])
+        self.assertEqual(benchmark.fakeResponse(command, 10)['addedNeighbors'], 2)
+
+    def testAttachToTangleEchoesTrytes(self):
+        command = iotawrapper.AttachToTangle.buildCommand(HASH, OTHER_HASH, 14, [TRYTES, TRYTES])
+        self.assertEqual(benchmark.fakeResponse(command, 10)['trytes'], [TRYTES, TRYTES])
+
+    def testElementsAreNotSplit(self):
+        # A joined string is a single (invalid) element, not several.
+        command = {'command': 'getTrytes', 'hashes': ['%s, %s' % (HASH, OTHER_HASH)]}
+        self.assertEqual(len(benchmark.fakeResponse(command, 10)['trytes']), 1)
+
+    def testListResponsesHaveResponseSize(self):
+        self.assertEqual(len(benchmark.fakeResponse({'command': 'getTips'}, 7)['hashes']), 7)
+        self.assertEqual(len(benchmark.fakeResponse({'command': 'getNeighbors'}, 7)['neighbors']), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+"""
+Tests of building, signing and validating bundles. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_bundle
+"""
+import unittest
+
+from test_addressgenerator import ADDRESSES, SEED, OTHER_SEED
+from test_iotawrapper import iotawrapper
+import bundle
+
+RECIPIENT = 'A' * 81
+TIMESTAMP = 1500000000
+# Signed bundle of the bundle validator tests of PyOTA, made with the JavaScript library: a spend transaction with a
+# message of two fragments, an input of security 2, an input of security 3 and a change transaction, last index first.
+SIGNED_BUNDLE = [
+    '999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999TESTVALUE9DONTUSEINPRODUCTION99999OGFZEFWIVOZCAYNFOQGRZ9AIRBMWRRFIPCVLEG9ULC9CLIDHE9999999999999999999999999PYOTA9UNIT9TESTS99999999999NYBKIVD99G99999999G99999999EIYHEUACZZAVPQFGIPKDUBFPJVOFTWHADBEXIXINYPAKPUMGZKEKVZQVQREIZHYPEBNZUAJQXHAGDYRG9999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999',
+    'DEFDQQ9AQY9HBNMZZTEM9TSUWUPNOFRJKHZHCYKMRQEYVFINUVEHKSZK9JZPRBHAWHAVH9GNFYDWEEADDC9WE9G9SKVFXJKKGWQWWRFPZLFBXLEKRGGHHQIKLEOJDEITGQGRAQFYLFESHTAEMLYSRAIIPXNRKTRAS9MSNCONAB9DEPAETSRFLDSKTACASWBINAEJJFGUK9ZPYSBRGPLHFYRJAKHHPZVWYSQWEVYQBNOYRVFVBTDLHUNYDQVGDPJEVOUBFMQYDCCAWDW9ZFROSVNUZYXEYFEKCKFGZLQWHPMZNHVMYZMCJGHOXJJZPFTAEAPAA9MAREMPHTJVDPVXCGXHCWBZYXPMBMAFIMCQQEUPHZ9AYQXAYF9ZKJSHBKOBDGLCXWAQICTVFDCZHJDCDPWODLCGBVNXJSBHALJJCHGKDQPRBWYGFOGVF9FKDFA9ZQIYCHDTJOHREJYV9FEZJIWFGXYTUVEWUBO9T9NGKFLFPMGNYCDZSERANRHLUDOVIIZ9TVWSLMNLR9KTF9KPNKCWTMQHEQKBFISQVLBCOAYHJUZAOBXNVAXRPKGYCLAFBYNFXFXGMPATWUOGWVHFQMRDLAVXKOOVUFDAUAALPGIATFSYP9TZSTFNR9WKUBIGHVNVCYBDQEWLGQUSNWYDGUISWKEPCHQ9EZQCECJTPIFXIRCVOKSKMKMNXTGC9JCVHXFULEENDRPBATTOPRLMEVBWDTQVJRBGRSIV9RRMHEPKEQEGZOZWPTTECHZIEHJXBLFLTO9VBCHKUWBASCSVMSZPBXWVUMPP9RBJNUZWZCVTYTDKKZJMBKMIPRCVIVMV9NZJBILSLLEHJJUWUVFFGDMAFPRYJCLPRTJLTAGGSHDZUERGGPVCSFBTLGZEENIVFXLXPCCN9VGWUAYATCQYVDQXLOEDLCTKKAPIBGIUBPAZBZCKEAFXRDUGHNEDXOFZHX9RUTXSWAIZPXWWJXTIXKODHHBNAFU99GQPQPPQSZCCOOVSLFOUMQCZ9QEAEHGPZNPRAGTPIFPOPECUHQMOHQSHHNEYXWSVNVFFNDUXVBESCBXNWEQLIYLF9YMYLRXH9XUBVUXLZFDYZASV9OREKCOB9OLYKMUGADKAGGQ9Z9LSIBRBIMYHGZDWFJMISAUSBXSFKUZLCFHDHTNJ9GHEEUYZMRXSJUOXNNTFXNHCRMMXCNNBDFIZXSEAE99DNOWEJZKPQJTLRJGXFMHDFIGFRBVT9WXOTHOPGLOQVGYWDSGCXJEHBZPRCFCKNQSTZVGBKNBJRNXDIQM9M9N9PBGHHTR9PPJVLVQYZVKIMPHLFPIVJIOHFFMOMSLMWDBQIPCMGVH99LAMPQUDKDKLNGZIB9CUWBZKYTCUWTIFAWBCSPJTIUOHRJMIATMERZYCHB9XZ9KGHWMTVDSBY9GRTZKKNZ9AZPSVFDCQPTOATCVZWRLTILOYIBMGOFXYHEOEMAETPOVCRADPVPIGQKDZQGUZFDRAQQFRCVCZFEJYXCKISPQ9WMM9YJCHGHYWYMZUPRDVYOWORNKQNUYZWYVSTIHCOHCYCFALVFKRLLZYMNEPSHLEJCUKURIOJYKXPHLFMMEIHFXMOISMWGDGSUIU9CLWDAAYRRYYGGLQVQPMAYNGJTTTNOPCXGYUEXFVXMNCZJFIVIBGCKRPXXTMLZEYGXCRQEGNFIDSSTKVNWDBZKZDFNUMTILLN9INWTQRDVSXJRSKGLHRIAGJRQZUHHEESFIJBLCDAAXVCN9UAOU9VJJCBWXELLMPEVOBQW9CJUABIKMBRSCIBVAMOXLFQX99KH9YLQ9BXLSIU9XOQFOAGCFIDJYAINNDAZ9TKROQJCZMLFGVGIWOSEARVCMFMBBHDBJHFCBGLODBELYYHLUEKJFCCYCUTILROVKWDPLWYEDDA9WEJQWOOAOKZNRXHYAQQNUDZFXXTOGSKGGE9OIGGPHKSNXPFVSKEGCLWCWWCASZEHEZBJTYNBAZQPYLANUKBSJJSJHPIXKUQERHBUZWGOXUDKWCQUAHNATYGUJEKDZGGGCNEALOU9D9RX9EDMWDLXFV99RFAGZENALKO9MIUXXY9HBGGCTHFWRPLWSIA9GWCLIXGOYFWYCAHVQDTCNBPUGAWPKEHLLTKAYCOAKIFKYROACDDKEIHVNBNCQDKAYYMUUONZOZYY9VPHWXXUSNZGRBGYGJNMBE9LTFSIHKFLAIZFJDTQUUDMBLKCNQZWXAVYWI9YIFDQBNSOPIZGKODKTBMKMMVPBA999999999999999999999999999PYOTA9UNIT9TESTS99999999999NYBKIVD99F99999999G99999999EIYHEUACZZAVPQFGIPKDUBFPJVOFTWHADBEXIXINYPAKPUMGZKEKVZQVQREIZHYPEBNZUAJQXHAGDYRG9999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999',
+    'MXPN9ZGOHJHGLVDNBFJEGLQZAHNDWGJWBPQFFXAIIGHVJMTCBELOJPUHEJPRTJNOYJGGSVMDQFJD9NFDZNIDDO9MJRP99SWYJLHMWHUBREHZZMCHJPO9UUTKELRFFFBHTEFBUYRPVLY9TUFCJGVPGRCWSEAKAAKIOZEQJXNLBRCADVNWTUEDSJXKKTJWPXOMIVHYKRSYUSFVTDPMWKIGZFCK9QFRRAAUVKBFCUJLTARFWSXRYUXEWFG9RSHOZSXJRKOVTWPJWPNOKHDFYXSNHCWPKTSDVAIJPITDMSOEBGYRGVTNQ9EOPGMGFUBADQMNRPVD9PRXSBNJBMWJAATCJRLTBWRW9CIBVUFNJOAP9FRZPDWGTKRQXEKOO9ONRQSFRDUGDZAYZCEXUEMK9EXLW9WJSNJ9XFUQCRAIAUIBHZJQDGFLRIOXUOAHSWEPVXSIXACSREGCBMRFPLBMTXMMGCUV9VJCYJVKODIYLXFVKDNOZUNAHNMECVVQN9HFXBAXL9KEEJ9LAPCXWJMRFURUPEUXNLIFAHMEFHHNKMPMSHRZCWSGXZLDOGAKNXQEGFUXCLALLFGFPKHRVLBESXQFTHYEOHNGCQUJ9CXIVBVKEPDWJUXYBFXBJXMSJGDA9WZI9UJHBVGCLHWAFEKQTCRSLNESVJGKJWU9CXQATRIV9BKIWWFSCKHATHTQMLL9CPZENIXLWQTNXTWUYGYTRXOHWDONX9OSY9VRSHWAVATCHHRWCXQSRAU99C9GEAYZYU9DXYJRGQCUDXNTCRCTJLCLFVHUXLCXJOUKKOZCDIKCHXA9QDDWIHMPBVN9MSBAHHAECMHFJXVZMGOILGRAAT9CGXFYMDTULBWGPJIVOGTRDSSIGWRJLVETCSLLBJXWMUHUMPDPADYPRNMLQS9KDFDDPJPEQVYGDTMPYAWMFQCXRCMX9PGDYYASKZEGZWD99VANFLUVAAOSTVAWOPLUYZACKRKLCGOOICJTLCWUY9EMJKMJMXWESAY9CADHRJWOFHEOHHNOLSBYPVWSDHXSGYLBZRNNOF9HDEDCDTYUYPI9AMLIRKKVWBQJOQWHBARVWGEXXKINHTZESAPMMGOQDHUZBZEQNZLZRMEWMRFYKEFAFOCWG9KXFWRLJWIDFU9ULGCCWWZXRNBV9FHYFRSOQEHKUZJJQILP9YBMDXITFGNAODNXISIHHBJIVLBWK9PISPZOCGRRUYHVVURGUGMHOPFBZIPWQLKDWKJJEYAPXKALUFRBECMAYVMGZUIKZUUYVMLUEWCFDPSYHIVUQRWDRW9KFTRIGBKWMNEXJHWIU9XOSXUEPAGFRROQODWVGAVXCNLPZPEQGGSEKPRFVZYQFFUCUVO9VCTWSPUA9TVCUVCHCOJIPAMQEQITIVLTXJGDBWAGZHESX9RIAFKUOWPOVFF9JMGFLIWXSHMIDGLK9U9CWSMA9OHFXWQIDNHSGOHDC9YYOOTYRORF99YVJFSJPVWFXBWPDDS9UEUEECPSUFGJCSEPLX9IDUQDNHXVDCVFGOTRJBXHLIMHLRUOOW9WMCXSOTDQSPGSCCUDYIGNOXOKKBGBIRIOJWDLODKNABLRENIMQYPWDGILWGMHPZHXFKFDGOV9TZFCWXGNGRXMIXDTXZQGPSOVEJQPQUSJHEBBVNGEODWJEUDZMKLXYUWAWRPIRUMUHIV9IAAVTBVZXRTVHGMUAVFWCKGPVQ9SWZDTRATQPXYBXWVABEVKJOMILQ9JSYNRTHPMKZSRGEY9CBUBSGQPBUD9QJQURXQCOSEESMSWWKXE9WIVEWFANVUPJCQ9LINZUTJUCLMQXUOUOIAHLUQ9GNPVCOMUBYYQZAZNWDBPE9KA9UYZGFMPMWJRGMUXXYCJDEDUJJ9HFHMOZMDDMDPHIEUHAZNVXRVYRJAGBDTOWZUUDQGY9NKVJYJFAEAQTCIDKSZXSPWLPKDHRVFBTXH9OPUJHWYWPYHGGZYZYHYQUSYFNUUGRVZTJKRVBRVMGXZGUK9JLF9TTXZIYC9FAFOBQCVKNDLMEWUYCDJODOKSYUYGJTHOJPWHCOHWKOPICGMDDJKE9KNPFRARIKDC9JFAEVXDZXDHKQAEPCUZPCDAWUFNJO9LFHT9URMXORUP9MKIXJAEXKZYABWDZCVHOWJRVQPGHXARSOKUFDTZJHUT9VOSA9DU9ODXXUSNZGRBGYGJNMBE9LTFSIHKFLAIZFJDTQUUDMBLKCNQZWXAVYWI9YIFDQBNSOPIZGKODKTBMKMMVPBA999999999999999999999999999PYOTA9UNIT9TESTS99999999999NYBKIVD99E99999999G99999999EIYHEUACZZAVPQFGIPKDUBFPJVOFTWHADBEXIXINYPAKPUMGZKEKVZQVQREIZHYPEBNZUAJQXHAGDYRG9999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999',
+    'BIRYQZTRMOJCLWP9PBRNLK9ZOYZDVVEKNUZKDGYIDGMCJJRTHVJSTIPVKR9NSMBPPYLANCDGT9FBESEKYXS9ECTQHYM9CCCFFURJSTYBNZZVTRYBHSNPPQZDWYLWCVWAELJOL9E9QCJDB9ZTIHHYDT9TCBTMAVBTFAVDWPLLDRDYR99QGMNPYCAZQRTE9DUIPAJJNGWQLTLFXFARNKSZKVHSFCAAGLIHRTGTLFDCUGZHWDQMEXAYEQDHJOQAYZMSYQORTAOFQFSWLPDYQVMGUEXQUIJDEFNZIUJXDEVPQSPZN9WPQJ9NRUXJEEKSCTNWAZLYZVDJBYJNDMDW9XKTYHNCACZRBXL9TKKBNTGPI9JCFRVCTS9XDEMDPBCIRGZRHPLKWOJFHSLBVOHTYZIAWXOYDAZQPWTZBZAOKLAVXRREYVYN9CQZMLCYBDC9OIJJVDTWFMQFCOVBRSZM9FDVSQWDTIRDYQ9BUPHSYCQXBTQJ9LJBZR9HITVLGFMBPBSIPETVXI9DOXUPHJOFGDDERHOPIXACBWJJMAJQ9WL9CLMBFJDYDMHKA9BMNHKHHAMLHJDOOOAXAOIAIPUJKOOSDTRDNS9HFPRWHYHVCSWYLZARWHNOKUJCRSYUFOQPQCRQL9SQCGRCPYNMVQIANZATRDI9OPSZVOOYOY9ATSXHSAYZHEETFR9ZVEQYLAKHEZVDQIUCJQNCJM9TCSLZOOZXAPXSZVONZAXMVDUOLNTZMUSFXJPOGIINYNRWXWLWDSXSPMJMCLFEFOPHJOABJQSWK9J9FXVKLDEXVPHRLJMVWBKLLMMNNESPJFQFQIESAPXFSRTDNOVFCXHQUCJQHMPWSYFNPFS9UWVLTAYDLCAYXW9LANEFFLGEEAEGQWXTXMJRBDRHFCTNSFXYBZOTYTFOOZDDZYFPFLSWJKYETBQHQWHFMAJAKOOBJFYCZFAHDDULFLJHVIDUXOPWHKHLBCZRLH9IRRMTFOVOCENLEWXURVIFHQAEPMLSBCWGXZRDVUTMALSVGAFV9JSLPJWBQWFTJKMABUZKABQRWWMJCPNBKODNMLKWHAXIILBVNJHWFVJJIEFGSFRWGNTJOGFYQJX9KHZUUXRIOMDISBMSNADEWMOSAZWKLRWWRXZIMQSKBUPXHOWCVQYMUBIXOYCQZSYNKMHKPWDJLPIWLOOIICCFJGPAVVVGALNUHIFLHSIF9JYXDQGQQCZGXBXYPUWHTFCMSQPBOCWGRWIRSPQTGEVAPTIJ9GJXOJ99ROFM9CCASDVJBZWAKVYYIYBIAYODUG9KURZTCKRXBBDDUNYMTBMEKXQV9SREAGINGSHKMMMFOSWQSISMVRPRIGRZGQKE9EGIKTHVGYHTIZNYDBHYLJFIDIRGKWBSSNOWHLLALTMJIIQYJMVIUILDHDZAXMTMBYCCFBIWYVMGVRITMCDNXMYVMNCFWJ9KLYHCUQCJLKSHCCXNXLUFSEUFGXUYZTD9YFAC9ATT9EQSQXDESCEUZCT9PNPZHQROJAXBJPG9FAFKCZTKHK9W9SWGKVSGKWGLVTXOCKP9UAWIWLCWQPYTKTXFZQWWEWPEQEBTPOIWSFUNDKLVRSXQ9GPHYOPU9YOC9LIAGKNSNOPZLKQEBNZFSZDSSWURARUTZWPPBHMNUXFATQFWFLOIRZAFZNAPNBMVNFBXZZSOZIWZHFHPRVF9YAKYGFHC9CLUEZIIRWKFQGXTAPLRCMIWWQCIFUXMLVTOFDGLTONFCZMK9HMGCZTIEJTOPENSXISJKFHSZDZLVNGVOGHKUVYKAYMCBMIRAP9GXIVTHWTFFMBOBAELAQIKIVZZTOSWXCBPJAPCDTPSGCDYYB9EZQUSU9DUJUZX9AQWWFRJUYJYWDTNLBLPRVXVEPO9MMWKHIGBLFHXVDNPCOSFXBAIOYGQLZH9YSYBAEXBHBLKIQABEOZIJVLXKZABPPLABAYVLYWIEDJFIMSJBZICOWRXQWIYYPKLLPROGXNGTNTPPQREKS9I9WERWBALENFPWQBIKWUVGNHMXKQ9TYERABQJWUAACHGGQEMWOBBGOIZCAJYRRBZZQUYIRYCXOORUBXWOEIYEGVUKJOJRPWRERTDGCUPZLZINJIWDAW9SVF9KCUJRRFE9OYKRAWS9HH9XHCPQZAISRWZJVVRVKGYMKVFZVKNQSDYHSQ9XXUSNZGRBGYGJNMBE9LTFSIHKFLAIZFJDTQUUDMBLKCNQZWXAVYWI9YIFDQBNSOPIZGKODKTBMKMMVPBAOV9999999999999999999999999PYOTA9UNIT9TESTS99999999999NYBKIVD99D99999999G99999999EIYHEUACZZAVPQFGIPKDUBFPJVOFTWHADBEXIXINYPAKPUMGZKEKVZQVQREIZHYPEBNZUAJQXHAGDYRG9999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999',
+    'YHESE9Q9LPYU9MAEMPDUDUWOTUVFGDPBBLLZTTTFCWULPFHMRZWGAUAU9YOQDFRLLBG9SJOYDLVIQPKTBAMIZWOQKVUGZTHZMFMWWBTWXLIOSOGOVLKWJMZMIBFVNOTNTRQIMCTJSYLFNARMYKFMGXMMVASRHHNP9ZZDHHUEHBPBQJJPMQBM9PIZIWQAJLAPURCQFKXIVGYZRAPATUAY9CGRJBDYHOIGPWQBPREDHSFIFILBDOBRQV9OUSARYIVHZIHJPJKUQCJDI9XBNIBHENHLBIPRUXPUXOLHEUNZVUS9CDKEHKGQXPDDQL99LHNXK9ZCVDPWJERFHTLTUVZWXZWTAZCLUAOZQHNXRFLKDSFRIJ9DKJJSLBXYKJLTW9GUIAERJWTZXZXOGJXKIDQKCQUOLHUSANAFQIKOXGMXAXJJPDTIHKMXQQ9PBNTXUEHUPLAHRVXBZJJIEUDSZTSDS9RSUPZ9ILZRFJRTG9PUIKNGWFKFUQTMUTPW9YKEID9YUUOZWIJIJYUR9VBSHPYDUMUIYWMAFOQBEKTYMYDJC9MLQTBAURFVRTYZRQOWVIXBFITAXRKNIPCYKOBMPYIABHKOOOCCDZFXLTHOMNDCYZQXHWLMSWNVANKG9RRGLGZWSUVGDIOWV9KUOUHB9YWFIHAWRHSTDABPA9PQOJD9KJPKHUOPKSFCXJMNDSKJHTNPAQMI9UMUVBQRIFBSHRLDMCLE99QASIM9CDV9GJBPH9PHDMUMIFXKKQBLLSMCBRMCJPR9NYJLEAZBYKPRZDTRBBZREVHIBFYRER9YGGCLZWLLZSUWQKPRUULNBLJTOVJAPSZGISRRQMDAMUBEQWCKGYQDMEVTYKMAGCSMTMTSEFDOBRUPQF9TVGYQDTDSAMEULRKZOUJQXQVXPMQYGNZNKIDYRQYCCHPJFQQ9PIRRTAJCSCRXKKRDQXEEIAVWDHAVOWSVMPFZXHQ9CUKLAMFXYVDCXZBWCRWHTZZWKNCD9GCRGQCNLKHWEAHRSYVV99J99OQGEFXMEZDDHJWXJGDIRJYIMLGPWTBSBVKTTJ9HA9OLTDGPZSURRIZGONXZAOYHQRDMZGMKVSGENUGNRFXHRKRNYIQYRZH9BRBJBDPCHCEZCAGXGPYVDXMBHJ9RZQJGGW99SONTRWTFVCBPDQ9YSWCRPHXAOZQXNOUYQXLKWDZMMXPWRRZRERTXZXJXQHCSWPEFTIELOBFPLAWMEVHBFPQRPDYTSUCWHSZCYJBBOQITFOVGSFZYCDTYMWRARODBCISJOCYVKJKJPOPDQSILNYAPWEI9DCNXSSXHGQWGNPSVOHUGZACFDFTIRGYJGCVPYTNPN9CTZOCLRAOZDFQZIAIYJOXROUBHATCFJYSZGEHGVLKBISDGZEARWQILPMJMFG9PCOMSEHECWYMDLKQASOMIGRMIIOYGESRHYQUXIIZOCXKJHWZ9QRSWYVHBVFVOCHGWCKMGKLAKTUSCDYZSWOJUXNSULWFJVROKGKKBZQOHRY9KXPKAGKBRHLAQNMANBYDYHWZRNCDSP9OGEDENQHAFPIB9OLYVMKKLZRUDTMNTRNOVNHTHZUVHPKJVUISFMZZ9HFNZMLCDGEUJYOBCLLOOIQOMQAEETCRHAGVMMVEDWLDNAUPACSHKDTCFBJZ9TCFB9ISIZAJQZGQMGMJWESFNDHZAFOZKRHQUXRNRDQPBEJTZJTRHIFQOCQSC9IZHHGTGPEBYFTLESFBHGRGJIXFZKJGYYPNB9UTMDUIUMUNDJNCOMRCOBXT9NPJUERWDAFBGVWSQBVMSRIZETWLQBHXQIOZ9KFWJLWZRMEUUFIYTQQWRPEROGRXBTNFPHMLXYZZEYDDX9JNZPDJTBTKLGZIXKYGXHDTRGKNUZFEYKWYTBBOGHCVKDMBHZWRBSCLLNBJWPBV9XBKO9ZRMCRFCEXRDMZWBQYAMHG9TGPDNAGPXE9YPUQUNDKXKNCWEQATNRN9WSZMVOXLWPYUDHUXJJQ9MGWDOH9OUIDMLJLLYYXUNMPPACYVHUWJUKSDJPZBTZALVQROBJAKOFUNQFYXFCEYDIDOAZKASIKY9TWQYMKIQHZQXZGHRBR9YOYXUAQDZZFPFKFLGPYTMLMSGWAVDGLJTTIPZAMFLGXIXHNRC9ASLHSYQGDRPSFWVXOCFFHTUEMDMDPUSXAZTWCQBKCWBZ9LDZSJJPDPCAVRBEBHKZTPWCBGZTVXP9DEUESJEADACA9TBNKWFNSQLLPUJQFVYLBAAYWND999999999999999999999999999PYOTA9UNIT9TESTS99999999999NYBKIVD99C99999999G99999999EIYHEUACZZAVPQFGIPKDUBFPJVOFTWHADBEXIXINYPAKPUMGZKEKVZQVQREIZHYPEBNZUAJQXHAGDYRG9999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999',
+    'DEZJVMNPVBAEBZWMGIXVSBOFZWNJOSUTEALWDOIDOGXQLXKHKLAQTABJDD9HJWPTCZTAGOCMEIPFFZNCCNRNDZXVEMNVFPMONFWRKMEKLYSBXFOKOHCAHXF9MGID9BNXWENVFFZRPFXXL9RNKRXNECZBKTWIRRIDKWMLNMIPJTLSFNWILGBVZTQHFHVSEMPSWUMGAP9AKILPBWFYKWEYOFYOINADMVCYPWAOPUXA9TEVPKHT9PBYZXOF9LKUBBIRSOFVKDIZYHGOEUCDDQ9IWRYDEANKBVEDCABLVSKFDOXGSEZSTMVAXMVCPYQR9CILVQIWPOWVUPWJOTRFGJGBIPNY9OUBYYWBWSXVKYDC9HCTGATTCCUSAGQYHWQMRRWBFHSCPCSHEIAZHWUMIOEZCR9FIWXJSHSZG9TAOGRWPRTCWNSABXXOO9YQPUCCHK9CWAYOFKGXTKGWVENRKIMTNFSLGGPNWAOLIFOLYWXUQTFBFDTFVDLTXZFPLWCYIBHPPPIHFNLZJXYUBRIUQKVIYAKQZNOVOZVICEUWJFJTUVCAYHUWLQAQ9ACPUQBSJUII9HWFVIMVUNGFFTPRHILXOLWOXGOXAVOROQPVTEUDLMZKAOWYP9YWKJBDKCZHLHVSGJKVCIFWBIRXAOVVICUOJSJFLUSGAGUBDNTWCQNXWMCJEKZTWFIHGTRZTWAJUQ9UENNNBAEBEVYJFJRKMEPROHEYXMFBABSTBHYT9AICXZUEYSOHKUHEV9YMELFEYYXMYKLSJWBD9MGCSNBKIZEU9BZVPOHLTYLKTHMLRXKGIAZJKNLAURMJUYZMZPZZ9BCDCU9RRBVATIYGLVQMWDEFLWRNLH9J9GJHMZSFYJUEUKZXKLRCLMMAAIMJNACQDIJ9SKJSQYIKDPMRSZYMIPHUMZARFTCADD9UWH9TPPZVRLUWHOFVKNXVHRYSCCW9ZDHUIQRZLHDBRFMWWYUWTLEPULCZZPNYEBEGSPRRSEJPKTTLJDFH9QJTAJYSU9HYGJRA9IYJSAQMEBPWZYNPPPJPDEJGUCKB99IQZXLZV999CQBWYDUEXQB9IXM9OTMALUTBQUYZRVRVSURESZWKKPGHYSHAGVDCYQIIBXINSSAYSMUIYDZDDA9UKSLLWJAPYIZQNPLSWARDHRQHEPBOEUKORSJYJTXNDJGXDOGMGO9QMBHAJVTDIOZNLLXWSIJBWM9ECTUCJGKNWRQCVE9RYYWB9EBEKHDCKHAPEUYCTI9DLZHOHBPKILQDMBVKHAQPOGXCWBOZNNMPWXQJHAGYP9WUSJHDDCQSVBCJYL9GZYSCNVWIUMKPVQSEFBARSKLXQTSDSZJUEWRDFTYVIWGPNFBQW9VKSWKDLRJWWXMWOPENESZE9MDJYTHYAXPZADFOWWYMPE9Z9XZXDUGEOIKCGKYY9LLOPYEPYY9JVYALYCCCEGEQDBBINWYGOQBOHXQUGZNJBOQJYCEKLODXFFOON9IGAJ9NJYUWSCMUNDEGHTXHPUVSIKDNUFGTFMNLRNNQSRVZNFWBUUPTUXMTLRKTNTJIMOBSLXWMZLIGIRGCYWLHCQUDJWIKUOMPSNQYFP9UTBFRSSACVQHBWMBNCWIJJOB9SMMKVCDFLRUA9CPSZYQPWNASZXKNWDXITTKUTMFUTVMXKMLKCGTDBYQMKP9JCADDQEJCAPWLOXWKUKSQW9BDQDKLVN9YIOSGCGSMVXB9LU99AZ9HJCWONAQPRUZIAMVUURVCPJWROPNFSSFCOAU9CYAHAJRIQLBUKDEBMFPXPWGLRFPOMANCGIPXXPYYVOSEWRVYCYBORLPVGDXWEDFSFW9QANJ9PFPYOHNJMYNAUKTLYCEUJMWYPIUTCWKNKYWSOVLXRSENJLNTIGDROCFMEGAHXBLZPHTMVRDYDHPHYFUN9JZRTPBJFKFWSZDDIIJDJBXWZ9LNUOQAZQYXJNHBHHHDLEVVVOJEVH9MJPK9PROZLDIXSCPZLAWOWODBKLCUNQZCGY9MZKRIRVIYCIEIZPS9ZGZL9ZBEWSFEJUJPDL9QYNHBXCMPYRKQAVUSFSZTKURHWEAXCBORHUWOVKFRPSEIIPYUQYVGOAVZECOHFDCXSAXUKJUDMKOWPEEEWJMEMYORJSDHCYRCCKYZHQETCJ9KESALQXASIUDX9VJOUHGTIDFVTVOR9HDTWCQBKCWBZ9LDZSJJPDPCAVRBEBHKZTPWCBGZTVXP9DEUESJEADACA9TBNKWFNSQLLPUJQFVYLBAAYWNDPZ9999999999999999999999999PYOTA9UNIT9TESTS99999999999NYBKIVD99B99999999G99999999EIYHEUACZZAVPQFGIPKDUBFPJVOFTWHADBEXIXINYPAKPUMGZKEKVZQVQREIZHYPEBNZUAJQXHAGDYRG9999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999',
+    'DEAUCXCSCVCTCHDTCSCSAEACCWCTCEAHDTCBDGDXCCDBDEAKDPCGDEAIDBDQCTCPCFDPCQC9DTCSAJ9GAHCCDIDLAFDTCEAFDTCPC9D9DMDEABDCDHDEAVCCDXCBDVCEAHDCDEA9DXCZCTCEAXCHDQAGAEACDQCGDTCFDJDTCSCEANBTCTCDDEACCWCCDIDVCWCHDSAJ9GACCTC9D9DEAIDGDFAGAJ9GAKB9D9DEAFDXCVCWCHDQAGAEAGDPCXCSCEANBTCTCDDEACCWCCDIDVCWCHDSAEAGACCWCTCEAKBBDGDKDTCFDEAHDCDEAHDWCTCEAQBFDTCPCHDEA9CIDTCGDHDXCCDBDSASASAGAJ9GAHCTCGDIBGAJ9GAYBUCEAVBXCUCTCQAEAHDWCTCEADCBDXCJDTCFDGDTCEAPCBDSCEAOBJDTCFDMDHDWCXCBDVCSASASAGAEAGDPCXCSCEANBTCTCDDEACCWCCDIDVCWCHDSAJ9GAHCTCGDIBIBGAJ9GASBGDSASASAGAJ9GAHCTCGDIBFAGAJ9GAPBCDFDHDMDRAHDKDCDQAGAEAGDPCXCSCEANBTCTCDDEACCWCCDIDVCWCHDQAEAKDXCHDWCEAXCBDUCXCBDXCHDTCEAADPCYCTCGDHDMDEAPCBDSCEARCPC9DADSAJ9EAEAEAEAEAEAEAEA99999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999TESTVALUE9DONTUSEINPRODUCTION99999ZDDJMOGAXHRGS9XCNSKQQNVB9BSYFCVANLJM9CLRLJSQKFO999999999999999999999999999PYOTA9UNIT9TESTS99999999999NYBKIVD99A99999999G99999999EIYHEUACZZAVPQFGIPKDUBFPJVOFTWHADBEXIXINYPAKPUMGZKEKVZQVQREIZHYPEBNZUAJQXHAGDYRG9999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999',
+    'J9GAQBCDCDSCEAADCDFDBDXCBDVCQAGAEAGDPCXCSCEANBTCTCDDEACCWCCDIDVCWCHDEAPCHDEA9DPCGDHDSAJ9GAOBFDSASASAEAQBCDCDSCEAADCDFDBDXCBDVCQAEAYBEANBTCTCDDEACCWCCDIDVCWCHDQAGAEAGDPCXCSCEAVBCDCDBDEDIDPCKD9DEABDTCFDJDCDIDGD9DMDSAJ9EAEAGANBCDEAMDCDIDEAWCPCJDTCSASASAEATCFDQAEAHDWCPCHDEAXCGDSASASAGAJ9GASASASAEAPCBDEAPCBDGDKDTCFDEAUCCDFDEAMDCDIDIBGAEAXCBDHDTCFDFDIDDDHDTCSCEANBTCTCDDEACCWCCDIDVCWCHDEAADPCYCTCGDHDXCRCPC9D9DMDSAEAGAHCTCGDSAEASBEAWCPCJDTCSAGAJ9CCWCTCEAHDKDCDEAADTCBDEAGDWCXCJDTCFDTCSCEAKDXCHDWCEATCLDDDTCRCHDPCBDRCMDSAEACCWCTCXCFDEAKDPCXCHDXCBDVCEAWCPCSCEABDCDHDEAQCTCTCBDEAXCBDEAJDPCXCBDSAJ9GACCWCTCFDTCEAFDTCPC9D9DMDEAXCGDEACDBDTCIBGAEAQCFDTCPCHDWCTCSCEAZBWCCDIDRCWCVCSAJ9GACCWCTCFDTCEAFDTCPC9D9DMDEAXCGDEACDBDTCQAGAEARCCDBDUCXCFDADTCSCEANBTCTCDDEACCWCCDIDVCWCHDSAJ9GACCCDEAOBJDTCFDMDHDWCXCBDVCIBEACCCDEAHDWCTCEAVCFDTCPCHDEA9CIDTCGDHDXCCDBDEACDUCEAVBXCUCTCQAEAHDWCTCEADCBDXCJDTCFDGDTCEAPCBDSCEAOBJDTCFDMDHDWCXCBDVCIBGAJ9GAHCTCGDSAGAJ9LBCDHDWCEACDUCEAHDWCTCEAADTCBDEAWCPCSCEAQCTCTCBDEAHDFDPCXCBDTCSCEAUCCDFDEAHDWCXCGDEAADCDADTCBDHDEBEAHDWCTCXCFDEA9DXCJDTCGDEAWCPCSCEAQCTCTCBDEAPCJ9EAEADDFDTCDDPCFDPCHDXCCDBDEAUCCDFDEAXCHDEBEAHDWCTCMDEAWCPCSCEAQCTCTCBDEAGDTC9DTCRCHDTCSCEAPCHDEAQCXCFDHDWCEAPCGDEAHDWCCDGDTCEAKDWCCDEAKDCDID9DSCJ9EAEAKDXCHDBDTCGDGDEAHDWCTCEAPCBDGDKDTCFDEBEAQCIDHDEATCJDTCBDEAGDCDEAHDWCTCMDEAUCCDIDBDSCEAHDWCTCADGDTC9DJDTCGDEAVCPCGDDDXCBDVCEAPCBDSCEAGDEDIDXCFDADXCBDVCJ9EAEA9DXCZCTCEATCLDRCXCHDTCSCEARCWCXC9DSCFDTCBDSAJ9GAKBBDSCEAMDCDIDLAFDTCEAFDTCPCSCMDEAHDCDEAVCXCJDTCEAXCHDEAHDCDEAIDGDIBGAEAIDFDVCTCSCEAVBCDCDBDEDIDPCKD9DSAJ9GASBEAPCADSAGAJ9GAXBCDKDIBGAJ9GAXBCDKDQAGAEAGDPCXCSCEANBTCTCDDEACCWCCDIDVCWCHDSAJ9CCWCTCMDEAQCCDHDWCEA9DXCRCZCTCSCEAHDWCTCXCFDEASCFDMDEA9DXCDDGDSAJ9GACCWCCDIDVCWCEASBEASCCDBDLAHDEAHDWCXCBDZCQAGAEAPCSCSCTCSCEANBTCTCDDEACCWCCDIDVCWCHDQAEAGAHDWCPCHDEAMDCDIDLAFDTCEAVCCDXCBDVCEAHDCDEA9DXCZCTCEAXCHDSAGAJ9GANBCDTCGDBDLAHDEAADPCHDHDTCFDQAGAEAGDPCXCSCEAZBWCCDIDRCWCVCSAEAGAFCTCEAADIDGDHDEAZCBDCDKDEAXCHDFAEAXBCDKDFAGAJ9GAXBCDKDIBGAEATCBDEDIDXCFDTCSCEANBTCTCDDEACCWCCDIDVCWCHDSAJ9GAHCTCGDFAEAXBCDKDFAGAJ9GAKB9D9DEAFDXCVCWCHDQAGAEAGDPCXCSCEAHDWCTCEARCCDADDDIDHDTCFDEAPCBDSCEAGDTCHDHD9DTCSCEAXCBDHDCDEAGDXC9DTCBDRCTCEAPCVCPCXCBDSAJ9EAEACCWCTCEAHDKDCDEAADTCBTESTVALUE9DONTUSEINPRODUCTION99999ZDDJMOGAXHRGS9XCNSKQQNVB9BSYFCVANLJM9CLRLJSQKFOOB9999999999999999999999999PYOTA9UNIT9TESTS99999999999NYBKIVD99999999999G99999999EIYHEUACZZAVPQFGIPKDUBFPJVOFTWHADBEXIXINYPAKPUMGZKEKVZQVQREIZHYPEBNZUAJQXHAGDYRG9999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999',
+]
+SIGNED_INPUTS = ['TWCQBKCWBZ9LDZSJJPDPCAVRBEBHKZTPWCBGZTVXP9DEUESJEADACA9TBNKWFNSQLLPUJQFVYLBAAYWND',
+                 'XXUSNZGRBGYGJNMBE9LTFSIHKFLAIZFJDTQUUDMBLKCNQZWXAVYWI9YIFDQBNSOPIZGKODKTBMKMMVPBA']
+
+
+def signedBundle(*inputs, timestamp=TIMESTAMP, message=''):
+    """ Return a finalized bundle sending the balances of (keyIndex, security, balance) inputs of SEED to RECIPIENT. """
+    signed = bundle.Bundle(timestamp)
+    signed.addOutput(RECIPIENT, sum(balance for keyIndex, security, balance in inputs), 'BUNDLE9TEST', message)
+    for keyIndex, security, balance in inputs:
+        signed.addInput(ADDRESSES[security][keyIndex], balance, keyIndex, security)
+    signed.finalize()
+    return signed
+
+
+class PublishedBundleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [iotawrapper.Transaction(trytes) for trytes in reversed(SIGNED_BUNDLE)]
+
+    def testBundleHash(self):
+        entries = [{'address': transaction.address(), 'value': transaction.value(), 'obsoleteTag': transaction.obsoleteTag(),
+                    'timestamp': transaction.timestamp(), 'currentIndex': transaction.currentIndex(),
+                    'lastIndex': transaction.lastIndex()} for transaction in self.transactions]
+        self.assertEqual(bundle.bundleHash(entries), self.transactions[0].bundle())
+
+    def testSignatures(self):
+        fragments = [transaction.signatureMessageFragment() for transaction in self.transactions]
+        hash = self.transactions[0].bundle()
+        self.assertEqual(bundle.signatureAddresses([fragments[2:4], fragments[4:7]], hash), SIGNED_INPUTS)
+        # Fragments in the wrong order or of another bundle hash lead to other addresses.
+        self.assertNotEqual(bundle.signatureAddresses([fragments[2:4][::-1]], hash)[0], SIGNED_INPUTS[0])
+        self.assertNotEqual(bundle.signatureAddresses([fragments[4:7]], OTHER_SEED)[0], SIGNED_INPUTS[1])
+
+    def testInsecureBundleHash(self):
+        # Vector of the PyOTA bundle tests, the first normalized hash contains 13 and the obsolete tag is incremented.
+        insecure = bundle.Bundle(1509136296)
+        insecure.addOutput('9XV9RJGFJJZWITDPKSQXRTHCKJAIZZY9BYLBEQUXUNCLITRQDR9CCD99AANMXYEKD9GLJGVB9HIAGRIBQ', 0,
+                           'PPDIDNQDJZGUQKOWJ9JZRCKOVGP')
+        insecure.finalize()
+        self.assertEqual(insecure.hash, 'NYSJSEGCWESDAFLIFCNJFWGZ9PCYDOT9VCSALKBD9UUNKBJAJCB9KVMTHZDPRDDXC9UFJQBJBQFUPJKFC')
+        transaction = insecure.transactions()[0]
+        self.assertEqual(transaction.obsoleteTag(), 'ZTDIDNQDJZGUQKOWJ9JZRCKOVGP')
+        self.assertEqual(transaction.tag(), 'PPDIDNQDJZGUQKOWJ9JZRCKOVGP')
+
+    def testNormalizedBundle(self):
+        normalized = bundle.normalizedBundle(self.transactions[0].bundle())
+        self.assertEqual(len(normalized), 81)
+        for start in range(0, 81, 27):
+            self.assertEqual(sum(normalized[start:start + 27]), 0)
+        self.assertTrue(all(-13 <= value <= 13 for value in normalized))
+
+
+class RecordingSigner(bundle.BundleSigner):
+    """ BundleSigner which records the batches it hands to its worker processes. """
+
+    def __init__(self, *args):
+        bundle.BundleSigner.__init__(self, *args)
+        self.batches = []
+
+    def _pool(self):
+        pool = bundle.BundleSigner._pool(self)
+        signer = self
+
+        class Recorder:
+            def map(self, function, seeds, batches):
+                batches = list(batches)
+                signer.batches.extend(batches)
+                return pool.map(function, seeds, batches)
+        return Recorder()
+
+
+class BundleTest(unittest.TestCase):
+
+    def testSignAndValidate(self):
+        signed = signedBundle((0, 1, 5), (1, 2, 7), (2, 3, 30))
+        self.assertEqual(len(signed), 7)
+        self.assertNotIn(13, signed.normalizedHash())
+        signed.sign(SEED)
+        self.assertTrue(signed.validateSignatures())
+        transactions = signed.transactions()
+        self.assertEqual([transaction.currentIndex() for transaction in transactions], list(range(7)))
+        self.assertEqual([transaction.value() for transaction in transactions], [42, -5, -7, 0, -30, 0, 0])
+        self.assertTrue(all(transaction.bundle() == signed.hash for transaction in transactions))
+        self.assertEqual(signed.trytes()[0], transactions[-1].trytes())
+
+    def testTampering(self):
+        signed = signedBundle((0, 2, 10))
+        signed.sign(SEED)
+        fragment = signed.entries[1]['signatureMessageFragment']
+        signed.entries[1]['signatureMessageFragment'] = ('A' if fragment[0] != 'A' else 'B') + fragment[1:]
+        self.assertFalse(signed.validateSignatures())
+        signed.entries[1]['signatureMessageFragment'] = fragment
+        self.assertTrue(signed.validateSignatures())
+        signed.sign(OTHER_SEED)
+        self.assertFalse(signed.validateSignatures())
+
+    def testUnsignedBundles(self):
+        data = bundle.Bundle(TIMESTAMP)
+        data.addOutput(RECIPIENT, message='HELLO' * 500)
+        data.finalize()
+        self.assertTrue(data.validateSignatures())
+        self.assertEqual(len(data), 2)
+        transactions = data.transactions()
+        self.assertEqual(transactions[0].signatureMessageFragment() + transactions[1].signatureMessageFragment()[:313],
+                         'HELLO' * 500)
+        self.assertFalse(signedBundle((0, 1, 3)).validateSignatures())
+
+    def testBundleSigner(self):
+        inputs = [((0, 1, 1),), ((1, 2, 2), (0, 3, 3)), ((3, 2, 4), (10, 2, 5), (2, 1, 6))]
+        expected = [signedBundle(*bundleInputs) for bundleInputs in inputs]
+        for signed in expected:
+            signed.sign(SEED)
+        for processes, batchSize in ((1, 8), (2, 1)):
+            signer = bundle.BundleSigner(processes, batchSize)
+            try:
+                bundles = [signedBundle(*bundleInputs) for bundleInputs in inputs]
+                signer.sign(bundles, SEED)
+                self.assertEqual([signed.trytes() for signed in bundles], [signed.trytes() for signed in expected])
+                single = signedBundle(*inputs[1])
+                single.sign(SEED, signer)
+                self.assertEqual(single.trytes(), expected[1].trytes())
+            finally:
+                signer.close()
+
+    def testInputsOfOneBundleInParallel(self):
+        inputs = ((0, 1, 1), (1, 1, 2), (2, 1, 3), (0, 2, 4), (1, 2, 5))
+        expected = signedBundle(*inputs)
+        expected.sign(SEED)
+        signer = RecordingSigner(3)
+        try:
+            signed = signedBundle(*inputs)
+            signed.sign(SEED, signer)
+        finally:
+            signer.close()
+        self.assertEqual([len(batch) for batch in signer.batches], [2, 2, 1])
+        self.assertEqual(signed.trytes(), expected.trytes())
+        self.assertTrue(signed.validateSignatures())
+
+    def testInvalidInput(self):
+        invalid = bundle.Bundle(TIMESTAMP)
+        for call in (lambda: invalid.addOutput(RECIPIENT, -1), lambda: invalid.addOutput(RECIPIENT[:80]),
+                     lambda: invalid.addOutput(RECIPIENT, tag='T' * 28), lambda: invalid.addOutput(RECIPIENT, message='abc'),
+                     lambda: invalid.addInput(RECIPIENT, 1, 0, security=4), lambda: invalid.finalize(),
+                     lambda: invalid.normalizedHash(), lambda: invalid.trytes(), lambda: invalid.sign(SEED)):
+            with self.assertRaises(ValueError):
+                call()
+        invalid.addOutput(RECIPIENT, 1)
+        with self.assertRaises(ValueError):
+            invalid.finalize()
+        invalid.addInput(ADDRESSES[1][0], 1, 0, security=1)
+        invalid.finalize()
+        with self.assertRaises(ValueError):
+            invalid.addOutput(RECIPIENT)
+        with self.assertRaises(ValueError):
+            bundle.BundleSigner(1).sign([bundle.Bundle()], SEED)
+
+
+if __name__ == '__main__':
+    unittest.main()
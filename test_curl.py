@@ -0,0 +1,88 @@
+"""
+Tests of Curl-P with the vectors of the IOTA libraries. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_curl
+"""
+import random
+import unittest
+
+import numpy as np
+
+from test_iotawrapper import VECTOR_TRYTES, VECTOR_HASH
+import curl
+import trinary
+
+LONG_INPUT = ('G9JYBOMPUXHYHKSNRNMMSSZCSHOFYOYNZRSZMAAYWDYEIMVVOGKPJBVBM9TDPULSFUNMTVXRKFIDOHUXXVYDLFSZYZTWQYTE9SPYYWYTXJYQ'
+              '9IFGYOLZXWZBKWZN9QOOTBQMWMUBLEWUEEASRHRTNIQWJQNDWRYLCA')
+
+
+def curlHash(trytes, rounds=curl.NUMBER_OF_ROUNDS, length=curl.HASH_LENGTH):
+    sponge = curl.Curl(rounds)
+    sponge.absorb(trinary.trytesToTrits(trytes))
+    return trinary.tritsToTrytes(sponge.squeeze(length))
+
+
+class CurlTest(unittest.TestCase):
+
+    def testHash(self):
+        self.assertEqual(curlHash('EMIDYNHBWMBCXVDEFOFWINXTERALUKYYPPHKP9JJFGJEIUY9MUDVNFZHMMWZUYUSWAIOWEVTHNWMHANBH'),
+                         'AQBOPUMJMGVHFOXSMUAGZNACKUTISDPBSILMRAGIGRXXS9JJTLIKZUW9BCJWKSTFBDSBLNVEEGVGAMSSM')
+
+    def testLongInput(self):
+        self.assertEqual(curlHash(LONG_INPUT), 'RWCBOLRFANOAYQWXXTFQJYQFAUTEEBSZWTIRSSDREYGCNFRLHQVDZXYXSJKCQFQLJMMRHYAZKRRLQZDKR')
+
+    def testRepeatedAbsorb(self):
+        trits = trinary.trytesToTrits(LONG_INPUT)
+        sponge = curl.Curl()
+        sponge.absorb(trits[:486])
+        sponge.absorb(trits[:243])
+        self.assertEqual(trinary.tritsToTrytes(sponge.squeeze()),
+                         'OTYHXEXJLCSMEY9LYCC9ASJXMORTLAYQEHRS9DAH9NR9DXLXYDGOVOBEL9LWRITLWPHPYPZDKXVPAPKUA')
+
+    def testReset(self):
+        sponge = curl.Curl()
+        sponge.absorb(trinary.trytesToTrits(LONG_INPUT))
+        sponge.reset()
+        sponge.absorb(trinary.trytesToTrits(VECTOR_TRYTES))
+        self.assertEqual(trinary.tritsToTrytes(sponge.squeeze()), VECTOR_HASH)
+
+    def testTransactionHash(self):
+        self.assertEqual(curl.transactionHash(VECTOR_TRYTES), VECTOR_HASH)
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.trits = rng.integers(-1, 2, size=(70, 486)).astype(np.int8)
+
+    def testHashBatch(self):
+        for rounds in (27, 81):
+            hashes = curl.hashBatch(self.trits, rounds, length=486)
+            self.assertEqual(hashes.shape, (70, 486))
+            for row in (0, 63, 64, 69):
+                sponge = curl.Curl(rounds)
+                sponge.absorb(self.trits[row])
+                self.assertEqual(hashes[row].tolist(), sponge.squeeze(486).tolist())
+
+    def testTransformBatch(self):
+        states = np.random.default_rng(6).integers(-1, 2, size=(3, curl.STATE_LENGTH)).astype(np.int8)
+        transformed = curl.transform(states)
+        for state, expected in zip(states, transformed):
+            self.assertEqual(curl.transform(state).tolist(), expected.tolist())
+
+    def testTransactionHashes(self):
+        rng = random.Random(7)
+        trytesList = [VECTOR_TRYTES] + [''.join(rng.choice(trinary.TRYTE_ALPHABET) for i in range(2673)) for j in range(2)]
+        hashes = curl.transactionHashes(trytesList)
+        self.assertEqual(hashes[0], VECTOR_HASH)
+        self.assertEqual(hashes, [curl.transactionHash(trytes) for trytes in trytesList])
+        self.assertEqual(curl.transactionHashes([]), [])
+
+    def testFlatArray(self):
+        with self.assertRaises(ValueError):
+            curl.hashBatch(self.trits[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
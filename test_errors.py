@@ -0,0 +1,242 @@
+"""
+Tests of the ApiError classes, RetryPolicy and CircuitBreaker. Requires Python 3.
+
+    python3 -m unittest test_errors
+"""
+import asyncio
+import socket
+import time
+import unittest
+
+from test_iotawrapper import StubNode, echoResponse, iotawrapper, HASH, TRYTES
+
+
+def failingResponse(failures, status=503):
+    """ Fail the first failures commands with status, answer the rest like echoResponse. """
+    received = []
+
+    def respond(command):
+        received.append(command['command'])
+        if len(received) <= failures:
+            return status, {'error': 'Node is busy'}
+        return echoResponse(command)
+    return respond
+
+
+class SilentNode:
+    """ Accepts connections (the kernel completes the handshake) but never answers a request. """
+
+    def __init__(self):
+        self.socket = socket.socket()
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen(16)
+        self.url = 'http://127.0.0.1:%d/' % self.socket.getsockname()[1]
+
+    def close(self):
+        self.socket.close()
+
+
+class ErrorTest(unittest.TestCase):
+
+    def testStatusErrors(self):
+        error = iotawrapper.ServerError('http://node:14265', 503, 'Service Unavailable', b'{"error": "Node is syncing"}', 'getTips')
+        self.assertEqual(error.error, 'Node is syncing')
+        self.assertTrue(error.retryable)
+        self.assertTrue(error.nodeFailure)
+        self.assertEqual(str(error), 'HTTP Error 503: Service Unavailable (Node is syncing) in command: getTips')
+        error = iotawrapper.ClientError('http://node:14265', 400, 'Bad Request', b'not json')
+        self.assertIsNone(error.error)
+        self.assertFalse(error.retryable)
+        self.assertFalse(error.nodeFailure)
+        self.assertEqual(str(error), 'HTTP Error 400: Bad Request')
+
+    def testRetryableClientErrors(self):
+        for status in (408, 429):
+            error = iotawrapper.ClientError('http://node:14265', status, 'Too Many Requests', b'')
+            self.assertTrue(error.retryable)
+            self.assertFalse(error.nodeFailure)
+
+    def testHierarchy(self):
+        for errorClass in (iotawrapper.NodeTimeout, iotawrapper.InvalidResponse, iotawrapper.CircuitOpen, iotawrapper.ClientError):
+            self.assertTrue(issubclass(errorClass, iotawrapper.ApiError))
+        self.assertTrue(issubclass(iotawrapper.NodeTimeout, iotawrapper.NodeUnreachable))
+        self.assertTrue(iotawrapper.NodeUnreachable('down').retryable)
+        self.assertFalse(iotawrapper.CircuitOpen('open').retryable)
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def testDelay(self):
+        policy = iotawrapper.RetryPolicy(backoff=0.1, multiplier=3, maxBackoff=0.5, jitter=False)
+        self.assertEqual([round(policy.delay(retry), 6) for retry in (1, 2, 3)], [0.1, 0.3, 0.5])
+        policy.jitter = True
+        self.assertTrue(all(0 <= policy.delay(2) <= 0.3 for i in range(20)))
+
+    def testRetriesUntilSuccess(self):
+        errors = [iotawrapper.NodeUnreachable('down'), iotawrapper.ServerError(None, 503, 'Busy', b'')]
+
+        def function():
+            if errors:
+                raise errors.pop(0)
+            return 'done'
+        self.assertEqual(iotawrapper.RetryPolicy(backoff=0, jitter=False).call('getTips', function), 'done')
+
+    def testGivesUp(self):
+        calls = []
+
+        def function():
+            calls.append(1)
+            raise iotawrapper.NodeUnreachable('down')
+        with self.assertRaises(iotawrapper.NodeUnreachable):
+            iotawrapper.RetryPolicy(attempts=3, backoff=0).call('getTips', function)
+        self.assertEqual(len(calls), 3)
+
+    def testDoesNotRetryClientErrors(self):
+        calls = []
+
+        def function():
+            calls.append(1)
+            raise iotawrapper.ClientError(None, 400, 'Bad Request', b'')
+        with self.assertRaises(iotawrapper.ClientError):
+            iotawrapper.RetryPolicy(backoff=0).call('getTrytes', function)
+        self.assertEqual(len(calls), 1)
+
+    def testPolicyForWrites(self):
+        storePolicy = iotawrapper.RetryPolicy(attempts=5)
+        policy = iotawrapper.RetryPolicy(commands={'storeTransactions': storePolicy})
+        self.assertIs(policy.policyFor('getTips'), policy)
+        self.assertIsNone(policy.policyFor('broadcastTransactions'))
+        self.assertIs(policy.policyFor('storeTransactions'), storePolicy)
+        writePolicy = iotawrapper.RetryPolicy(retryWrites=True)
+        self.assertIs(writePolicy.policyFor('broadcastTransactions'), writePolicy)
+        with self.assertRaises(ValueError):
+            iotawrapper.RetryPolicy(attempts=0)
+
+
+class RetryingApiTest(unittest.TestCase):
+
+    def tearDown(self):
+        self.api.close()
+        self.node.close()
+
+    def createApi(self, respond, retry):
+        self.node = StubNode(respond)
+        self.api = iotawrapper.Api(self.node.url, retry=retry)
+
+    def testRetriesReads(self):
+        self.createApi(failingResponse(2), iotawrapper.RetryPolicy(attempts=3, backoff=0.01))
+        self.assertEqual(self.api.getTrytes([HASH]).trytes(), [TRYTES])
+        self.assertEqual(len(self.node.commands('getTrytes')), 3)
+
+    def testDoesNotRetryWrites(self):
+        self.createApi(failingResponse(1), iotawrapper.RetryPolicy(attempts=3, backoff=0.01))
+        with self.assertRaises(iotawrapper.ServerError):
+            self.api.broadcastTransactions([TRYTES])
+        self.assertEqual(len(self.node.commands('broadcastTransactions')), 1)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def testOpensAfterFailures(self):
+        breaker = iotawrapper.CircuitBreaker(failureThreshold=2, resetTimeout=0.1)
+        node = 'http://node:14265'
+        breaker.failure(node)
+        self.assertEqual(breaker.state(node + '/'), 'closed')
+        breaker.failure(node)
+        self.assertEqual(breaker.state(node + '/'), 'open')
+        self.assertFalse(breaker.allow(node))
+        time.sleep(0.15)
+        self.assertEqual(breaker.state(node + '/'), 'halfOpen')
+        self.assertTrue(breaker.allow(node))
+        # Only one trial request at a time.
+        self.assertFalse(breaker.allow(node))
+        breaker.failure(node)
+        self.assertEqual(breaker.state(node + '/'), 'open')
+        time.sleep(0.15)
+        self.assertTrue(breaker.allow(node))
+        breaker.success(node)
+        self.assertEqual(breaker.state(node + '/'), 'closed')
+
+    def testSuccessResetsCount(self):
+        breaker = iotawrapper.CircuitBreaker(failureThreshold=2)
+        breaker.failure('http://node:14265')
+        breaker.success('http://node:14265')
+        breaker.failure('http://node:14265')
+        self.assertEqual(breaker.state('http://node:14265'), 'closed')
+
+    def testFailsFast(self):
+        breaker = iotawrapper.CircuitBreaker(failureThreshold=2, resetTimeout=60)
+        node = StubNode(failingResponse(2))
+        api = iotawrapper.Api(node.url, transport=iotawrapper.HttpTransport(breaker=breaker))
+        try:
+            for i in range(2):
+                with self.assertRaises(iotawrapper.ServerError):
+                    api.getTips()
+            with self.assertRaises(iotawrapper.CircuitOpen):
+                api.getTips()
+            self.assertEqual(len(node.commands('getTips')), 2)
+            self.assertEqual(breaker.state(node.url), 'open')
+        finally:
+            api.close()
+            node.close()
+
+    def testClientErrorsDoNotOpen(self):
+        breaker = iotawrapper.CircuitBreaker(failureThreshold=1)
+        node = StubNode(failingResponse(2, status=400))
+        api = iotawrapper.Api(node.url, transport=iotawrapper.HttpTransport(breaker=breaker))
+        try:
+            for i in range(2):
+                with self.assertRaises(iotawrapper.ClientError):
+                    api.getTips()
+            api.getTips()
+            self.assertEqual(breaker.state(node.url), 'closed')
+        finally:
+            api.close()
+            node.close()
+
+
+
+class TimeoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.node = SilentNode()
+
+    def tearDown(self):
+        self.node.close()
+
+    def testDefaultTimeouts(self):
+        api = iotawrapper.Api(self.node.url)
+        try:
+            self.assertIsNotNone(api.transport.timeout)
+        finally:
+            api.close()
+        self.assertIsNotNone(iotawrapper.HttpTransport().timeout)
+        self.assertIsNotNone(iotawrapper.AsyncHttpTransport().timeout)
+        self.assertIsNone(iotawrapper.HttpTransport(timeout=None).timeout)
+
+    def testSilentNodeTimesOut(self):
+        breaker = iotawrapper.CircuitBreaker(failureThreshold=2, resetTimeout=60)
+        retry = iotawrapper.RetryPolicy(attempts=2, backoff=0.01, jitter=False)
+        api = iotawrapper.Api(self.node.url, iotawrapper.HttpTransport(timeout=0.2, breaker=breaker), retry=retry)
+        try:
+            start = time.monotonic()
+            # Both attempts time out and open the circuit, the next call fails fast.
+            with self.assertRaises(iotawrapper.NodeTimeout):
+                api.getTips()
+            self.assertGreaterEqual(time.monotonic() - start, 0.4)
+            self.assertEqual(breaker.state(self.node.url), 'open')
+            with self.assertRaises(iotawrapper.CircuitOpen):
+                api.getTips()
+        finally:
+            api.close()
+
+    def testSilentNodeTimesOutAsync(self):
+        async def calls():
+            async with iotawrapper.AsyncApi(self.node.url, iotawrapper.AsyncHttpTransport(timeout=0.2)) as api:
+                await api.getTips()
+        with self.assertRaises(iotawrapper.NodeTimeout):
+            asyncio.run(calls())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests of Instrumentation and LatencyHistogram. Requires Python 3.
+
+    python3 -m unittest test_instrumentation
+"""
+import unittest
+
+from test_iotawrapper import StubNode, echoResponse, iotawrapper, HASH
+
+
+def durationResponse(command):
+    if command['command'] == 'getTrytes':
+        return 400, {'error': 'Invalid hashes input'}
+    if command['command'] == 'getTips':
+        return 200, {'hashes': [HASH], 'duration': 250}
+    return echoResponse(command)
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def testPercentiles(self):
+        histogram = iotawrapper.LatencyHistogram()
+        for millisecond in range(1, 1001):
+            histogram.record(millisecond / 1000.0)
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.total, 500.5)
+        for percentile in (50, 90, 99, 99.9):
+            self.assertAlmostEqual(histogram.percentile(percentile), percentile / 100, delta=percentile / 100 * 0.01)
+        # Percentiles are bucket middles, clamped to the recorded minimum and maximum.
+        self.assertEqual(histogram.percentile(100), 1.0)
+        self.assertAlmostEqual(histogram.percentile(0), 0.001, delta=0.00001)
+
+    def testWideRange(self):
+        histogram = iotawrapper.LatencyHistogram(significantDigits=3)
+        for seconds in (0.000002, 0.5, 3600.0):
+            histogram.record(seconds)
+        self.assertEqual(histogram.percentile(10), 0.000002)
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.0005)
+        self.assertAlmostEqual(histogram.percentile(100), 3600.0, delta=3600 * 0.001)
+        self.assertLess(len(histogram._counts), 4)
+
+    def testStats(self):
+        histogram = iotawrapper.LatencyHistogram()
+        self.assertEqual(histogram.percentile(50), 0.0)
+        self.assertIsNone(histogram.stats()['mean'])
+        histogram.record(0.1)
+        histogram.record(0.3)
+        stats = histogram.stats()
+        self.assertEqual((stats['count'], stats['min'], stats['max']), (2, 0.1, 0.3))
+        self.assertAlmostEqual(stats['mean'], 0.2)
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.node = StubNode(durationResponse)
+        self.instrumentation = iotawrapper.Instrumentation()
+        self.api = iotawrapper.Api(self.node.url, instrumentation=self.instrumentation)
+
+    def tearDown(self):
+        self.api.close()
+        self.node.close()
+
+    def testHooks(self):
+        requests = []
+        responses = []
+        self.instrumentation.onRequest(lambda event: requests.append(dict(event)))
+        self.instrumentation.onResponse(lambda event: responses.append(dict(event)))
+        self.api.getTips()
+        with self.assertRaises(iotawrapper.ClientError):
+            self.api.getTrytes([HASH])
+        self.assertEqual([event['command'] for event in requests], ['getTips', 'getTrytes'])
+        self.assertEqual(requests[0]['url'], self.node.url)
+        self.assertGreater(requests[0]['requestSize'], 0)
+        self.assertEqual((responses[0]['status'], responses[0]['error'], responses[0]['duration']), (200, None, 0.25))
+        self.assertGreater(responses[0]['responseSize'], 0)
+        self.assertGreaterEqual(responses[0]['latency'], 0)
+        self.assertEqual((responses[1]['status'], responses[1]['error']), (400, 'ClientError'))
+
+    def testStats(self):
+        for i in range(3):
+            self.api.getTips()
+        with self.assertRaises(iotawrapper.ClientError):
+            self.api.getTrytes([HASH])
+        stats = self.instrumentation.stats()
+        self.assertEqual((stats['getTips']['requests'], stats['getTips']['errors']), (3, 0))
+        self.assertEqual((stats['getTrytes']['requests'], stats['getTrytes']['errors']), (1, 1))
+        self.assertEqual(stats['getTips']['latency']['count'], 3)
+        self.assertAlmostEqual(stats['getTips']['duration']['p50'], 0.25, delta=0.0025)
+        self.assertEqual(stats['getTrytes']['duration']['count'], 0)
+        self.assertEqual(self.instrumentation.histogram('getTips').count, 3)
+        self.assertIsNone(self.instrumentation.histogram('getBalances'))
+        self.instrumentation.reset()
+        self.assertEqual(self.instrumentation.stats(), {})
+
+    def testPrometheus(self):
+        self.api.getTips()
+        self.api.getTips()
+        text = self.instrumentation.prometheus()
+        self.assertTrue(text.endswith('\n'))
+        lines = text.splitlines()
+        self.assertIn('# TYPE iota_request_duration_seconds summary', lines)
+        self.assertIn('iota_requests_total{command="getTips"} 2', lines)
+        self.assertIn('iota_request_errors_total{command="getTips"} 0', lines)
+        self.assertIn('iota_request_duration_seconds_count{command="getTips"} 2', lines)
+        self.assertIn('iota_node_duration_seconds{command="getTips",quantile="0.5"} 0.25', lines)
+        for line in lines:
+            if not line.startswith('#'):
+                float(line.rsplit(' ', 1)[1])
+
+    def testSharedByNodePool(self):
+        pool = iotawrapper.NodePool([self.node.url], instrumentation=self.instrumentation)
+        try:
+            pool.getTips()
+        finally:
+            pool.close()
+        self.assertEqual(self.instrumentation.stats()['getTips']['requests'], 1)
+        self.assertEqual(self.instrumentation.stats()['getNodeInfo']['requests'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
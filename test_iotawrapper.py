@@ -0,0 +1,296 @@
+"""
+Tests of iotawrapper against a local stub node which records every request. Requires Python 3.
+
+    python3 -m unittest test_iotawrapper
+"""
+import http.server
+import json
+import os
+import socketserver
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Python3'))
+import iotawrapper
+
+HASH = 'A' * 81
+OTHER_HASH = 'B' * 81
+TRYTES = '9' * 2673
+# Transaction of the test vectors of the IOTA libraries.
+VECTOR_TRYTES = (
+    'GYPRVHBEZOOFXSHQBLCYW9ICTCISLHDBNMMVYD9JJHQMPQCTIQAQTJNNNJ9IDXLRCCOYOXYPCLR9PBEY9ORZIEPPDNTI9CQWYZUOTAVBXPSBOF'
+    'EQAPFLWXSWUIUSJMSJIIIZWIKIRH9GCOEVZFKNXEVCUCIIWZQCQEUVRZOCMEL9AMGXJNMLJCIA9UWGRPPHCEOPTSVPKPPPCMQXYBHMSODTWUOA'
+    'BPKWFFFQJHCBVYXLHEWPD9YUDFTGNCYAKQKVEZYRBQRBXIAUX9SVEDUKGMTWQIYXRGSWYRK9SRONVGTW9YGHSZRIXWGPCCUCDRMAXBPDFVHSRY'
+    'WHGB9DQSQFQKSNICGPIPTRZINYRXQAFSWSEWIFRMSBMGTNYPRWFSOIIWWT9IDSELM9JUOOWFNCCSHUSMGNROBFJX9JQ9XT9PKEGQYQAWAFPRVR'
+    'RVQPUQBHLSNTEFCDKBWRCDX9EYOBB9KPMTLNNQLADBDLZPRVBCKVCYQEOLARJYAGTBFR9QLPKZBOYWZQOVKCVYRGYI9ZEFIQRKYXLJBZJDBJDJ'
+    'VQZCGYQMROVHNDBLGNLQODPUXFNTADDVYNZJUVPGB9LVPJIYLAPBOEHPMRWUIAJXVQOEM9ROEYUOTNLXVVQEYRQWDTQGDLEYFIYNDPRAIXOZEB'
+    'CS9P99AZTQQLKEILEVXMSHBIDHLXKUOMMNFKPYHONKEYDCHMUNTTNRYVMMEYHPGASPZXASKRUPWQSHDMU9VPS99ZZ9SJJYFUJFFMFORBYDILBX'
+    'CAVJDPDFHTTTIYOVGLRDYRTKHXJORJVYRPTDH9ZCPZ9ZADXZFRSFPIQKWLBRNTWJHXTOAUOL9FVGTUMMPYGYICJDXMOESEVDJWLMCVTJLPIEKB'
+    'E9JTHDQWV9MRMEWFLPWGJFLUXI9BXPSVWCMUWLZSEWHBDZKXOLYNOZAPOYLQVZAQMOHGTTQEUAOVKVRRGAHNGPUEKHFVPVCOYSJAWHZU9DRROH'
+    'BETBAFTATVAUGOEGCAYUXACLSSHHVYDHMDGJP9AUCLWLNTFEVGQGHQXSKEMVOVSKQEEWHWZUDTYOBGCURRZSJZLFVQQAAYQO9TRLFFN9HTDQXB'
+    'SPPJYXMNGLLBHOMNVXNOWEIDMJVCLLDFHBDONQJCJVLBLCSMDOUQCKKCQJMGTSTHBXPXAMLMSXRIPUBMBAWBFNLHLUJTRJLDERLZFUBUSMF999'
+    'XNHLEEXEENQJNOFFPNPQ9PQICHSATPLZVMVIWLRTKYPIXNFGYWOJSQDAXGFHKZPFLPXQEHCYEAGTIWIJEZTAVLNUMAFWGGLXMBNUQTOFCNLJTC'
+    'DMWVVZGVBSEBCPFSM99FLOIDTCLUGPSEDLOKZUAEVBLWNMODGZBWOVQT9DPFOTSKRABQAVOQ9RXWBMAKFYNDCZOJGTCIDMQSQQSODKDXTPFLNO'
+    'KSIZEOY9HFUTLQRXQMEPGOXQGLLPNSXAUCYPGZMNWMQWSWCKAQYKXJTWINSGPPZG9HLDLEAWUWEVCTVRCBDFOXKUROXH9HXXAXVPEJFRSLOGRV'
+    'GYZASTEBAQNXJJROCYRTDPYFUIQJVDHAKEG9YACV9HCPJUEUKOYFNWDXCCJBIFQKYOXGRDHVTHEQUMHO999999999999999999999999999999'
+    '99999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999'
+    '99999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999'
+    '99999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999'
+    '99999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999'
+    '99999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999'
+    '99999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999999'
+    '999999999999RKWEEVD99A99999999A99999999NFDPEEZCWVYLKZGSLCQNOFUSENIXRHWWTZFBXMPSQHEDFWZULBZFEOMNLRNIDQKDNNIELAO'
+    'XOVMYEI9PGTKORV9IKTJZQUBQAWTKBKZ9NEZHBFIMCLV9TTNJNQZUIJDFPTTCTKBJRHAITVSKUCUEMD9M9SQJ999999TKORV9IKTJZQUBQAWTK'
+    'BKZ9NEZHBFIMCLV9TTNJNQZUIJDFPTTCTKBJRHAITVSKUCUEMD9M9SQJ999999999999999999999999999999999RKWEEVD99RKWEEVD99RKW'
+    'EEVD99999999999999999999999999999'
+)
+VECTOR_HASH = 'JBVVEWEPYNZ9KRHNUUTRENXXAVXT9MKAVPAUQ9SJNSIHDCPQM9LJHIZGXO9PIRWUUVBOXNCBE9XJGMOZF'
+
+
+class StubNode:
+    """ HTTP/1.1 keep-alive server which records the decoded commands it receives and answers them with respond.
+        Constructor:
+            respond (function): Takes a command and returns the status and the response (a dict, or bytes sent as they are).
+            chunked (bool): Send responses with chunked transfer encoding instead of a content length.
+
+        Methods:
+            commands: Commands received so far, optionally only those of one name.
+            close: Stop the server.
+    """
+
+    def __init__(self, respond=None, chunked=False):
+        self.respond = respond or (lambda command: (200, {'duration': 0}))
+        self.chunked = chunked
+        self.received = []
+        self.ports = set()
+        node = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                command = json.loads(self.rfile.read(int(self.headers['content-length'])))
+                node.received.append(command)
+                node.ports.add(self.client_address[1])
+                status, response = node.respond(command)
+                body = response if isinstance(response, bytes) else json.dumps(response).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                if node.chunked:
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    for i in range(0, len(body), 7):
+                        self.wfile.write(b'%x\r\n%s\r\n' % (len(body[i:i + 7]), body[i:i + 7]))
+                    self.wfile.write(b'0\r\n\r\n')
+                else:
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+        class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+            daemon_threads = True
+
+        self._server = Server(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = 'http://127.0.0.1:%d/' % self._server.server_address[1]
+
+    def commands(self, name=None):
+        return [command for command in self.received if name is None or command['command'] == name]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def echoResponse(command):
+    """ Answers list commands with one entry per requested element, the way IRI does. """
+    name = command['command']
+    if name == 'getTrytes':
+        return 200, {'trytes': [TRYTES] * len(command['hashes']), 'duration': 0}
+    if name == 'findTransactions':
+        return 200, {'hashes': [HASH] * len(command['addresses']), 'duration': 0}
+    if name == 'getBalances':
+        return 200, {'balances': ['0'] * len(command['addresses']), 'references': [HASH], 'milestoneIndex': 1, 'duration': 0}
+    if name == 'getInclusionStates':
+        return 200, {'states': [True] * len(command['transactions']), 'duration': 0}
+    if name == 'attachToTangle':
+        return 200, {'trytes': command['trytes'], 'duration': 0}
+    return 200, {'duration': 0}
+
+
+class NodeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.node = StubNode(echoResponse)
+        self.api = iotawrapper.Api(self.node.url)
+
+    def tearDown(self):
+        self.api.close()
+        self.node.close()
+
+
+class HttpTransportTest(NodeTestCase):
+
+    def testReusesConnection(self):
+        for i in range(5):
+            self.api.getTips()
+        self.assertEqual(len(self.node.commands('getTips')), 5)
+        self.assertEqual(len(self.node.ports), 1)
+
+    def testLimitsConnections(self):
+        api = iotawrapper.Api(self.node.url, iotawrapper.HttpTransport(maxConnections=2))
+        try:
+            threads = [threading.Thread(target=api.getTips) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            api.close()
+        self.assertLessEqual(len(self.node.ports), 3)
+
+    def testWriteCommandsSendJsonLists(self):
+        trytesList = [TRYTES, TRYTES.replace('9', 'A', 1)]
+        self.api.storeTransactions(trytesList)
+        self.api.broadcastTransactions(trytesList)
+        self.api.attachToTangle(HASH, OTHER_HASH, 14, trytesList)
+        for name in ('storeTransactions', 'broadcastTransactions', 'attachToTangle'):
+            self.assertEqual(self.node.commands(name)[0]['trytes'], trytesList)
+
+    def testInclusionStatesSendJsonLists(self):
+        states = self.api.getInclusionStates([HASH, OTHER_HASH], [HASH, OTHER_HASH]).states()
+        command = self.node.commands('getInclusionStates')[0]
+        self.assertEqual(command['transactions'], [HASH, OTHER_HASH])
+        self.assertEqual(command['tips'], [HASH, OTHER_HASH])
+        self.assertEqual(states, [True, True])
+
+    def testNeighborsSendJsonLists(self):
+        uris = ['udp://10.0.0.1:14600', 'tcp://10.0.0.2:15600']
+        self.api.addNeighbors(uris)
+        self.api.removeNeighbors(uris)
+        self.assertEqual(self.node.commands('addNeighbors')[0]['uris'], uris)
+        self.assertEqual(self.node.commands('removeNeighbors')[0]['uris'], uris)
+
+    def testEmptyListsStayEmpty(self):
+        self.api.storeTransactions([])
+        self.assertEqual(self.node.commands('storeTransactions')[0]['trytes'], [])
+
+
+def numberedHashes(count):
+    return [iotawrapper.TRYTE_ALPHABET[i // 27 % 27] + iotawrapper.TRYTE_ALPHABET[i % 27] + HASH[2:] for i in range(count)]
+
+
+class ChunkingTest(NodeTestCase):
+
+    def setUp(self):
+        self.node = StubNode(self.respond)
+        self.api = iotawrapper.Api(self.node.url, chunkSize=3, workers=2)
+
+    def respond(self, command):
+        """ Answers every element with a value derived from it, so the order of the merged response can be checked. """
+        if command['command'] == 'getTrytes':
+            return 200, {'trytes': [hash[:2] + TRYTES[2:] for hash in command['hashes']], 'duration': 1}
+        if command['command'] == 'getBalances':
+            return 200, {'balances': [str(iotawrapper.TRYTE_ALPHABET.index(address[1])) for address in command['addresses']],
+                         'references': [command['addresses'][0]], 'milestoneIndex': len(command['addresses']), 'duration': 1}
+        return echoResponse(command)
+
+    def testRequestBodiesHoldSeparateElements(self):
+        hashes = numberedHashes(2)
+        self.api.getTrytes(hashes)
+        self.api.findTransactions(hashes)
+        self.api.getBalance(hashes, 100)
+        self.assertEqual(self.node.commands('getTrytes')[0]['hashes'], hashes)
+        self.assertEqual(self.node.commands('findTransactions')[0]['addresses'], hashes)
+        self.assertEqual(self.node.commands('getBalances')[0]['addresses'], hashes)
+        for command in self.node.received:
+            for value in command.get('hashes', []) + command.get('addresses', []):
+                self.assertEqual(len(value), 81)
+
+    def testSplitsIntoChunks(self):
+        hashes = numberedHashes(8)
+        response = self.api.getTrytes(hashes)
+        self.assertEqual(sorted(len(command['hashes']) for command in self.node.commands('getTrytes')), [2, 3, 3])
+        self.assertEqual([trytes[:2] for trytes in response.trytes()], [hash[:2] for hash in hashes])
+        self.assertEqual(response.jsonResponse()['duration'], 3)
+
+    def testMergesBalances(self):
+        addresses = numberedHashes(7)
+        response = self.api.getBalance(addresses, 100)
+        self.assertEqual(response.balances(), [str(i) for i in range(7)])
+        # The merged milestone is the oldest one any chunk saw.
+        self.assertEqual(response.milestoneIndex(), 1)
+        self.assertEqual(response.references(), [addresses[6]])
+
+    def testFindTransactionsDropsDuplicatesBetweenChunks(self):
+        self.assertEqual(self.api.findTransactions(numberedHashes(5)).hashes(), [HASH])
+        self.assertEqual(len(self.node.commands('findTransactions')), 2)
+
+    def testSmallRequestIsNotSplit(self):
+        self.api.getTrytes(numberedHashes(3))
+        self.assertEqual(len(self.node.commands('getTrytes')), 1)
+
+
+
+class TransactionTest(unittest.TestCase):
+
+    def testFields(self):
+        transaction = iotawrapper.Transaction(VECTOR_TRYTES)
+        self.assertEqual(transaction.signatureMessageFragment(), VECTOR_TRYTES[:2187])
+        self.assertEqual(transaction.address(), '9' * 81)
+        self.assertEqual(transaction.value(), 0)
+        self.assertEqual(transaction.obsoleteTag(), '9' * 27)
+        self.assertEqual(transaction.timestamp(), 1480690413)
+        self.assertEqual(transaction.currentIndex(), 1)
+        self.assertEqual(transaction.lastIndex(), 1)
+        self.assertEqual(transaction.bundle(), 'NFDPEEZCWVYLKZGSLCQNOFUSENIXRHWWTZFBXMPSQHEDFWZULBZFEOMNLRNIDQKDNNIELAOXOVMYEI9PG')
+        self.assertEqual(transaction.trunkTransaction(), 'TKORV9IKTJZQUBQAWTKBKZ9NEZHBFIMCLV9TTNJNQZUIJDFPTTCTKBJRHAITVSKUCUEMD9M9SQJ999999')
+        self.assertEqual(transaction.branchTransaction(), transaction.trunkTransaction())
+        self.assertEqual(transaction.tag(), '9' * 27)
+        self.assertEqual(transaction.attachmentTimestamp(), 1480690413)
+        self.assertEqual(transaction.attachmentTimestampLowerBound(), 1480690413)
+        self.assertEqual(transaction.attachmentTimestampUpperBound(), 1480690413)
+        self.assertEqual(transaction.nonce(), '9' * 27)
+        self.assertEqual(transaction.trytes(), VECTOR_TRYTES)
+
+    def testHash(self):
+        self.assertEqual(iotawrapper.Transaction(VECTOR_TRYTES).hash(), VECTOR_HASH)
+
+    def testNegativeValue(self):
+        trytes = TRYTES[:2268] + 'ZA' + TRYTES[2270:]
+        self.assertEqual(iotawrapper.Transaction(trytes).value(), 26)
+        trytes = TRYTES[:2268] + 'Z' + TRYTES[2269:]
+        self.assertEqual(iotawrapper.Transaction(trytes).value(), -1)
+
+    def testOffsetIntoBuffer(self):
+        buffer = (TRYTES + VECTOR_TRYTES).encode('ascii')
+        transaction = iotawrapper.Transaction(memoryview(buffer), 2673)
+        self.assertEqual(transaction.timestamp(), 1480690413)
+        self.assertEqual(transaction.trytes(), VECTOR_TRYTES)
+
+    def testTooShort(self):
+        with self.assertRaises(ValueError):
+            iotawrapper.Transaction(TRYTES[:-1])
+        with self.assertRaises(ValueError):
+            iotawrapper.Transaction(TRYTES + VECTOR_TRYTES, 2674)
+
+
+class GetTrytesTransactionsTest(NodeTestCase):
+
+    def setUp(self):
+        self.node = StubNode(lambda command: (200, {'trytes': [VECTOR_TRYTES, TRYTES][:len(command['hashes'])], 'duration': 0}))
+        self.api = iotawrapper.Api(self.node.url)
+
+    def testTransactions(self):
+        transactions = self.api.getTrytes([VECTOR_HASH, HASH]).transactions()
+        self.assertEqual([transaction.currentIndex() for transaction in transactions], [1, 0])
+        self.assertEqual(transactions[0].hash(), VECTOR_HASH)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Tests of the IRI emulator and of Api requests checked by it. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_iriemulator
+"""
+import unittest
+
+from test_iotawrapper import iotawrapper, HASH, OTHER_HASH, TRYTES
+import curl
+import iriemulator
+
+ADDRESS = 'C' * 81
+OTHER_ADDRESS = 'D' * 81
+TAG = 'TESTTAG' + '9' * 20
+
+
+def transactionTrytes(address, value=0, index=0):
+    return iriemulator._transactionTrytes(address, value, 1500000000 + index, HASH, iriemulator.NULL_HASH, iriemulator.NULL_HASH, TAG)
+
+
+class StrictParameterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = iriemulator.IriEmulator(seed=1)
+
+    def assertRejected(self, command, error):
+        status, response = self.emulator.handle(command)
+        self.assertEqual((status, response), (400, {'error': error}))
+
+    def testJoinedElementsAreRejected(self):
+        joined = '%s,%s' % (HASH, OTHER_HASH)
+        self.assertRejected({'command': 'getTrytes', 'hashes': [joined]}, 'Invalid hashes input')
+        self.assertRejected({'command': 'getTrytes', 'hashes': ['%s, %s' % (HASH, OTHER_HASH)]}, 'Invalid hashes input')
+        self.assertRejected({'command': 'findTransactions', 'addresses': [joined]}, 'Invalid addresses input')
+        self.assertRejected({'command': 'getBalances', 'addresses': [joined], 'threshold': 100}, 'Invalid addresses input')
+        self.assertRejected({'command': 'getInclusionStates', 'transactions': [HASH], 'tips': [joined]}, 'Invalid tips input')
+        self.assertRejected({'command': 'storeTransactions', 'trytes': ['%s,%s' % (TRYTES, TRYTES)]}, 'Invalid trytes input')
+        self.assertRejected({'command': 'addNeighbors', 'uris': ['udp://10.0.0.1:14600,udp://10.0.0.2:14600']}, 'Invalid uris input')
+
+    def testInvalidElements(self):
+        self.assertRejected({'command': 'getTrytes', 'hashes': [HASH[:80]]}, 'Invalid hashes input')
+        self.assertRejected({'command': 'getTrytes', 'hashes': [HASH.lower()]}, 'Invalid hashes input')
+        self.assertRejected({'command': 'getTrytes', 'hashes': [1]}, 'Invalid hashes input')
+        self.assertRejected({'command': 'getTrytes', 'hashes': HASH}, 'Invalid hashes input')
+        self.assertRejected({'command': 'findTransactions', 'tags': ['A' * 28]}, 'Invalid tags input')
+        self.assertRejected({'command': 'getInclusionStates', 'transactions': [' ' + HASH], 'tips': [HASH]}, 'Invalid transactions input')
+        self.assertRejected({'command': 'attachToTangle', 'trunkTransaction': HASH, 'branchTransaction': [OTHER_HASH],
+                             'minWeightMagnitude': 1, 'trytes': [TRYTES]}, 'Invalid branchTransaction input')
+        self.assertRejected({'command': 'storeTransactions', 'trytes': []}, 'Invalid trytes input')
+        self.assertRejected({'command': 'addNeighbors', 'uris': ['10.0.0.1:14600']}, 'Invalid uris input')
+
+    def testOtherErrors(self):
+        self.assertRejected({'command': 'getTransactionsToApprove', 'depth': 16}, 'Invalid depth input')
+        self.assertRejected({'command': 'getBalances', 'addresses': [ADDRESS], 'threshold': 0}, 'Illegal threshold')
+        self.assertRejected({'command': 'findTransactions'}, 'Invalid parameters')
+        self.assertRejected({'command': 'getBananas'}, 'Command [getBananas] is unknown')
+
+    def testAddressesWithChecksum(self):
+        status, response = self.emulator.handle({'command': 'getBalances', 'addresses': [ADDRESS + 'ABCDEFGHI'], 'threshold': 100})
+        self.assertEqual((status, response['balances']), (200, ['0']))
+
+
+class EmulatorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = iriemulator.IriEmulator(balances={ADDRESS: 1000}, seed=1)
+        self.url = self.emulator.serve()
+        # Small chunks, so chunked requests are checked by the emulator as well.
+        self.api = iotawrapper.Api(self.url, chunkSize=2)
+
+    def tearDown(self):
+        self.api.close()
+        self.emulator.close()
+
+
+class ApiAgainstEmulatorTest(EmulatorTestCase):
+
+    def testStoreAndFind(self):
+        trytesList = [transactionTrytes(ADDRESS, index=index) for index in range(3)] + [transactionTrytes(OTHER_ADDRESS)]
+        self.api.storeTransactions(trytesList)
+        hashes = curl.transactionHashes(trytesList)
+        self.assertEqual(sorted(self.api.findTransactions([ADDRESS, OTHER_ADDRESS, HASH]).hashes()), sorted(hashes))
+        self.assertEqual(self.api.getTrytes(hashes + [OTHER_HASH]).trytes(), trytesList + ['9' * 2673])
+        self.assertEqual(set(hashes) - set(self.api.getTips().hashes()), set())
+
+    def testBalances(self):
+        response = self.api.getBalance([ADDRESS, OTHER_ADDRESS, ADDRESS], 100)
+        self.assertEqual(response.balances(), ['1000', '0', '1000'])
+        self.assertEqual(response.milestoneIndex(), self.emulator.latestMilestoneIndex)
+
+    def testInclusionStates(self):
+        trytesList = [transactionTrytes(ADDRESS, index=index) for index in range(3)]
+        self.api.storeTransactions(trytesList)
+        hashes = curl.transactionHashes(trytesList)
+        milestone = self.emulator.latestMilestone
+        self.assertEqual(self.api.getInclusionStates(hashes, [milestone]).states(), [False] * 3)
+        milestone = self.emulator.issueMilestone()
+        states = self.api.getInclusionStates(hashes, [milestone]).states()
+        self.assertEqual(len(states), 3)
+        self.assertIn(True, states)
+
+    def testNeighbors(self):
+        uris = ['udp://10.0.0.1:14600', 'tcp://10.0.0.2:15600']
+        self.assertEqual(self.api.addNeighbors(uris).jsonResponse()['addedNeighbors'], 2)
+        self.assertEqual(self.api.addNeighbors(uris[:1]).jsonResponse()['addedNeighbors'], 0)
+        self.assertEqual(self.api.removeNeighbors(uris).jsonResponse()['removedNeighbors'], 2)
+
+    def testInvalidRequestRaisesClientError(self):
+        with self.assertRaises(iotawrapper.ClientError) as context:
+            self.api.getTrytes([HASH[:80]])
+        self.assertEqual(context.exception.error, 'Invalid hashes input')
+
+    def testTransactionsToApprove(self):
+        response = self.api.getTransactionsToApprove(3).jsonResponse()
+        self.assertEqual(len(response['trunkTransaction']), 81)
+        self.assertEqual(len(response['branchTransaction']), 81)
+
+
+class EmulatorTransportTest(unittest.TestCase):
+
+    def testInProcess(self):
+        emulator = iriemulator.IriEmulator(balances={ADDRESS: 5})
+        api = iotawrapper.Api('emulator', emulator.transport())
+        try:
+            self.assertEqual(api.getBalance([ADDRESS], 100).balances(), ['5'])
+            with self.assertRaises(iotawrapper.ClientError):
+                api.getBalance(['%s,%s' % (ADDRESS, OTHER_ADDRESS)], 100)
+        finally:
+            api.close()
+            emulator.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
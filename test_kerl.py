@@ -0,0 +1,117 @@
+"""
+Tests of Kerl with the vectors of the IOTA libraries. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_kerl
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Python3'))
+import kerl
+import trinary
+
+# Trytes and hashes from the Kerl test vectors of the IOTA libraries.
+HASHES = [
+    ('GYOMKVTSNHVJNCNFBBAH9AAMXLPLLLROQY99QN9DLSJUHDPBLCFFAIQXZA9BKMBJCYSFHFPXAHDWZFEIZ',
+     'OXJCNFHUNAHWDLKKPELTBFUCVW9KLXKOGWERKTJXQMXTKFKNWNNXYD9DMJJABSEIONOSJTTEVKVDQEWTW'),
+    ('ZMRSKGXE9ZPORJRBRQDWEMEOVSCE9FRANHIAEIZKLETIGITFPQHYSXFYKUMSREDJNVGUXTZEFDRZZWPJG',
+     'BAQNPLEGMSYJRGPE9AMDHHMJFBPCRLRTDFUZWFMBOGJCYCE9QHXZFYFFOKYUOZC9WCCEZ9XDMYXMXWEDA'),
+    ('KIPLDOXKXVWNJ9ZCCQPQDHYGCVHZTOMOFAWEZF9KKGPOWHEOUPJKPIWEPJXE9ZQI9GBCZFEJBXZLMNF9S',
+     'DU9VPTG9FPTCFMDCAJNFZCIFTADKJRFGWHUNRRRTJHUDDZSFADIGEIEEOKMEAPILDIEZXYPKXMBIODJEC'),
+    ('EMIDYNHBWMBCXVDEFOFWINXTERALUKYYPPHKP9JJFGJEIUY9MUDVNFZHMMWZUYUSWAIOWEVTHNWMHANBH',
+     'EJEAOOZYSAWFPZQESYDHZCGYNSTWXUMVJOVDWUNZJXDGWCLUFGIMZRMGCAZGKNPLBRLGUNYWKLJTYEAQX'),
+]
+MULTI_TRYTES = [
+    ('WMDBVBFWABDYUWRBKHNZWWTHEXPGIZJBAA9FLZXXSNQYQRW9VOQVCRAHIMZQSM9PUUTRHFDFHTQBZJEKHGQKN9NDUGSHRXWVNMSXUXTQR9RK9NYK9'
+     'SYPEQFBIXAWCELQCBOGJMMDTYGLDLHVRVNAHKW9QIDQ9YCAWDMNAEFTAVLNFJCEXXM9CVPIODJJNKYKZYTEJUIA9DESWZEXYIADLRRTKQYKOFGEAY'
+     'IJLONFOCUIORKZGEO',
+     'ENUJQUMNJKKXIUPPNW9CUTNASXZTEYDYCKPMCNBJGYKZRTAABPYSWIUOJVVRSVCCKOARLXX99EFYSLBYX'),
+    ('IDFH9DXCUQCRYUGBBLBMTUDWFSBVINTNVHGWQSGFOL9OHJNQKFXFRGPSPURLXKZQRSPLXKBFHUWKY9IRWFPAZXUDLFZ9ZKYBRU9WPTRHFIVRIVIZL'
+     'ZFNBWWBSVJZEKJ9HPFHAFUMRBZZJIIJWQK9FBMZECUBVC9U9MOMFQUKSMHVNYWLBLMWMSIIVBGOVUFYYD9AHKTXJCLZEKMEOCM9KNJNLRXEKFCJCJ'
+     'L9K9IAVMPRSUCMQKC',
+     'YBE9FGOOXJXHXLHJAJZRTEYEBJLKBGDGWHGIGDUNESYJSNNSR9CMJWQPK9A9HARO9INZLWFQRPBPKGKUX'),
+]
+MULTI_SQUEEZE = (
+    'HYZY9CAVTNFQCDYFUHASZZHARFNIIGYGFLHLNMHQNAONHNLODAAFFVMDKBIVZEWEIPVHVWNHVZSUFTWLC',
+    'IWDWJCUUE9EBBYAEDXPDNAKTJAVY9IFOUZBNRIHMZ9NWOGOL9GYKZZ9ZLXHAI9PVPSLEAUGX9TQKMIUAX'
+    'ANLYSAFQ9RJKFEADAZDTLPMYCYSGTRIOUWFKZPWJIEQHDTREOPHSUMAGIZLVIRMZGAVKODZAYBUISSQNX'
+    'PWDQRZKKM9XGZTBCORFDRYFUDZSJQDGZJ9LCXJRMNEOKQDEODIGHBT9XZDIVZECQQKIUQDDYCSLOFSSYW',
+)
+SQUEEZE_INPUT = '9MIDYNHBWMBCXVDEFOFWINXTERALUKYYPPHKP9JJFGJEIUY9MUDVNFZHMMWZUYUSWAIOWEVTHNWMHANBH'
+SQUEEZE_OUTPUT = ('G9JYBOMPUXHYHKSNRNMMSSZCSHOFYOYNZRSZMAAYWDYEIMVVOGKPJBVBM9TDPULSFUNMTVXRKFIDOHUXXVYDLFSZYZTWQYTE9SPYYWYTXJYQ'
+                  '9IFGYOLZXWZBKWZN9QOOTBQMWMUBLEWUEEASRHRTNIQWJQNDWRYLCA')
+ABSORB_OUTPUT = ('LUCKQVACOGBFYSPPVSSOXJEKNSQQRQKPZC9NXFSMQNRQCGGUL9OHVVKBDSKEQEBKXRNUJSRXYVHJTXBPDWQGNSCDCBAIRHAQCOWZEBSNHIJIGPZQ'
+                 'ITIBJQ9LNTDIBTCQ9EUWKHFLGFUVGGUWJONK9GBCDUIMAYMMQX')
+
+
+def kerlTrytes(trytes, length=kerl.HASH_LENGTH):
+    return trinary.tritsToTrytes(kerl.kerlHash(trinary.trytesToTrits(trytes), length))
+
+
+class KeccakTest(unittest.TestCase):
+
+    def testKeccak384(self):
+        digest = kerl.keccak384(np.frombuffer(b'Message', dtype=np.uint8))
+        self.assertEqual(digest.shape, (1, 48))
+        self.assertEqual(digest[0].tobytes().hex(), '0c8d6ff6e6a1cf18a0d55b20f0bca160d0d1c914a5e842f3707a25eeb20a279f'
+                                                    '6b4e83eda8e43a67697832c7f69f53ca')
+
+    def testMultipleBlocks(self):
+        messages = np.random.default_rng(8).integers(0, 256, size=(3, 250)).astype(np.uint8)
+        digests = kerl.keccak384(messages)
+        for message, digest in zip(messages, digests):
+            self.assertEqual(kerl.keccak384(message)[0].tolist(), digest.tolist())
+
+
+class KerlTest(unittest.TestCase):
+
+    def testHashes(self):
+        for trytes, expected in HASHES:
+            self.assertEqual(kerlTrytes(trytes), expected)
+
+    def testMultipleTrytes(self):
+        for trytes, expected in MULTI_TRYTES:
+            self.assertEqual(kerlTrytes(trytes), expected)
+
+    def testMultipleSqueezes(self):
+        trytes, expected = MULTI_SQUEEZE
+        self.assertEqual(kerlTrytes(trytes, 729), expected)
+        self.assertEqual(kerlTrytes(SQUEEZE_INPUT, 486), SQUEEZE_OUTPUT)
+
+    def testAbsorbMultipleHashes(self):
+        self.assertEqual(kerlTrytes(SQUEEZE_OUTPUT, 486), ABSORB_OUTPUT)
+
+    def testIncrementalAbsorb(self):
+        trits = trinary.trytesToTrits(MULTI_TRYTES[0][0])
+        sponge = kerl.Kerl()
+        for offset in range(0, len(trits), kerl.HASH_LENGTH):
+            sponge.absorb(trits[offset:offset + kerl.HASH_LENGTH])
+        self.assertEqual(trinary.tritsToTrytes(sponge.squeeze()), MULTI_TRYTES[0][1])
+
+    def testBatch(self):
+        trits = trinary.trytesToTrits([trytes for trytes, expected in HASHES])
+        hashes = kerl.kerlHash(trits, 486)
+        self.assertEqual(hashes.shape, (len(HASHES), 486))
+        self.assertEqual(trinary.tritsToTrytes(hashes[:, :243]), [expected for trytes, expected in HASHES])
+        self.assertEqual(hashes[3].tolist(), kerl.kerlHash(trits[3], 486).tolist())
+
+    def testSqueezedBytes(self):
+        digests = kerl.keccak384(np.random.default_rng(9).integers(0, 256, size=(20, 48)).astype(np.uint8))
+        trits = trinary.bytesToTrits(digests)
+        trits[:, -1] = 0
+        self.assertTrue((kerl.squeezedBytes(digests) == trinary.tritsToBytes(trits)).all())
+
+    def testInvalidLengths(self):
+        with self.assertRaises(ValueError):
+            kerl.Kerl().absorb(np.zeros(242, dtype=np.int8))
+        with self.assertRaises(ValueError):
+            kerl.kerlHash(np.zeros(243, dtype=np.int8), 100)
+        with self.assertRaises(ValueError):
+            kerl.Kerl().squeeze()
+
+
+if __name__ == '__main__':
+    unittest.main()
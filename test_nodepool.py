@@ -0,0 +1,175 @@
+"""
+Tests of NodePool against several local stub nodes. Requires Python 3.
+
+    python3 -m unittest test_nodepool
+"""
+import time
+import unittest
+
+from test_iotawrapper import StubNode, echoResponse, iotawrapper, HASH, TRYTES
+
+
+def nodeResponse(solidIndex, latestIndex=None, delay=0, failing=()):
+    """ Answer like a node at the given milestones which takes delay seconds for every command but getNodeInfo and fails
+        the commands in failing with status 503.
+    """
+    def respond(command):
+        name = command['command']
+        if name == 'getNodeInfo':
+            return 200, {'latestSolidSubtangleMilestoneIndex': solidIndex, 'duration': 0,
+                         'latestMilestoneIndex': solidIndex if latestIndex is None else latestIndex}
+        time.sleep(delay)
+        if name in failing:
+            return 503, {'error': 'Node is busy'}
+        return echoResponse(command)
+    return respond
+
+
+class PoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.nodes = []
+        self.pool = None
+
+    def tearDown(self):
+        if self.pool is not None:
+            self.pool.close()
+        for node in self.nodes:
+            node.close()
+
+    def createPool(self, *responses, **options):
+        self.nodes = [StubNode(respond) for respond in responses]
+        self.pool = iotawrapper.NodePool([node.url for node in self.nodes], **options)
+        # Start from a known order, the first node is the fastest.
+        self.pool.checkHealth()
+        for index, node in enumerate(self.pool.router.nodes):
+            node.wallTime = 0.001 * (index + 1)
+        return self.pool
+
+    def received(self, name):
+        return [len(node.commands(name)) for node in self.nodes]
+
+
+class NodePoolTest(PoolTestCase):
+
+    def testAvoidsLaggingNode(self):
+        pool = self.createPool(nodeResponse(90), nodeResponse(100))
+        for i in range(3):
+            pool.getTips()
+        self.assertEqual(self.received('getTips'), [0, 3])
+        self.assertEqual([stats['inSync'] for stats in pool.nodeStats()], [False, True])
+
+    def testAvoidsNodeBehindItsLatestMilestone(self):
+        pool = self.createPool(nodeResponse(100, latestIndex=110), nodeResponse(100))
+        pool.getTips()
+        self.assertEqual(self.received('getTips'), [0, 1])
+        self.assertEqual([stats['ejected'] for stats in pool.nodeStats()], [True, False])
+
+    def testPrefersFasterNode(self):
+        pool = self.createPool(nodeResponse(100, delay=0.05), nodeResponse(100))
+        pool.getTips()
+        pool.getTips()
+        self.assertEqual(self.received('getTips'), [1, 1])
+        pool.getTips()
+        self.assertEqual(self.received('getTips'), [1, 2])
+
+    def testFailsOverReadCommands(self):
+        pool = self.createPool(nodeResponse(100, failing=('getTrytes',)), nodeResponse(100, delay=0.02))
+        self.assertEqual(pool.getTrytes([HASH]).trytes(), [TRYTES])
+        self.assertEqual(self.received('getTrytes'), [1, 1])
+        stats = pool.nodeStats()
+        self.assertEqual((stats[0]['errors'], stats[0]['ejected']), (1, True))
+        pool.getTrytes([HASH])
+        self.assertEqual(self.received('getTrytes'), [1, 2])
+
+    def testHealthCheckReadmitsNode(self):
+        pool = self.createPool(nodeResponse(100), nodeResponse(100), ejectTime=60)
+        pool.getTips()
+        pool.router._failed(pool.router.nodes[0])
+        self.assertTrue(pool.nodeStats()[0]['ejected'])
+        pool.checkHealth()
+        self.assertFalse(pool.nodeStats()[0]['ejected'])
+        self.assertEqual(self.received('getNodeInfo'), [2, 2])
+
+    def testWriteCommandsAreNotRepeated(self):
+        pool = self.createPool(nodeResponse(100, failing=('storeTransactions',)), nodeResponse(100, delay=0.02))
+        with self.assertRaises(iotawrapper.ServerError):
+            pool.storeTransactions([TRYTES])
+        self.assertEqual(self.received('storeTransactions'), [1, 0])
+
+    def testClientErrorsAreNotRepeated(self):
+        def invalid(command):
+            if command['command'] == 'getTrytes':
+                return 400, {'error': 'Invalid hashes input'}
+            return nodeResponse(100)(command)
+        pool = self.createPool(invalid, nodeResponse(100, delay=0.02))
+        with self.assertRaises(iotawrapper.ClientError):
+            pool.getTrytes([HASH])
+        self.assertEqual(self.received('getTrytes'), [1, 0])
+        self.assertEqual(pool.nodeStats()[0]['errors'], 0)
+
+    def testAllNodesFailing(self):
+        pool = self.createPool(nodeResponse(100, failing=('getTips',)), nodeResponse(100, failing=('getTips',)))
+        with self.assertRaises(iotawrapper.ServerError):
+            pool.getTips()
+        self.assertEqual(self.received('getTips'), [1, 1])
+
+    def testNeedsNodes(self):
+        with self.assertRaises(ValueError):
+            iotawrapper.NodePool([])
+
+
+class HedgingTest(PoolTestCase):
+
+    def testSlowReadIsHedged(self):
+        pool = self.createPool(nodeResponse(100, delay=0.5), nodeResponse(100), hedgeDelay=0.05)
+        start = time.monotonic()
+        self.assertEqual(pool.getTrytes([HASH]).trytes(), [TRYTES])
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual(self.received('getTrytes'), [1, 1])
+        self.assertEqual(pool.hedgeStats(), {'hedged': 1, 'won': 1})
+
+    def testFastReadIsNotHedged(self):
+        pool = self.createPool(nodeResponse(100), nodeResponse(100), hedgeDelay=0.5)
+        pool.getTrytes([HASH])
+        self.assertEqual(self.received('getTrytes'), [1, 0])
+        self.assertEqual(pool.hedgeStats(), {'hedged': 0, 'won': 0})
+
+    def testHedgeSkipsLaggingNode(self):
+        pool = self.createPool(nodeResponse(100, delay=0.2), nodeResponse(90), hedgeDelay=0.05)
+        pool.getTrytes([HASH])
+        self.assertEqual(self.received('getTrytes'), [1, 0])
+        self.assertEqual(pool.hedgeStats()['hedged'], 0)
+
+    def testFailedRequestFallsBackToHedge(self):
+        pool = self.createPool(nodeResponse(100, delay=0.2, failing=('getTrytes',)), nodeResponse(100, delay=0.3), hedgeDelay=0.05)
+        self.assertEqual(pool.getTrytes([HASH]).trytes(), [TRYTES])
+        self.assertEqual(self.received('getTrytes'), [1, 1])
+
+    def testWritesAreNotHedged(self):
+        pool = self.createPool(nodeResponse(100, delay=0.2), nodeResponse(100), hedgeDelay=0.05)
+        pool.storeTransactions([TRYTES])
+        self.assertEqual(self.received('storeTransactions'), [1, 0])
+
+    def testHedgedWrites(self):
+        pool = self.createPool(nodeResponse(100, delay=0.2), nodeResponse(100), hedgeDelay=0.05, hedgeWrites=['broadcastTransactions'])
+        pool.broadcastTransactions([TRYTES])
+        self.assertEqual(self.received('broadcastTransactions'), [1, 1])
+        pool.router.nodes[0].wallTime = 0.001
+        pool.storeTransactions([TRYTES])
+        self.assertEqual(self.received('storeTransactions'), [1, 0])
+
+    def testPercentileNeedsSamples(self):
+        pool = self.createPool(nodeResponse(100), nodeResponse(100), hedgeDelay='p90')
+        node = pool.router.nodes[0]
+        self.assertIsNone(pool.router._delayFor(node))
+        node.recent.extend(0.001 * i for i in range(1, 101))
+        self.assertAlmostEqual(pool.router._delayFor(node), 0.091)
+
+    def testInvalidHedgeDelay(self):
+        with self.assertRaises(ValueError):
+            iotawrapper.NodePool(['http://127.0.0.1:1/'], hedgeDelay='fast')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests of the local proof of work. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_proofofwork
+"""
+import threading
+import time
+import unittest
+
+from test_iotawrapper import iotawrapper, HASH, OTHER_HASH, TRYTES, VECTOR_TRYTES
+import curl
+import proofofwork
+import trinary
+
+WEIGHT = 5
+
+
+def bundleTrytes(count):
+    return [TRYTES[:2187] + trinary.tritsToTrytes(trinary.intToTrits(index, 243)) + TRYTES[2268:] for index in range(count)]
+
+
+class AttachTestCase(unittest.TestCase):
+
+    def assertAttached(self, attached, trytesList, trunkTransaction=HASH, branchTransaction=OTHER_HASH, weight=WEIGHT):
+        """ Check the fields attachToTangle fills in, attached is in reverse order like IRI returns it. """
+        attached = attached[::-1]
+        self.assertEqual(len(attached), len(trytesList))
+        previous = None
+        for trytes, original in zip(attached, trytesList):
+            transaction = iotawrapper.Transaction(trytes)
+            self.assertEqual(trytes[:2430], original[:2430])
+            if previous is None:
+                self.assertEqual((transaction.trunkTransaction(), transaction.branchTransaction()), (trunkTransaction, branchTransaction))
+            else:
+                self.assertEqual((transaction.trunkTransaction(), transaction.branchTransaction()), (previous, trunkTransaction))
+            self.assertLessEqual(transaction.attachmentTimestampLowerBound(), transaction.attachmentTimestamp())
+            self.assertGreater(transaction.attachmentTimestamp(), 0)
+            hashTrits = trinary.trytesToTrits(transaction.hash())
+            self.assertFalse(hashTrits[-weight:].any())
+            previous = transaction.hash()
+
+
+class PowEngineTest(AttachTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = proofofwork.PowEngine(processes=1, words=4)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.close()
+
+    def testSearchNonce(self):
+        nonce = self.engine.searchNonce(VECTOR_TRYTES, WEIGHT)
+        self.assertEqual(len(nonce), 27)
+        hashTrits = trinary.trytesToTrits(curl.transactionHash(VECTOR_TRYTES[:-27] + nonce))
+        self.assertFalse(hashTrits[-WEIGHT:].any())
+
+    def testAttachToTangle(self):
+        trytesList = bundleTrytes(3)
+        self.assertAttached(self.engine.attachToTangle(HASH, OTHER_HASH, WEIGHT, trytesList), trytesList)
+
+    def testInterrupt(self):
+        errors = []
+
+        def search():
+            try:
+                self.engine.searchNonce(VECTOR_TRYTES, 60)
+            except proofofwork.PowInterrupted as e:
+                errors.append(e)
+        thread = threading.Thread(target=search)
+        thread.start()
+        time.sleep(0.3)
+        self.engine.interrupt()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def testInvalidInput(self):
+        for weight in (0, 244):
+            with self.assertRaises(ValueError):
+                self.engine.searchNonce(TRYTES, weight)
+        with self.assertRaises(ValueError):
+            self.engine.attachToTangle(HASH[:80], OTHER_HASH, WEIGHT, [TRYTES])
+        with self.assertRaises(ValueError):
+            self.engine.attachToTangle(HASH, OTHER_HASH, WEIGHT, [TRYTES[:-1]])
+
+
+class PowSchedulerTest(AttachTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scheduler = proofofwork.PowScheduler(processes=2, words=4)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.scheduler.close()
+
+    def testSubmit(self):
+        bundles = [bundleTrytes(count) for count in (1, 2, 3)]
+        jobs = [self.scheduler.submit(HASH, OTHER_HASH, WEIGHT, trytesList) for trytesList in bundles]
+        for job, trytesList in zip(jobs, bundles):
+            self.assertAttached(job.result(30), trytesList)
+            self.assertTrue(job.done())
+
+    def testTimeout(self):
+        job = self.scheduler.submit(HASH, OTHER_HASH, 60, bundleTrytes(1), timeout=0.2)
+        with self.assertRaises(proofofwork.PowTimeout):
+            job.result(30)
+
+    def testCancel(self):
+        job = self.scheduler.submit(HASH, OTHER_HASH, 60, bundleTrytes(1))
+        time.sleep(0.3)
+        job.cancel()
+        with self.assertRaises((proofofwork.PowInterrupted, iotawrapper.concurrent.futures.CancelledError)):
+            job.result(30)
+
+    def testInterrupt(self):
+        jobs = [self.scheduler.submit(HASH, OTHER_HASH, 60, bundleTrytes(1)) for i in range(3)]
+        time.sleep(0.3)
+        self.scheduler.interrupt()
+        for job in jobs:
+            with self.assertRaises(proofofwork.PowInterrupted):
+                job.result(30)
+
+    def testInvalidWeight(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.submit(HASH, OTHER_HASH, 0, bundleTrytes(1))
+
+
+class LocalPowApiTest(AttachTestCase):
+
+    def testLocalAttachToTangle(self):
+        api = iotawrapper.Api('http://127.0.0.1:1/', localPow=True, powProcesses=1)
+        try:
+            trytesList = bundleTrytes(2)
+            response = api.attachToTangle(HASH, OTHER_HASH, WEIGHT, trytesList)
+            self.assertIsInstance(response, iotawrapper.AttachToTangle)
+            self.assertAttached(response.trytes(), trytesList)
+        finally:
+            api.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
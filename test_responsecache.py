@@ -0,0 +1,120 @@
+"""
+Tests of ResponseCache and of an Api using it. Requires Python 3.
+
+    python3 -m unittest test_responsecache
+"""
+import time
+import unittest
+
+from test_iotawrapper import StubNode, echoResponse, iotawrapper, HASH, OTHER_HASH, TRYTES, VECTOR_TRYTES
+
+
+def knownResponse(command):
+    """ Knows the trytes of HASH only, and only HASH is confirmed. """
+    if command['command'] == 'getTrytes':
+        return 200, {'trytes': [VECTOR_TRYTES if hash == HASH else TRYTES for hash in command['hashes']], 'duration': 0}
+    if command['command'] == 'getInclusionStates':
+        return 200, {'states': [hash == HASH for hash in command['transactions']], 'duration': 0}
+    return echoResponse(command)
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def testLeastRecentlyUsedIsEvicted(self):
+        cache = iotawrapper.ResponseCache(capacity=2)
+        cache.put(('trytes', 'a'), 1)
+        cache.put(('trytes', 'b'), 2)
+        self.assertEqual(cache.get(('trytes', 'a')), 1)
+        cache.put(('trytes', 'c'), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(('trytes', 'b')))
+        self.assertEqual((cache.get(('trytes', 'a')), cache.get(('trytes', 'c'))), (1, 3))
+
+    def testTimeToLive(self):
+        cache = iotawrapper.ResponseCache()
+        cache.put(('getTips',), 'tips', ttl=0.05)
+        cache.put(('getNodeInfo',), 'info', ttl=0)
+        self.assertEqual(cache.get(('getTips',)), 'tips')
+        self.assertIsNone(cache.get(('getNodeInfo',)))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(('getTips',)))
+        self.assertEqual(len(cache), 0)
+
+    def testStats(self):
+        cache = iotawrapper.ResponseCache()
+        cache.put(('trytes', 'a'), 1)
+        cache.get(('trytes', 'a'))
+        cache.get(('trytes', 'b'))
+        cache.get(('trytes', 'a'))
+        cache.get(('included', 'a'))
+        self.assertEqual(cache.stats(), {'trytes': {'hits': 2, 'misses': 1, 'hitRatio': 2 / 3},
+                                         'included': {'hits': 0, 'misses': 1, 'hitRatio': 0.0}})
+
+    def testClear(self):
+        cache = iotawrapper.ResponseCache()
+        cache.put(('trytes', 'a'), 1)
+        cache.clear()
+        self.assertIsNone(cache.get(('trytes', 'a')))
+
+    def testTtlOptions(self):
+        cache = iotawrapper.ResponseCache(ttl={'getTips': 3.0})
+        self.assertEqual(cache.ttl['getTips'], 3.0)
+        self.assertEqual(cache.ttl['getBalances'], iotawrapper.ResponseCache.defaultTtl['getBalances'])
+
+
+class CachedApiTest(unittest.TestCase):
+
+    def setUp(self):
+        self.node = StubNode(knownResponse)
+        self.cache = iotawrapper.ResponseCache()
+        self.api = iotawrapper.Api(self.node.url, cache=self.cache)
+
+    def tearDown(self):
+        self.api.close()
+        self.node.close()
+
+    def testTrytesAreCached(self):
+        self.assertEqual(self.api.getTrytes([HASH, OTHER_HASH]).trytes(), [VECTOR_TRYTES, TRYTES])
+        self.assertEqual(self.api.getTrytes([OTHER_HASH, HASH]).trytes(), [TRYTES, VECTOR_TRYTES])
+        # Unknown transactions come back as 9s and are asked for again.
+        self.assertEqual([command['hashes'] for command in self.node.commands('getTrytes')], [[HASH, OTHER_HASH], [OTHER_HASH]])
+
+    def testFullyCachedTrytesSendNothing(self):
+        self.api.getTrytes([HASH])
+        response = self.api.getTrytes([HASH, HASH])
+        self.assertEqual(response.trytes(), [VECTOR_TRYTES, VECTOR_TRYTES])
+        self.assertEqual(response.transactions()[0].hash(), self.api.getTrytes([HASH]).transactions()[0].hash())
+        self.assertEqual(len(self.node.commands('getTrytes')), 1)
+
+    def testOnlyConfirmedStatesAreCached(self):
+        self.assertEqual(self.api.getInclusionStates([HASH, OTHER_HASH], [HASH]).states(), [True, False])
+        self.assertEqual(self.api.getInclusionStates([HASH, OTHER_HASH], [HASH]).states(), [True, False])
+        self.assertEqual([command['transactions'] for command in self.node.commands('getInclusionStates')],
+                         [[HASH, OTHER_HASH], [OTHER_HASH]])
+
+    def testStatesAreCachedPerTips(self):
+        self.api.getInclusionStates([HASH], [HASH])
+        # A transaction confirmed for newer tips is not necessarily confirmed for older ones.
+        self.api.getInclusionStates([HASH], [OTHER_HASH])
+        self.api.getInclusionStates([HASH], [HASH, OTHER_HASH])
+        self.api.getInclusionStates([HASH], [OTHER_HASH])
+        self.assertEqual([command['tips'] for command in self.node.commands('getInclusionStates')],
+                         [[HASH], [OTHER_HASH], [HASH, OTHER_HASH]])
+
+    def testVolatileResponses(self):
+        self.api.getNodeInfo()
+        self.api.getNodeInfo()
+        self.assertEqual(len(self.node.commands('getNodeInfo')), 1)
+        self.cache.clear()
+        self.api.getNodeInfo()
+        self.assertEqual(len(self.node.commands('getNodeInfo')), 2)
+
+    def testBalancesAreCachedPerAddressList(self):
+        self.api.getBalance([HASH], 100)
+        self.api.getBalance([HASH], 100)
+        self.api.getBalance([OTHER_HASH], 100)
+        self.assertEqual([command['addresses'] for command in self.node.commands('getBalances')], [[HASH], [OTHER_HASH]])
+
+
+if __name__ == '__main__':
+    unittest.main()
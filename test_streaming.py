@@ -0,0 +1,128 @@
+"""
+Tests of the streamed getTrytes and findTransactions responses. Requires Python 3.
+
+    python3 -m unittest test_streaming
+"""
+import json
+import unittest
+
+from test_iotawrapper import StubNode, echoResponse, numberedHashes, iotawrapper, HASH, OTHER_HASH, TRYTES, VECTOR_TRYTES
+
+
+def parse(data, key, size):
+    """ Feed data to a parser in pieces of size bytes, returns the list elements and the other fields. """
+    parser = iotawrapper._JsonListParser(key)
+    elements = []
+    for i in range(0, len(data), size):
+        elements.extend(parser.feed(data[i:i + size]))
+    return elements, parser.close()
+
+
+class JsonListParserTest(unittest.TestCase):
+
+    def testAnySplit(self):
+        response = {'duration': 1234, 'hashes': [HASH, OTHER_HASH, 'ä€'], 'nested': {'a': [1, 2.5e3, None]}, 'ok': True}
+        data = json.dumps(response, ensure_ascii=False, indent=1).encode('utf-8')
+        for size in (1, 2, 3, 7, 100, len(data)):
+            elements, fields = parse(data, 'hashes', size)
+            self.assertEqual(elements, response['hashes'])
+            self.assertEqual(fields, {'duration': 1234, 'nested': {'a': [1, 2500.0, None]}, 'ok': True})
+
+    def testNumbersAreNotCutOff(self):
+        self.assertEqual(parse(b'{"duration": 12345, "hashes": [1, 23, 456]}', 'hashes', 1), ([1, 23, 456], {'duration': 12345}))
+        self.assertEqual(parse(b'{"duration": 1.5e3}', 'hashes', 1), ([], {'duration': 1500.0}))
+
+    def testElementsArriveEarly(self):
+        parser = iotawrapper._JsonListParser('trytes')
+        self.assertEqual(parser.feed(b'{"trytes": ["AB", "C'), ['AB'])
+        self.assertEqual(parser.feed(b'D"'), [])
+        self.assertEqual(parser.feed(b', null]'), ['CD', None])
+        self.assertEqual(parser.feed(b'}'), [])
+        self.assertEqual(parser.close(), {})
+
+    def testEmptyList(self):
+        self.assertEqual(parse(b'{"hashes": [], "duration": 0}', 'hashes', 1), ([], {'duration': 0}))
+
+    def testInvalidResponses(self):
+        for data in (b'{"hashes": ["A"', b'{"hashes": ["A"]} x', b'["A"]', b'{"hashes": ["A" "B"]}', b'{"duration": 1'):
+            with self.assertRaises(ValueError):
+                parse(data, 'hashes', 3)
+
+
+def trytesResponse(command):
+    if command['command'] == 'getTrytes':
+        return 200, {'trytes': [VECTOR_TRYTES if hash == HASH else TRYTES for hash in command['hashes']], 'duration': 3}
+    return echoResponse(command)
+
+
+class StreamTest(unittest.TestCase):
+
+    def createApi(self, respond, chunked=True, **options):
+        self.node = StubNode(respond, chunked)
+        self.api = iotawrapper.Api(self.node.url, **options)
+
+    def tearDown(self):
+        self.api.close()
+        self.node.close()
+
+    def testStreamTrytes(self):
+        self.createApi(trytesResponse, chunkSize=2)
+        self.assertEqual(list(self.api.streamTrytes([HASH, OTHER_HASH, HASH])), [VECTOR_TRYTES, TRYTES, VECTOR_TRYTES])
+        self.assertEqual([command['hashes'] for command in self.node.commands('getTrytes')], [[HASH, OTHER_HASH], [HASH]])
+        self.assertEqual(len(self.node.ports), 1)
+
+    def testResponseFields(self):
+        self.createApi(trytesResponse)
+        with iotawrapper.GetTrytes.stream(self.node.url, [HASH], self.api.transport) as trytes:
+            self.assertEqual(list(trytes), [VECTOR_TRYTES])
+            self.assertEqual(trytes.jsonData, {'duration': 3})
+
+    def testStreamTransactionsDropsDuplicates(self):
+        self.createApi(lambda command: (200, {'hashes': [HASH] + command['addresses'], 'duration': 0}), chunked=False, chunkSize=1)
+        self.assertEqual(list(self.api.streamTransactions([OTHER_HASH, HASH, OTHER_HASH])), [HASH, OTHER_HASH])
+
+    def testStreamsLargeResponse(self):
+        hashes = numberedHashes(3000)
+        self.createApi(lambda command: (200, {'hashes': hashes, 'duration': 0}), chunked=False)
+        self.assertEqual(list(self.api.streamTransactions([HASH])), hashes)
+
+    def testClosedStreamDropsConnection(self):
+        self.createApi(trytesResponse)
+        stream = self.api.streamTrytes([HASH, OTHER_HASH])
+        self.assertEqual(next(stream), VECTOR_TRYTES)
+        stream.close()
+        self.assertEqual(self.api.getTrytes([OTHER_HASH]).trytes(), [TRYTES])
+        self.assertEqual(len(self.node.ports), 2)
+
+    def testErrorStatus(self):
+        self.createApi(lambda command: (400, {'error': 'Invalid hashes input'}))
+        with self.assertRaises(iotawrapper.ClientError) as context:
+            list(self.api.streamTrytes([HASH]))
+        self.assertEqual((context.exception.error, context.exception.command), ('Invalid hashes input', 'getTrytes'))
+
+    def testTruncatedResponse(self):
+        self.createApi(lambda command: (200, b'{"trytes": ["' + TRYTES.encode('ascii') + b'", "99'))
+        stream = self.api.streamTrytes([HASH, OTHER_HASH])
+        self.assertEqual(next(stream), TRYTES)
+        with self.assertRaises(iotawrapper.InvalidResponse):
+            next(stream)
+
+
+class TransportWithoutStreamTest(unittest.TestCase):
+
+    def testFallsBackToSend(self):
+        class Transport:
+            def send(self, url, command, cancel=None):
+                return {'trytes': [TRYTES] * len(command['hashes']), 'duration': 1}
+
+            def close(self):
+                pass
+        api = iotawrapper.Api('http://node', Transport())
+        self.assertEqual(list(api.streamTrytes([HASH, OTHER_HASH])), [TRYTES, TRYTES])
+        with iotawrapper.GetTrytes.stream('http://node', [HASH], api.transport) as trytes:
+            list(trytes)
+            self.assertEqual(trytes.jsonData, {'duration': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
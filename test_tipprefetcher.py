@@ -0,0 +1,112 @@
+"""
+Tests of TipPrefetcher and of getTransactionsToApprove taking prefetched tips. Requires Python 3.
+
+    python3 -m unittest test_tipprefetcher
+"""
+import itertools
+import threading
+import time
+import unittest
+
+from test_iotawrapper import StubNode, iotawrapper, numberedHashes, OTHER_HASH
+
+
+class FastPrefetcher(iotawrapper.TipPrefetcher):
+
+    retryDelay = 0.05
+
+
+class TipPrefetcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.milestoneIndex = 100
+        self.nodeInfoFails = False
+        self.hashes = itertools.cycle(numberedHashes(1000))
+        self.lock = threading.Lock()
+        self.node = StubNode(self.respond)
+        self.api = iotawrapper.Api(self.node.url)
+        self.prefetcher = None
+
+    def tearDown(self):
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        self.api.close()
+        self.node.close()
+
+    def respond(self, command):
+        with self.lock:
+            if command['command'] == 'getNodeInfo':
+                if self.nodeInfoFails:
+                    return 400, {'error': 'Node info unavailable'}
+                return 200, {'latestMilestoneIndex': self.milestoneIndex, 'latestSolidSubtangleMilestoneIndex': self.milestoneIndex,
+                             'duration': 0}
+            if command['command'] == 'getTransactionsToApprove':
+                return 200, {'trunkTransaction': next(self.hashes), 'branchTransaction': OTHER_HASH, 'duration': 0}
+            return 200, {'duration': 0}
+
+    def prefetch(self, **options):
+        options.setdefault('checkInterval', 0.05)
+        self.prefetcher = FastPrefetcher(self.api, **options)
+        return self.prefetcher
+
+    def waitFor(self, condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, 'Timed out waiting for the prefetcher')
+            time.sleep(0.01)
+
+    def testResponseIsUnchanged(self):
+        prefetcher = self.prefetcher = self.api.prefetchTips(poolSize=2)
+        jsonData, milestoneIndex, fetched = prefetcher.take(timeout=5)
+        self.assertEqual(sorted(jsonData), ['branchTransaction', 'duration', 'trunkTransaction'])
+        self.assertEqual(milestoneIndex, 100)
+        self.assertLessEqual(fetched, time.time())
+        self.waitFor(lambda: prefetcher.stats()['ready'] == 2)
+        tips = self.api.getTransactionsToApprove(3)
+        self.assertEqual(sorted(tips.jsonResponse()), ['branchTransaction', 'duration', 'trunkTransaction'])
+        self.assertEqual(prefetcher.stats()['taken'], 2)
+        self.assertEqual(self.node.commands('getTransactionsToApprove')[0]['depth'], 3)
+
+    def testPairsAreHandedOutOnce(self):
+        prefetcher = self.prefetch(poolSize=3, workers=2)
+        self.waitFor(lambda: prefetcher.stats()['ready'] == 3)
+        trunks = [prefetcher.take(timeout=5)[0]['trunkTransaction'] for i in range(6)]
+        self.assertEqual(len(set(trunks)), 6)
+        self.waitFor(lambda: prefetcher.stats()['ready'] == 3)
+        self.assertLessEqual(len(self.node.commands('getTransactionsToApprove')), 9 + 2)
+
+    def testRecoversAfterNodeInfoFailure(self):
+        self.nodeInfoFails = True
+        prefetcher = self.prefetch(poolSize=2, workers=2)
+        self.waitFor(lambda: prefetcher.stats()['errors'] >= 4)
+        self.assertIsNone(prefetcher.take(timeout=0.1))
+        self.assertIsInstance(prefetcher.lastError, iotawrapper.ClientError)
+        self.nodeInfoFails = False
+        # Failed checks do not keep fetches reserved, the pool fills up completely.
+        self.waitFor(lambda: prefetcher.stats()['ready'] == 2)
+        self.assertEqual(prefetcher.take(timeout=5)[1], 100)
+
+    def testEvictionByMilestone(self):
+        prefetcher = self.prefetch(poolSize=2, maxMilestones=0)
+        self.waitFor(lambda: prefetcher.stats()['ready'] == 2)
+        self.milestoneIndex = 101
+        self.waitFor(lambda: prefetcher.stats()['expiredByMilestone'] == 2 and prefetcher.stats()['ready'] == 2)
+        self.assertEqual(prefetcher.stats()['milestoneIndex'], 101)
+        self.assertEqual(prefetcher.take(timeout=5)[1], 101)
+
+    def testEvictionByAge(self):
+        prefetcher = self.prefetch(poolSize=1, maxAge=0.1, checkInterval=60)
+        self.waitFor(lambda: prefetcher.stats()['expiredByAge'] >= 2)
+        jsonData, milestoneIndex, fetched = prefetcher.take(timeout=5)
+        self.assertLessEqual(time.time() - fetched, 0.1)
+
+    def testOtherDepthAsksTheNode(self):
+        self.prefetcher = self.api.prefetchTips(depth=3, poolSize=1)
+        self.waitFor(lambda: self.prefetcher.stats()['ready'] == 1)
+        self.api.getTransactionsToApprove(5)
+        self.assertEqual([command['depth'] for command in self.node.commands('getTransactionsToApprove')][-1], 5)
+        self.assertEqual(self.prefetcher.stats()['taken'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
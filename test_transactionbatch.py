@@ -0,0 +1,76 @@
+"""
+Tests of TransactionBatch. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_transactionbatch
+"""
+import unittest
+
+import numpy as np
+
+from test_iotawrapper import iotawrapper, TRYTES, VECTOR_TRYTES, VECTOR_HASH
+import transactionbatch
+import trinary
+
+
+def transactionTrytes(address, value, timestamp, currentIndex):
+    integer = lambda number, length: trinary.tritsToTrytes(trinary.intToTrits(number, length * 3))
+    return (TRYTES[:2187] + address + integer(value, 27) + TRYTES[2295:2322] + integer(timestamp, 9) + integer(currentIndex, 9)
+            + TRYTES[2340:])
+
+
+class TransactionBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.trytesList = [transactionTrytes('A' * 81, 100, 1500000000, 0), transactionTrytes('B' * 81, -40, 1500000001, 1),
+                           VECTOR_TRYTES, transactionTrytes('A' * 81, -25, 1500000002, 2)]
+        self.batch = transactionbatch.TransactionBatch(self.trytesList)
+
+    def testColumnsMatchTransactions(self):
+        self.assertEqual(len(self.batch), 4)
+        for row, trytes in enumerate(self.trytesList):
+            transaction = iotawrapper.Transaction(trytes)
+            for name, start, stop in transactionbatch.FIELDS:
+                value = self.batch.column(name)[row]
+                expected = getattr(transaction, name)()
+                self.assertEqual(value if name in transactionbatch.INTEGER_FIELDS else value.decode('ascii'), expected, name)
+
+    def testIntegerColumns(self):
+        self.assertEqual(self.batch.value().dtype, np.int64)
+        self.assertEqual(self.batch.value().tolist(), [100, -40, 0, -25])
+        self.assertEqual(self.batch.timestamp().tolist(), [1500000000, 1500000001, 1480690413, 1500000002])
+
+    def testHash(self):
+        hashes = self.batch.hash()
+        self.assertEqual(hashes[2].decode('ascii'), VECTOR_HASH)
+        self.assertEqual(hashes[0].decode('ascii'), iotawrapper.Transaction(self.trytesList[0]).hash())
+
+    def testSumBy(self):
+        addresses, sums = self.batch.sumBy('address')
+        self.assertEqual([address.decode('ascii')[0] for address in addresses], ['9', 'A', 'B'])
+        self.assertEqual(sums.tolist(), [0, 75, -40])
+
+    def testTake(self):
+        taken = self.batch.take(self.batch.value() < 0)
+        self.assertEqual(len(taken), 2)
+        self.assertEqual(taken.currentIndex().tolist(), [1, 2])
+        self.assertEqual(taken.trytes(), [self.trytesList[1], self.trytesList[3]])
+        self.assertEqual(taken.transaction(1).value(), -25)
+
+    def testMissingTransactions(self):
+        batch = transactionbatch.TransactionBatch([None, self.trytesList[0]])
+        self.assertEqual(batch.value().tolist(), [0, 100])
+        self.assertEqual(batch.address()[0], b'9' * 81)
+
+    def testEmpty(self):
+        batch = transactionbatch.TransactionBatch([])
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(len(batch.hash()), 0)
+        self.assertEqual(len(batch.sumBy('address')[0]), 0)
+
+    def testWrongLength(self):
+        with self.assertRaises(ValueError):
+            transactionbatch.TransactionBatch([TRYTES[:-1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Tests of TransactionStore. Requires Python 3.
+
+    python3 -m unittest test_transactionstore
+"""
+import os
+import tempfile
+import unittest
+
+from test_iotawrapper import StubNode, iotawrapper, HASH, OTHER_HASH, TRYTES, VECTOR_TRYTES, VECTOR_HASH
+import transactionstore
+import trinary
+
+
+def numberedTransactions(count):
+    """ (hash, trytes) pairs which differ in their hashes and trytes. """
+    numbered = lambda number, length: trinary.tritsToTrytes(trinary.intToTrits(number, length * 3))
+    return [(numbered(number, 81), numbered(number, 81) + TRYTES[81:]) for number in range(1, count + 1)]
+
+
+class TransactionStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'tangle')
+        self.store = transactionstore.TransactionStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def reopen(self):
+        self.store.close()
+        self.store = transactionstore.TransactionStore(self.path)
+
+    def testPutAndGet(self):
+        self.store.put(VECTOR_HASH, VECTOR_TRYTES)
+        self.assertEqual(self.store.get(VECTOR_HASH), VECTOR_TRYTES)
+        self.assertIn(VECTOR_HASH, self.store)
+        self.assertIsNone(self.store.get(HASH))
+        self.assertNotIn(HASH, self.store)
+        self.assertEqual(self.store.getTransaction(VECTOR_HASH).hash(), VECTOR_HASH)
+        self.assertIsNone(self.store.getTransaction(HASH))
+
+    def testDuplicatesAreStoredOnce(self):
+        self.store.putMany([(HASH, TRYTES), (HASH, TRYTES), (OTHER_HASH, VECTOR_TRYTES)])
+        self.store.put(HASH, TRYTES)
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(os.path.getsize(self.path + '.dat'), 2 * transactionstore.RECORD_SIZE)
+
+    def testReopen(self):
+        transactions = numberedTransactions(20)
+        self.store.putMany(transactions)
+        self.reopen()
+        self.assertEqual(len(self.store), 20)
+        for hash, trytes in transactions:
+            self.assertEqual(self.store.get(hash), trytes)
+
+    def testGrowsIndex(self):
+        transactions = numberedTransactions(1500)
+        self.store.putMany(transactions[:700])
+        for hash, trytes in transactions[700:]:
+            self.store.put(hash, trytes)
+        self.reopen()
+        self.assertEqual(len(self.store), 1500)
+        self.assertTrue(all(self.store.get(hash) == trytes for hash, trytes in transactions))
+
+    def testRebuildsMissingIndex(self):
+        transactions = numberedTransactions(10)
+        self.store.putMany(transactions)
+        self.store.close()
+        os.remove(self.path + '.idx')
+        self.store = transactionstore.TransactionStore(self.path)
+        self.assertEqual([self.store.get(hash) for hash, trytes in transactions], [trytes for hash, trytes in transactions])
+
+    def testRebuildsOutdatedIndex(self):
+        transactions = numberedTransactions(10)
+        self.store.putMany(transactions[:5])
+        self.store.close()
+        with open(self.path + '.idx', 'rb') as index:
+            oldIndex = index.read()
+        self.store = transactionstore.TransactionStore(self.path)
+        self.store.putMany(transactions[5:])
+        self.store.close()
+        with open(self.path + '.idx', 'wb') as index:
+            index.write(oldIndex)
+        self.store = transactionstore.TransactionStore(self.path)
+        self.assertTrue(all(self.store.get(hash) == trytes for hash, trytes in transactions))
+
+    def testDropsPartialRecord(self):
+        self.store.put(HASH, TRYTES)
+        self.store.close()
+        with open(self.path + '.dat', 'ab') as data:
+            data.write((OTHER_HASH + TRYTES[:100]).encode('ascii'))
+        self.store = transactionstore.TransactionStore(self.path)
+        self.assertEqual(len(self.store), 1)
+        self.store.put(OTHER_HASH, VECTOR_TRYTES)
+        self.reopen()
+        self.assertEqual((self.store.get(HASH), self.store.get(OTHER_HASH)), (TRYTES, VECTOR_TRYTES))
+
+    def testInvalidLengths(self):
+        for hash, trytes in ((HASH[:80], TRYTES), (HASH, TRYTES[:-1])):
+            with self.assertRaises(ValueError):
+                self.store.put(hash, trytes)
+        self.assertEqual(len(self.store), 0)
+
+    def testInvalidItemLeavesStoreUnchanged(self):
+        with self.assertRaises(ValueError):
+            self.store.putMany([(OTHER_HASH, VECTOR_TRYTES), ('C' * 81, 'short')])
+        self.assertIsNone(self.store.get(OTHER_HASH))
+        self.assertEqual(len(self.store), 0)
+        with self.assertRaises(ValueError):
+            self.store.putMany([(OTHER_HASH, VECTOR_TRYTES), ('C' * 80 + 'Ä', TRYTES)])
+        self.assertIsNone(self.store.get(OTHER_HASH))
+        self.store.putMany([(OTHER_HASH, VECTOR_TRYTES)])
+        self.reopen()
+        self.assertEqual(self.store.get(OTHER_HASH), VECTOR_TRYTES)
+        self.assertEqual(len(self.store), 1)
+
+
+def vectorResponse(command):
+    if command['command'] == 'getTrytes':
+        return 200, {'trytes': [VECTOR_TRYTES if hash == VECTOR_HASH else TRYTES for hash in command['hashes']], 'duration': 0}
+    return 200, {'duration': 0}
+
+
+class StoredApiTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = transactionstore.TransactionStore(os.path.join(self.directory.name, 'tangle'))
+        self.node = StubNode(vectorResponse)
+        self.api = iotawrapper.Api(self.node.url, store=self.store)
+
+    def tearDown(self):
+        self.api.close()
+        self.node.close()
+        self.store.close()
+        self.directory.cleanup()
+
+    def testKnownTransactionsAreStored(self):
+        self.assertEqual(self.api.getTrytes([VECTOR_HASH, HASH]).trytes(), [VECTOR_TRYTES, TRYTES])
+        self.assertEqual(self.store.get(VECTOR_HASH), VECTOR_TRYTES)
+        self.assertNotIn(HASH, self.store)
+        self.assertEqual(self.api.getTrytes([VECTOR_HASH]).trytes(), [VECTOR_TRYTES])
+        self.assertEqual([command['hashes'] for command in self.node.commands('getTrytes')], [[VECTOR_HASH, HASH]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests of Api.sendTransfers and TransferPipeline against the IRI emulator. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_transferpipeline
+"""
+import threading
+import unittest
+
+from test_iriemulator import EmulatorTestCase, iotawrapper, transactionTrytes, OTHER_ADDRESS
+
+WEIGHT = 1
+
+
+def transfer(index):
+    return [transactionTrytes(OTHER_ADDRESS, index=index)]
+
+
+class TransferPipelineTest(EmulatorTestCase):
+
+    def send(self, bundles, **options):
+        """ Run the pipeline in a thread of its own, so a hanging run fails the test instead of blocking it. """
+        pipeline = iotawrapper.TransferPipeline(self.api, minWeightMagnitude=WEIGHT, **options)
+        thread = threading.Thread(target=pipeline.run, args=(bundles,), daemon=True)
+        thread.start()
+        thread.join(30)
+        self.assertFalse(thread.is_alive(), 'The pipeline did not finish')
+        return pipeline
+
+    def assertSent(self, trytesList, bundle):
+        self.assertEqual(len(trytesList), len(bundle))
+        transaction = iotawrapper.Transaction(trytesList[0])
+        self.assertEqual(transaction.address(), OTHER_ADDRESS)
+        self.assertIn(transaction.hash(), self.api.findTransactions([OTHER_ADDRESS]).hashes())
+
+    def testSendsBundles(self):
+        bundles = [transfer(index) for index in range(4)]
+        pipeline = self.api.sendTransfers(bundles, minWeightMagnitude=WEIGHT, queueSize=1, broadcastWorkers=2)
+        self.assertEqual(pipeline.errors(), {})
+        for trytesList, bundle in zip(pipeline.trytes(), bundles):
+            self.assertSent(trytesList, bundle)
+        stats = pipeline.stats()
+        self.assertEqual((stats['bundles'], stats['sent'], stats['failed']), (4, 4, 0))
+        self.assertEqual([stats['stages'][stage]['processed'] for stage in pipeline.stages], [4, 4, 4])
+
+    def testFailingBundle(self):
+        pipeline = self.send([transfer(0), ['9' * 10], transfer(2)])
+        self.assertEqual(list(pipeline.errors()), [1])
+        self.assertIsInstance(pipeline.errors()[1], iotawrapper.ClientError)
+        trytes = pipeline.trytes()
+        self.assertIsNone(trytes[1])
+        self.assertSent(trytes[0], transfer(0))
+        self.assertSent(trytes[2], transfer(2))
+        self.assertEqual(pipeline.stats()['stages']['pow']['failed'], 1)
+
+    def testNoneIsNotTheEnd(self):
+        pipeline = self.send([transfer(0), None, transfer(2)], tipWorkers=2)
+        self.assertEqual(list(pipeline.errors()), [1])
+        self.assertIsInstance(pipeline.errors()[1], TypeError)
+        self.assertEqual(len(pipeline.trytes()), 3)
+        self.assertSent(pipeline.trytes()[2], transfer(2))
+
+    def testFailingInput(self):
+        def bundles():
+            yield transfer(0)
+            yield transfer(1)
+            raise RuntimeError('No more bundles')
+        pipeline = self.send(bundles(), tipWorkers=2, powWorkers=2)
+        self.assertEqual(list(pipeline.errors()), [2])
+        self.assertIsInstance(pipeline.errors()[2], RuntimeError)
+        trytes = pipeline.trytes()
+        self.assertEqual(len(trytes), 3)
+        self.assertIsNone(trytes[2])
+        self.assertSent(trytes[0], transfer(0))
+        self.assertSent(trytes[1], transfer(1))
+        stats = pipeline.stats()
+        self.assertEqual((stats['sent'], stats['failed'], stats['stages']['tips']['failed']), (2, 1, 1))
+
+    def testFailingInputBeforeFirstBundle(self):
+        def bundles():
+            raise RuntimeError('No bundles')
+            yield
+        pipeline = self.send(bundles())
+        self.assertEqual(pipeline.trytes(), [None])
+        self.assertIsInstance(pipeline.errors()[0], RuntimeError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+Tests of the trinary conversions. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_trinary
+"""
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Python3'))
+import trinary
+
+
+def randomTrytes(length, rng):
+    return ''.join(rng.choice(trinary.TRYTE_ALPHABET) for i in range(length))
+
+
+class TrytesTest(unittest.TestCase):
+
+    def testTryteValues(self):
+        self.assertEqual(trinary.trytesToValues('9ADMNZ').tolist(), [0, 1, 4, 13, -13, -1])
+
+    def testTrytesToTrits(self):
+        self.assertEqual(trinary.trytesToTrits('9AMNZ').tolist(), [0, 0, 0, 1, 0, 0, 1, 1, 1, -1, -1, -1, -1, 0, 0])
+
+    def testRoundTrip(self):
+        rng = random.Random(1)
+        trytes = randomTrytes(2673, rng)
+        self.assertEqual(trinary.tritsToTrytes(trinary.trytesToTrits(trytes)), trytes)
+
+    def testBatch(self):
+        rng = random.Random(2)
+        batch = [randomTrytes(81, rng) for i in range(5)]
+        trits = trinary.trytesToTrits(batch)
+        self.assertEqual(trits.shape, (5, 243))
+        self.assertEqual(trinary.tritsToTrytes(trits), batch)
+        self.assertEqual(trinary.trytesToTrits(batch[3]).tolist(), trits[3].tolist())
+
+    def testInvalidTrytes(self):
+        for trytes in ('ABc', 'AB1', ['AB', 'A-']):
+            with self.assertRaises(ValueError):
+                trinary.trytesToTrits(trytes)
+
+    def testBatchOfDifferentLengths(self):
+        with self.assertRaises(ValueError):
+            trinary.trytesToTrits(['AB', 'ABC'])
+
+    def testInvalidTrits(self):
+        with self.assertRaises(ValueError):
+            trinary.tritsToTrytes([0, 1, 2])
+        with self.assertRaises(ValueError):
+            trinary.tritsToTrytes([0, 1])
+
+
+class IntegerTest(unittest.TestCase):
+
+    def testSmallValues(self):
+        self.assertEqual(trinary.intToTrits(0, 3).tolist(), [0, 0, 0])
+        self.assertEqual(trinary.intToTrits(5, 4).tolist(), [-1, -1, 1, 0])
+        self.assertEqual(trinary.intToTrits(-5, 4).tolist(), [1, 1, -1, 0])
+        self.assertEqual(int(trinary.tritsToInt([-1, -1, 1, 0])), 5)
+
+    def testRoundTrip(self):
+        rng = random.Random(3)
+        for length in (1, 27, 40, 41, 81, 243):
+            half = (3 ** length - 1) // 2
+            values = [rng.randint(-half, half) for i in range(20)] + [half, -half, 0]
+            trits = trinary.intToTrits(values, length)
+            self.assertEqual(trits.shape, (len(values), length))
+            self.assertEqual([int(value) for value in trinary.tritsToInt(trits)], values)
+
+    def testOutOfRange(self):
+        with self.assertRaises(ValueError):
+            trinary.intToTrits(14, 3)
+        with self.assertRaises(ValueError):
+            trinary.intToTrits(-(3 ** 81), 81)
+
+
+class BytesTest(unittest.TestCase):
+
+    def testAllByteValues(self):
+        # 48 equal bytes for every byte value, as in the Kerl conversion tests of the IOTA libraries.
+        data = np.array([[value % 256] * 48 for value in range(-128, 128)], dtype=np.uint8)
+        trits = trinary.bytesToTrits(data)
+        expected = [int.from_bytes(row.tobytes(), 'big', signed=True) for row in data]
+        self.assertEqual([int(value) for value in trinary.tritsToInt(trits)], expected)
+        # tritsToBytes drops the last trit like Kerl does, values which need it do not survive the round trip.
+        inRange = trits[:, 242] == 0
+        self.assertGreater(inRange.sum(), 100)
+        self.assertTrue((trinary.tritsToBytes(trits[inRange]) == data[inRange]).all())
+
+    def testRandomTrits(self):
+        rng = np.random.default_rng(4)
+        trits = rng.integers(-1, 2, size=(50, 243)).astype(np.int8)
+        trits[:, 242] = 0
+        self.assertTrue((trinary.bytesToTrits(trinary.tritsToBytes(trits)) == trits).all())
+
+    def testSingleHash(self):
+        trits = trinary.trytesToTrits('EMIDYNHBWMBCXVDEFOFWINXTERALUKYYPPHKP9JJFGJEIUY9MUDVNFZHMMWZUYUSWAIOWEVTHNWMHANBH')
+        data = trinary.tritsToBytes(trits)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(len(data), 48)
+        self.assertEqual(trinary.bytesToTrits(data)[:242].tolist(), trits[:242].tolist())
+
+    def testWrongLength(self):
+        with self.assertRaises(ValueError):
+            trinary.tritsToBytes([0] * 242)
+        with self.assertRaises(ValueError):
+            trinary.bytesToTrits(b'\0' * 47)
+
+    def testAsciiEncoding(self):
+        # Vector of the ASCII trytes codec of the IOTA libraries.
+        self.assertEqual(trinary.bytesToTrytes(b'Hello, IOTA!'), 'RBTC9D9DCDQAEASBYBCCKBFA')
+        self.assertEqual(trinary.trytesToBytes('RBTC9D9DCDQAEASBYBCCKBFA'), b'Hello, IOTA!')
+        self.assertEqual(trinary.trytesToBytes(trinary.bytesToTrytes([b'ab', b'cd'])), [b'ab', b'cd'])
+
+    def testInvalidAsciiTrytes(self):
+        with self.assertRaises(ValueError):
+            trinary.trytesToBytes('ABC')
+        with self.assertRaises(ValueError):
+            trinary.trytesToBytes('ZZ')
+
+
+class PackTest(unittest.TestCase):
+
+    def testPackedValues(self):
+        self.assertEqual(trinary.packTrits([1, 0, 0, 0, 0]), bytes([1]))
+        self.assertEqual(trinary.packTrits([-1, 0, 0, 0, 0]), bytes([255]))
+        self.assertEqual(trinary.packTrits([1, 1, 1, 1, 1]), bytes([121]))
+        self.assertEqual(trinary.packTrits([-1, -1, -1, -1, -1, 1]), bytes([256 - 121, 1]))
+        self.assertEqual(trinary.unpackTrits(bytes([256 - 121, 1]), 6).tolist(), [-1, -1, -1, -1, -1, 1])
+
+    def testTritsRoundTrip(self):
+        rng = np.random.default_rng(10)
+        for length in (1, 5, 243, 8019):
+            trits = rng.integers(-1, 2, size=(3, length)).astype(np.int8)
+            packed = trinary.packTrits(trits)
+            self.assertEqual(packed.shape, (3, -(-length // 5)))
+            self.assertTrue((trinary.unpackTrits(packed, length) == trits).all())
+            self.assertTrue((trinary.unpackTrits(trinary.packTrits(trits[1]), length) == trits[1]).all())
+
+    def testTrytesMatchTrits(self):
+        rng = random.Random(11)
+        for length in (1, 2, 3, 5, 81, 2673):
+            trytes = randomTrytes(length, rng)
+            packed = trinary.packTrytes(trytes)
+            self.assertEqual(packed, trinary.packTrits(trinary.trytesToTrits(trytes)))
+            self.assertEqual(trinary.unpackTrytes(packed, length), trytes)
+
+    def testTrytesBatch(self):
+        rng = random.Random(12)
+        batch = [randomTrytes(81, rng) for i in range(20000)]
+        packed = trinary.packTrytes(batch)
+        self.assertEqual(packed.shape, (20000, trinary.PACKED_HASH_BYTES))
+        self.assertEqual(packed[19999].tobytes(), trinary.packTrytes(batch[19999]))
+        self.assertEqual(trinary.unpackTrytes(packed, 81), batch)
+        self.assertEqual(trinary.unpackTrytes([row.tobytes() for row in packed[:3]], 81), batch[:3])
+
+    def testInvalidInput(self):
+        with self.assertRaises(ValueError):
+            trinary.packTrytes('ABc')
+        with self.assertRaises(ValueError):
+            trinary.unpackTrits(bytes([122]))
+        with self.assertRaises(ValueError):
+            trinary.unpackTrytes(bytes(2), 4)
+        with self.assertRaises(ValueError):
+            trinary.packTrits([2])
+
+
+class HashTest(unittest.TestCase):
+
+    TRYTES = 'EMIDYNHBWMBCXVDEFOFWINXTERALUKYYPPHKP9JJFGJEIUY9MUDVNFZHMMWZUYUSWAIOWEVTHNWMHANBH'
+
+    def testConversions(self):
+        hash = trinary.Hash(self.TRYTES)
+        self.assertEqual(len(hash), trinary.PACKED_HASH_BYTES)
+        self.assertEqual(hash.trytes(), self.TRYTES)
+        self.assertEqual(str(hash), self.TRYTES)
+        self.assertEqual(repr(hash), 'Hash(%r)' % self.TRYTES)
+        self.assertEqual(hash.trits().tolist(), trinary.trytesToTrits(self.TRYTES).tolist())
+        self.assertEqual(trinary.Hash(bytes(hash)), hash)
+
+    def testDictionaryKey(self):
+        hashes = trinary.Hash.fromTrytesList([self.TRYTES, 'A' * 81, self.TRYTES])
+        self.assertTrue(all(isinstance(hash, trinary.Hash) for hash in hashes))
+        self.assertEqual(len(set(hashes)), 2)
+        self.assertEqual({hashes[0]: 1}[trinary.Hash(self.TRYTES)], 1)
+        self.assertEqual(trinary.Hash.fromTrytesList([]), [])
+
+    def testImmutable(self):
+        with self.assertRaises(AttributeError):
+            trinary.Hash(self.TRYTES).extra = 1
+
+    def testInvalidHashes(self):
+        for value in (self.TRYTES[:80], bytes(48), bytes([122]) * 49):
+            with self.assertRaises(ValueError):
+                trinary.Hash(value)
+        with self.assertRaises(ValueError):
+            trinary.Hash.fromTrytesList(['A' * 27])
+
+    def testPaddingTrits(self):
+        hash = trinary.Hash(self.TRYTES)
+        for padding in ([1, 0], [0, -1]):
+            trits = np.concatenate([hash.trits(), padding]).astype(np.int8)
+            packed = trinary.packTrits(trits)
+            self.assertEqual(trinary.unpackTrytes(packed, 81), self.TRYTES)
+            # The bytes differ from those of the hash although the trytes do not, such bytes are not a hash.
+            with self.assertRaises(ValueError):
+                trinary.Hash(packed)
+        self.assertEqual(trinary.Hash(trinary.packTrits(np.concatenate([hash.trits(), [0, 0]]).astype(np.int8))), hash)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+Tests of Api.findUsedAddresses against the IRI emulator. Requires Python 3 and NumPy.
+
+    python3 -m unittest test_usedaddresses
+"""
+import unittest
+
+from test_addressgenerator import OTHER_SEED, OTHER_ADDRESSES, OTHER_ADDRESSES_FROM_10
+from test_iriemulator import transactionTrytes
+from test_iotawrapper import iotawrapper
+import addressgenerator
+import iriemulator
+
+
+class FindUsedAddressesTest(unittest.TestCase):
+
+    def setUp(self):
+        # Address 0 has a balance, address 2 only transactions and address 11 a balance behind a gap of 8 unused addresses.
+        self.emulator = iriemulator.IriEmulator(balances={OTHER_ADDRESSES[0]: 10, OTHER_ADDRESSES_FROM_10[1]: 7})
+        self.api = iotawrapper.Api('emulator', self.emulator.transport(), chunkSize=4)
+        self.api.storeTransactions([transactionTrytes(OTHER_ADDRESSES[2])])
+        self.generator = addressgenerator.AddressGenerator(OTHER_SEED, processes=1)
+
+    def tearDown(self):
+        self.generator.close()
+        self.api.close()
+        self.emulator.close()
+
+    def testGapLimit(self):
+        used = self.api.findUsedAddresses(OTHER_SEED, gapLimit=9, windowSize=4, generator=self.generator)
+        self.assertEqual(used, [(0, OTHER_ADDRESSES[0], 10), (2, OTHER_ADDRESSES[2], 0), (11, OTHER_ADDRESSES_FROM_10[1], 7)])
+
+    def testStopsAtGap(self):
+        used = self.api.findUsedAddresses(OTHER_SEED, gapLimit=5, windowSize=3, generator=self.generator)
+        self.assertEqual(used, [(0, OTHER_ADDRESSES[0], 10), (2, OTHER_ADDRESSES[2], 0)])
+
+    def testStart(self):
+        used = self.api.findUsedAddresses(OTHER_SEED, gapLimit=3, start=10, generator=self.generator)
+        self.assertEqual(used, [(11, OTHER_ADDRESSES_FROM_10[1], 7)])
+
+    def testNothingUsed(self):
+        self.assertEqual(self.api.findUsedAddresses(OTHER_SEED, gapLimit=2, start=20, generator=self.generator), [])
+
+    def testOwnGenerator(self):
+        self.api.powProcesses = 1
+        used = self.api.findUsedAddresses(OTHER_SEED, gapLimit=2, windowSize=2)
+        self.assertEqual(used, [(0, OTHER_ADDRESSES[0], 10), (2, OTHER_ADDRESSES[2], 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()